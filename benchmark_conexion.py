@@ -0,0 +1,213 @@
+"""
+Benchmark de los perfiles de conexión (FIFA_PERFIL_CONEXION)
+
+Repite las mismas lecturas con el perfil 'basico' (valores por defecto de los
+drivers) y con 'optimizado' (compresión, páginas y pools ajustados) y reporta
+por backend la latencia p50/p95, los bytes transferidos y el códec negociado:
+
+- Bytes del cliente (aproximados): diferencia de rchar/wchar en /proc/self/io
+  (Linux). Cuenta todas las lecturas y escrituras del proceso (sockets ya
+  comprimidos, pero también archivos, pipes y la propia lectura de
+  /proc/self/io), así que sirve para comparar perfiles, no como bytes de red
+- Bytes de MongoDB: diferencia de network.physicalBytesIn/Out de serverStatus
+  (lo que viajó por la red según el servidor; incluye a otros clientes)
+- Códec: en Cassandra el que pidió el DatabaseManager (el driver no conecta si
+  el servidor no lo soporta); en MongoDB el compresor cuyos contadores de
+  serverStatus.network.compression crecieron durante la medición
+
+Uso:
+    python benchmark_conexion.py --repeticiones 50 --edicion "Mundial 2030" --json conexion.json
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+
+def leer_io():
+    """
+    Bytes leídos y escritos por el proceso, aproximación de los bytes de red
+
+    rchar/wchar suman toda lectura y escritura (sockets, archivos, pipes), no
+    solo el tráfico con las bases.
+
+    Returns:
+        tuple: (rchar, wchar), o None si /proc/self/io no existe
+    """
+    try:
+        with open('/proc/self/io', encoding='ascii') as archivo:
+            valores = dict(linea.split(':') for linea in archivo)
+        return int(valores['rchar']), int(valores['wchar'])
+    except OSError:
+        return None
+
+
+def bytes_red_mongo(db):
+    """Bytes físicos de red de MongoDB según serverStatus (None si no está permitido)"""
+    try:
+        red = db.client.admin.command('serverStatus')['network']
+        return red.get('physicalBytesIn', red['bytesIn']), red.get('physicalBytesOut', red['bytesOut'])
+    except Exception:
+        return None
+
+
+def bytes_compresion_mongo(db):
+    """Bytes comprimidos por el servidor con cada compresor (None si no está permitido)"""
+    try:
+        compresion = db.client.admin.command('serverStatus')['network'].get('compression', {})
+        return {codec: datos['compressor']['bytesOut'] for codec, datos in compresion.items()}
+    except Exception:
+        return None
+
+
+def codec_mongo(inicio, fin):
+    """Compresores que el servidor usó entre dos lecturas de bytes_compresion_mongo"""
+    if inicio is None or fin is None:
+        return None
+    usados = [codec for codec, valor in fin.items() if valor > inicio.get(codec, 0)]
+    return ','.join(usados) or 'ninguno'
+
+
+def crear_lecturas(manager, args):
+    """
+    Lecturas representativas de cada backend sobre una conexión del perfil
+
+    Returns:
+        dict: backend -> callable
+    """
+    def cassandra():
+        session = manager.get_cassandra_session()
+        return list(session.execute(
+            "SELECT * FROM partidos_populares WHERE edicion = %s AND grupo = %s", (args.edicion, args.grupo)
+        ))
+
+    def mongodb():
+        return list(manager.get_mongodb_db()['arbitros_fases_finales'].find({'edicion': args.edicion}))
+
+    def neo4j():
+        with manager.get_neo4j_driver().session() as session:
+            return list(session.run(
+                "MATCH (a:Seleccion)-[r:JUEGA_CONTRA]->(b:Seleccion) RETURN a, r, b"
+            ))
+
+    def redis():
+        return manager.get_redis_client().zrevrange(
+            f"leaderboard:goles_seleccion:{args.edicion}", 0, -1, withscores=True
+        )
+
+    return {'cassandra': cassandra, 'mongodb': mongodb, 'neo4j': neo4j, 'redis': redis}
+
+
+def medir(lectura, repeticiones, db_mongo=None):
+    """
+    Ejecutar una lectura varias veces midiendo latencia y bytes
+
+    Returns:
+        dict: p50/p95 (ms), bytes del cliente (aproximados) y del servidor por
+        lectura, y el códec que usó el servidor de MongoDB
+    """
+    lectura()  # calentamiento: conexión, prepare y pools
+    io_inicio = leer_io()
+    red_inicio = bytes_red_mongo(db_mongo) if db_mongo is not None else None
+    codec_inicio = bytes_compresion_mongo(db_mongo) if db_mongo is not None else None
+    latencias = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        lectura()
+        latencias.append(time.perf_counter() - inicio)
+    io_fin = leer_io()
+    red_fin = bytes_red_mongo(db_mongo) if db_mongo is not None else None
+    codec_fin = bytes_compresion_mongo(db_mongo) if db_mongo is not None else None
+
+    latencias.sort()
+    resultado = {
+        'p50_ms': statistics.median(latencias) * 1000,
+        'p95_ms': latencias[max(0, int(round(0.95 * len(latencias))) - 1)] * 1000,
+        'bytes_cliente': None,
+        'bytes_servidor': None,
+        'codec': codec_mongo(codec_inicio, codec_fin)
+    }
+    if io_inicio and io_fin:
+        resultado['bytes_cliente'] = (
+            (io_fin[0] - io_inicio[0]) + (io_fin[1] - io_inicio[1])
+        ) / repeticiones
+    if red_inicio and red_fin:
+        resultado['bytes_servidor'] = (
+            (red_fin[0] - red_inicio[0]) + (red_fin[1] - red_inicio[1])
+        ) / repeticiones
+    return resultado
+
+
+def ejecutar_perfil(perfil, args):
+    """Medir todos los backends pedidos con un perfil de conexión"""
+    from db_manager import DatabaseManager
+
+    manager = DatabaseManager(perfil_conexion=perfil)
+    lecturas = crear_lecturas(manager, args)
+    resultados = {}
+    try:
+        for backend in args.backends:
+            try:
+                db_mongo = manager.get_mongodb_db() if backend == 'mongodb' else None
+                resultados[backend] = medir(lecturas[backend], args.repeticiones, db_mongo)
+                if backend == 'cassandra':
+                    resultados[backend]['codec'] = manager.cassandra_compresion or 'ninguno'
+            except Exception as e:
+                print(f"⚠️  {perfil}/{backend}: {e}")
+    finally:
+        manager.close_all()
+    return resultados
+
+
+def formatear_bytes(valor):
+    return f"{valor / 1024:>10.1f}" if valor is not None else f"{'-':>10}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparar los perfiles de conexión de los drivers")
+    parser.add_argument('--repeticiones', type=int, default=30)
+    parser.add_argument('--backends', nargs='+', default=['cassandra', 'mongodb', 'neo4j', 'redis'],
+                        choices=['cassandra', 'mongodb', 'neo4j', 'redis'])
+    parser.add_argument('--perfiles', nargs='+', default=['basico', 'optimizado'])
+    parser.add_argument('--env', help="Archivo .env con las bases a medir")
+    parser.add_argument('--json', help="Guardar los resultados en un archivo JSON")
+    parser.add_argument('--edicion', default='Mundial 2030')
+    parser.add_argument('--grupo', default='A')
+    args = parser.parse_args()
+
+    if args.env:
+        load_dotenv(args.env, override=True)
+
+    resultados = {}
+    for perfil in args.perfiles:
+        print(f"\n🔌 Perfil {perfil}...")
+        resultados[perfil] = ejecutar_perfil(perfil, args)
+
+    print("\n" + "=" * 90)
+    print(f"📈 PERFILES DE CONEXIÓN ({args.repeticiones} lecturas por backend)")
+    print("=" * 90)
+    print(f"{'Backend':<11} {'Perfil':<12} {'p50 ms':>9} {'p95 ms':>9} {'KB cliente*':>11} {'KB servidor':>11} "
+          f"{'Códec':>9}")
+    print("-" * 90)
+    for backend in args.backends:
+        for perfil in args.perfiles:
+            fila = resultados[perfil].get(backend)
+            if fila is None:
+                continue
+            print(f"{backend:<11} {perfil:<12} {fila['p50_ms']:>9.2f} {fila['p95_ms']:>9.2f} "
+                  f"{formatear_bytes(fila['bytes_cliente'])} {formatear_bytes(fila['bytes_servidor'])} "
+                  f"{fila['codec'] or '-':>9}")
+    print("-" * 90)
+    print("* Aproximado: rchar/wchar del proceso, incluye E/S que no es de red")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
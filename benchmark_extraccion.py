@@ -0,0 +1,132 @@
+"""
+Benchmark de los modos de extracción de PostgreSQL del motor ETL
+
+Compara, sobre la misma fuente y los mismos parámetros:
+
+- fetchall: SELECT con un cursor común y fetchall (toda la extracción en memoria)
+- cursor: cursor del lado del servidor con fetchmany (modo por defecto del motor)
+- copy: COPY (consulta) TO STDOUT parseado en lotes (ETL_EXTRACCION=copy)
+
+Reporta por modo segundos, filas por segundo y, con --memoria, el pico de
+memoria de Python (tracemalloc, que agrega costo a todos los modos por igual).
+
+Uso:
+    python benchmark_extraccion.py --modelo goleadores_ko_edicion \\
+        --parametros '[{"edicion": "Mundial 2022"}, {"edicion": "Mundial 2030"}]'
+"""
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from dotenv import load_dotenv
+
+MODOS = ('fetchall', 'cursor', 'copy')
+
+
+def extraer_fetchall(db_manager, spec, lista_parametros):
+    """Extracción de referencia: todas las filas de una vez con fetchall"""
+    filas = 0
+    for parametros in lista_parametros:
+        cursor = db_manager.get_postgresql_cursor()
+        try:
+            cursor.execute(spec.sql(), tuple(parametros[p] for p in spec.parametros))
+            filas += len(cursor.fetchall())
+        finally:
+            cursor.close()
+    return filas
+
+
+def extraer_motor(motor, spec, lista_parametros):
+    """Extracción por lotes con el modo configurado en el motor"""
+    metricas = {'filas_extraidas': 0, 'segundos_extraccion': 0.0}
+    for parametros in lista_parametros:
+        for _ in motor._extraer(spec, parametros, metricas):
+            pass
+    return metricas['filas_extraidas']
+
+
+def medir(extraer, repeticiones, memoria):
+    """
+    Repetir una extracción
+
+    Returns:
+        dict: filas, mediana de segundos, filas/s y pico de memoria (MB) si se pidió
+    """
+    extraer()  # calentamiento: conexión, planes y descripción de tipos
+    tiempos, picos, filas = [], [], 0
+    for _ in range(repeticiones):
+        if memoria:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        filas = extraer()
+        tiempos.append(time.perf_counter() - inicio)
+        if memoria:
+            picos.append(tracemalloc.get_traced_memory()[1] / (1024 * 1024))
+            tracemalloc.stop()
+    segundos = statistics.median(tiempos)
+    return {
+        'filas': filas,
+        'segundos': segundos,
+        'filas_por_segundo': filas / segundos if segundos else 0.0,
+        'pico_mb': max(picos) if picos else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparar fetchall, cursor y COPY en la extracción")
+    parser.add_argument('--modelo', default='goleadores_ko_edicion', help="Nombre del modelo de lectura")
+    parser.add_argument('--parametros', type=json.loads, default=[{'edicion': 'Mundial 2030'}],
+                        help="Lista JSON con los parámetros de cada extracción")
+    parser.add_argument('--modos', nargs='+', default=list(MODOS), choices=MODOS)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--tamanio-lote', type=int, default=None, help="Filas por lote (None = ETL_TAMANIO_LOTE)")
+    parser.add_argument('--memoria', action='store_true', help="Medir el pico de memoria con tracemalloc")
+    parser.add_argument('--env', help="Archivo .env con la base a medir")
+    parser.add_argument('--json', help="Guardar los resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    if args.env:
+        load_dotenv(args.env, override=True)
+
+    from db_manager import db_manager
+    from modelos_lectura import MODELOS
+    from pipeline_etl import EXTRACCION_COPY, EXTRACCION_CURSOR, MotorETL
+
+    spec = MODELOS[args.modelo]
+    extracciones = {
+        'fetchall': lambda: extraer_fetchall(db_manager, spec, args.parametros),
+        'cursor': lambda: extraer_motor(
+            MotorETL(tamanio_lote=args.tamanio_lote, extraccion=EXTRACCION_CURSOR), spec, args.parametros),
+        'copy': lambda: extraer_motor(
+            MotorETL(tamanio_lote=args.tamanio_lote, extraccion=EXTRACCION_COPY), spec, args.parametros),
+    }
+
+    resultados = {}
+    try:
+        for modo in args.modos:
+            print(f"⏱️  Midiendo {modo}...")
+            resultados[modo] = medir(extracciones[modo], args.repeticiones, args.memoria)
+    finally:
+        db_manager.close_all()
+
+    print("\n" + "=" * 70)
+    print(f"📈 EXTRACCIÓN DE {args.modelo} ({len(args.parametros)} extracciones, "
+          f"mediana de {args.repeticiones})")
+    print("=" * 70)
+    print(f"{'Modo':<10} {'Filas':>10} {'Segundos':>10} {'Filas/s':>12} {'Pico MB':>9}")
+    print("-" * 70)
+    for modo, fila in resultados.items():
+        pico = f"{fila['pico_mb']:>9.1f}" if fila['pico_mb'] is not None else f"{'-':>9}"
+        print(f"{modo:<10} {fila['filas']:>10} {fila['segundos']:>10.3f} {fila['filas_por_segundo']:>12.0f} {pico}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
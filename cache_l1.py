@@ -0,0 +1,234 @@
+"""
+Módulo de cache en proceso (L1) para las lecturas obtener_*
+
+Cache LRU acotada por cantidad de entradas y por bytes estimados, con TTL por
+entrada y coalescencia de requests (single-flight): si mil llamadores piden a
+la vez una clave que no está, solo el primero lee el backend y el resto espera
+su resultado.
+
+Las claves son tuplas cuyo primer elemento es el modelo de lectura (ej:
+'tabla_posiciones'); el ETL invalida el modelo completo al terminar de cargarlo.
+"""
+
+import copy
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from perfilado import perfilador
+
+
+def _estimar_bytes(valor, profundidad=3):
+    """Estimar el tamaño en memoria de un valor (contenedores hasta cierta profundidad)"""
+    tamanio = sys.getsizeof(valor)
+    if profundidad <= 0:
+        return tamanio
+    if isinstance(valor, dict):
+        tamanio += sum(
+            _estimar_bytes(k, profundidad - 1) + _estimar_bytes(v, profundidad - 1)
+            for k, v in valor.items()
+        )
+    elif isinstance(valor, (list, tuple, set, frozenset)):
+        tamanio += sum(_estimar_bytes(v, profundidad - 1) for v in valor)
+    return tamanio
+
+
+class _Entrada:
+    __slots__ = ('valor', 'expira', 'bytes')
+
+    def __init__(self, valor, expira, bytes_):
+        self.valor = valor
+        self.expira = expira
+        self.bytes = bytes_
+
+
+class _Vuelo:
+    """Lectura en curso de una clave, compartida por los llamadores concurrentes"""
+    __slots__ = ('evento', 'valor', 'error')
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.valor = None
+        self.error = None
+
+
+class CacheL1:
+    """Cache LRU con TTL, límite de entradas y de bytes, y single-flight"""
+
+    def __init__(self, ttl=5.0, max_entradas=1000, max_bytes=32 * 1024 * 1024,
+                 habilitada=True, reloj=time.monotonic):
+        """
+        Args:
+            ttl (float): Segundos de vida por defecto de cada entrada
+            max_entradas (int): Cantidad máxima de entradas
+            max_bytes (int): Tamaño máximo estimado del contenido
+            habilitada (bool): False = todas las lecturas van al backend
+            reloj (callable): Fuente de tiempo (monotónica)
+        """
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.habilitada = habilitada
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self._vuelos = {}
+        # modelo -> generación; una lectura iniciada antes de invalidar no se guarda
+        self._generaciones = {}
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.coalescidas = 0
+        self.desalojos = 0
+        self.expirados = 0
+
+    def obtener(self, clave, cargar, ttl=None, almacenable=None):
+        """
+        Obtener una clave de la cache o cargarla una sola vez para todos los llamadores
+
+        Args:
+            clave (tuple): (modelo, ...) hasheable
+            cargar (callable): Lectura al backend si la clave no está
+            ttl (float): Vida de la entrada (None = ttl de la cache)
+            almacenable (callable): valor -> bool; False = no guardar (ej: vacío por error)
+
+        Returns:
+            Copia superficial del valor cacheado o leído
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                if entrada.expira > self._reloj():
+                    self._entradas.move_to_end(clave)
+                    self.aciertos += 1
+                    return copy.copy(entrada.valor)
+                self._quitar(clave)
+                self.expirados += 1
+
+            vuelo = self._vuelos.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = self._vuelos[clave] = _Vuelo()
+                self.fallos += 1
+                generacion = self._generaciones.get(clave[0], 0)
+            else:
+                self.coalescidas += 1
+
+        if not lider:
+            vuelo.evento.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return copy.copy(vuelo.valor)
+
+        try:
+            valor = cargar()
+            vuelo.valor = valor
+        except Exception as e:
+            vuelo.error = e
+            raise
+        finally:
+            with self._lock:
+                self._vuelos.pop(clave, None)
+                if (vuelo.error is None
+                        and (almacenable is None or almacenable(vuelo.valor))
+                        and self._generaciones.get(clave[0], 0) == generacion):
+                    self._guardar(clave, vuelo.valor, self.ttl if ttl is None else ttl)
+            vuelo.evento.set()
+        return copy.copy(valor)
+
+    def invalidar(self, modelo=None):
+        """
+        Descartar las entradas de un modelo de lectura (None = toda la cache)
+
+        Returns:
+            int: Entradas descartadas
+        """
+        with self._lock:
+            claves = [c for c in self._entradas if modelo is None or c[0] == modelo]
+            for clave in claves:
+                self._quitar(clave)
+            modelos = {c[0] for c in self._vuelos} | set(self._generaciones)
+            for m in (modelos if modelo is None else {modelo}):
+                self._generaciones[m] = self._generaciones.get(m, 0) + 1
+            return len(claves)
+
+    def estadisticas(self):
+        """Contadores de la cache"""
+        total = self.aciertos + self.fallos + self.coalescidas
+        return {
+            'entradas': len(self._entradas),
+            'bytes': self.bytes,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'coalescidas': self.coalescidas,
+            'desalojos': self.desalojos,
+            'expirados': self.expirados,
+            'tasa_aciertos': ((self.aciertos + self.coalescidas) / total) if total else 0.0
+        }
+
+    def _guardar(self, clave, valor, ttl):
+        tamanio = _estimar_bytes(valor)
+        if tamanio > self.max_bytes:
+            return
+        if clave in self._entradas:
+            self._quitar(clave)
+        self._entradas[clave] = _Entrada(valor, self._reloj() + ttl, tamanio)
+        self.bytes += tamanio
+        while len(self._entradas) > self.max_entradas or self.bytes > self.max_bytes:
+            antigua, _ = next(iter(self._entradas.items()))
+            self._quitar(antigua)
+            self.desalojos += 1
+
+    def _quitar(self, clave):
+        entrada = self._entradas.pop(clave)
+        self.bytes -= entrada.bytes
+
+
+# Instancia global
+cache = CacheL1(
+    ttl=float(os.getenv('FIFA_CACHE_TTL', 5.0)),
+    max_entradas=int(os.getenv('FIFA_CACHE_MAX_ENTRADAS', 1000)),
+    max_bytes=int(os.getenv('FIFA_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+    habilitada=os.getenv('FIFA_CACHE', 'true').lower() == 'true'
+)
+
+
+def cacheado(modelo, ttl=None):
+    """
+    Decorador para cachear una función obtener_* en la cache L1
+
+    Las lecturas con page_token o stream van siempre al backend, y los
+    resultados vacíos (sin datos o por error) no se guardan.
+
+    Args:
+        modelo (str): Modelo de lectura, usado para invalidar tras el ETL
+        ttl (float): Vida de las entradas (None = ttl de la cache)
+    """
+    def decorador(funcion):
+        firma = inspect.signature(funcion)
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if perfilador.activo:
+                # Con el perfilado activo cada lectura va al backend para registrar su plan
+                with perfilador.operacion(funcion.__name__):
+                    return funcion(*args, **kwargs)
+            if not cache.habilitada:
+                return funcion(*args, **kwargs)
+            argumentos = firma.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            if argumentos.arguments.get('stream') or argumentos.arguments.get('page_token'):
+                return funcion(*args, **kwargs)
+            clave = (modelo, funcion.__name__, tuple(argumentos.arguments.items()))
+            try:
+                hash(clave)
+            except TypeError:
+                return funcion(*args, **kwargs)
+            return cache.obtener(clave, lambda: funcion(*args, **kwargs), ttl, almacenable=bool)
+
+        return envoltura
+    return decorador
@@ -0,0 +1,162 @@
+"""
+Módulo del calendario de partidos por día en Cassandra
+
+`partidos_fecha_estadio` está particionada por estadio, así que "todos los
+partidos de un día" recorre todas las particiones. El calendario guarda los
+mismos partidos en `calendario_partidos`, con una partición por día ordenada
+por hora de inicio: la agenda de un día es una lectura de una sola partición
+y la de las próximas horas, una por cada día que abarca.
+
+Se carga desde la misma extracción que `etl_partidos_fecha_estadio`. Como la
+fecha forma parte de la clave, reprogramar un partido no pisa su fila anterior:
+`calendario_por_partido` guarda la última fecha escrita de cada partido y
+guardar() borra la fila vieja antes de escribir la nueva.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+TABLA = 'calendario_partidos'
+
+# Última fecha escrita de cada partido (para borrar su fila al reprogramarlo)
+TABLA_POR_PARTIDO = 'calendario_por_partido'
+
+CAMPOS = (
+    'dia', 'fecha', 'id_partido', 'estadio',
+    'seleccionLocal', 'seleccionVisitante', 'golesLocal', 'golesVisitante',
+)
+
+CONSULTA_RANGO = f"""
+    SELECT fecha, id_partido, estadio, seleccionLocal, seleccionVisitante, golesLocal, golesVisitante
+    FROM {TABLA}
+    WHERE dia = ? AND fecha >= ? AND fecha < ?
+"""
+
+
+def filas_calendario(filas):
+    """
+    Convertir filas de partidos_fecha_estadio en filas del calendario
+
+    Args:
+        filas (list): Dicts con fecha, id_partido, estadio, seleccionLocal, ...
+
+    Returns:
+        list: Tuplas en el orden de CAMPOS (se omiten partidos sin fecha)
+    """
+    return [
+        (fila['fecha'].date(),) + tuple(fila[c] for c in CAMPOS[1:])
+        for fila in filas if fila['fecha'] is not None
+    ]
+
+
+def _al_milisegundo(fecha):
+    """Truncar a la precisión de TIMESTAMP para comparar con lo leído de Cassandra"""
+    return fecha.replace(microsecond=fecha.microsecond // 1000 * 1000)
+
+
+def guardar(session, filas, execution_profile=None, concurrencia=None):
+    """
+    Escribir filas del calendario, borrando antes las de partidos reprogramados
+
+    Se lee la fecha anterior de cada partido en calendario_por_partido; si
+    cambió, se borra la fila vieja (que puede estar en otra partición de día)
+    y recién después se escriben la fila nueva y la fecha nueva.
+
+    Args:
+        session: Sesión de Cassandra
+        filas (list): Tuplas de filas_calendario
+        execution_profile (str): Perfil de ejecución a usar
+        concurrencia (int): Escrituras en vuelo (None = ETL_CONCURRENCIA)
+
+    Returns:
+        int: Cantidad de filas escritas
+    """
+    from cassandra.concurrent import execute_concurrent_with_args
+
+    insert = session.prepare(
+        f"INSERT INTO {TABLA} ({', '.join(CAMPOS)}) VALUES ({', '.join(['?'] * len(CAMPOS))})"
+    )
+    select_previa = session.prepare(
+        f"SELECT dia, fecha FROM {TABLA_POR_PARTIDO} WHERE id_partido = ?"
+    )
+    select_previa.is_idempotent = True
+    delete = session.prepare(f"DELETE FROM {TABLA} WHERE dia = ? AND fecha = ? AND id_partido = ?")
+    insert_previa = session.prepare(
+        f"INSERT INTO {TABLA_POR_PARTIDO} (id_partido, dia, fecha) VALUES (?, ?, ?)"
+    )
+    concurrencia = concurrencia or int(os.getenv('ETL_CONCURRENCIA', 32))
+    kwargs = {}
+    if execution_profile is not None:
+        kwargs['execution_profile'] = execution_profile
+
+    def ejecutar(statement, parametros):
+        return execute_concurrent_with_args(
+            session, statement, parametros, concurrency=concurrencia, raise_on_first_error=True, **kwargs
+        )
+
+    previas = ejecutar(select_previa, [(fila[2],) for fila in filas])
+    obsoletas = []
+    for fila, (_, rs) in zip(filas, previas):
+        previa = rs.one()
+        if previa is not None and previa.fecha != _al_milisegundo(fila[1]):
+            obsoletas.append((previa.dia, previa.fecha, fila[2]))
+
+    ejecutar(delete, obsoletas)
+    ejecutar(insert, filas)
+    ejecutar(insert_previa, [(fila[2], fila[0], fila[1]) for fila in filas])
+    return len(filas)
+
+
+def registrar_fechas_existentes(session):
+    """
+    Completar calendario_por_partido a partir de las filas ya cargadas
+
+    Los partidos con una sola fila quedan registrados con su fecha. Los que ya
+    aparecen más de una vez (reprogramados antes de existir el registro) se
+    borran: no hay forma de saber cuál es la actual, y el próximo
+    etl_partidos_fecha_estadio los vuelve a escribir.
+
+    Args:
+        session: Sesión de Cassandra con el keyspace seleccionado
+
+    Returns:
+        tuple: (partidos registrados, filas borradas)
+    """
+    por_partido = {}
+    for row in session.execute(f"SELECT dia, fecha, id_partido FROM {TABLA}"):
+        por_partido.setdefault(row.id_partido, []).append((row.dia, row.fecha))
+
+    registrados = borradas = 0
+    for id_partido, filas in por_partido.items():
+        if len(filas) == 1:
+            dia, fecha = filas[0]
+            session.execute(
+                f"INSERT INTO {TABLA_POR_PARTIDO} (id_partido, dia, fecha) VALUES (%s, %s, %s)",
+                (id_partido, dia, fecha)
+            )
+            registrados += 1
+            continue
+        for dia, fecha in filas:
+            session.execute(
+                f"DELETE FROM {TABLA} WHERE dia = %s AND fecha = %s AND id_partido = %s",
+                (dia, fecha, id_partido)
+            )
+            borradas += 1
+    return registrados, borradas
+
+
+def rangos_por_dia(desde, hasta):
+    """
+    Partir el intervalo [desde, hasta) en un rango por día
+
+    Returns:
+        list: Tuplas (dia, inicio, fin) listas para bindear en CONSULTA_RANGO
+    """
+    rangos = []
+    inicio = desde
+    while inicio < hasta:
+        siguiente = datetime.combine(inicio.date() + timedelta(days=1), datetime.min.time())
+        fin = min(siguiente, hasta)
+        rangos.append((inicio.date(), inicio, fin))
+        inicio = fin
+    return rangos
@@ -0,0 +1,108 @@
+"""
+Módulo de caminos de eliminación precalculados
+
+El cuadro de eliminación directa de una edición es chico y no cambia una vez
+cargado, así que al cargar el grafo se calculan con BFS los caminos más cortos
+entre todos los pares de selecciones y se guardan en un hash de Redis. La
+búsqueda de un camino pasa a ser un HGET; Neo4j queda como respaldo.
+"""
+
+import json
+import uuid
+from collections import deque
+
+
+def clave_caminos(edicion):
+    """Clave del hash de caminos de una edición"""
+    return f"caminos_ko:{edicion}"
+
+
+def campo_par(pais_a, pais_b):
+    """Campo del hash para un par ordenado de selecciones"""
+    return f"{pais_a}|{pais_b}"
+
+
+def calcular_caminos(filas):
+    """
+    Calcular el camino más corto entre cada par de selecciones (grafo no dirigido)
+
+    Args:
+        filas (list): Dicts con sel_a, pais_a, sel_b, pais_b, id_partido, fase
+
+    Returns:
+        dict: (pais_a, pais_b) -> {'camino_selecciones', 'camino_partidos'} o None
+        si no hay camino entre ambas
+    """
+    nombres = {}
+    vecinos = {}
+    for fila in filas:
+        nombres[fila['sel_a']] = fila['pais_a']
+        nombres[fila['sel_b']] = fila['pais_b']
+        partido = {'fase': fila['fase'], 'id_partido': fila['id_partido']}
+        vecinos.setdefault(fila['sel_a'], []).append((fila['sel_b'], partido))
+        vecinos.setdefault(fila['sel_b'], []).append((fila['sel_a'], partido))
+
+    caminos = {}
+    for origen in vecinos:
+        # BFS desde origen guardando el nodo y el partido por el que se llegó
+        previo = {origen: None}
+        cola = deque([origen])
+        while cola:
+            actual = cola.popleft()
+            for vecino, partido in vecinos[actual]:
+                if vecino not in previo:
+                    previo[vecino] = (actual, partido)
+                    cola.append(vecino)
+
+        for destino in vecinos:
+            if destino == origen:
+                continue
+            if destino not in previo:
+                caminos[(nombres[origen], nombres[destino])] = None
+                continue
+            selecciones, partidos = [nombres[destino]], []
+            nodo = destino
+            while previo[nodo] is not None:
+                nodo, partido = previo[nodo]
+                selecciones.append(nombres[nodo])
+                partidos.append(partido)
+            caminos[(nombres[origen], nombres[destino])] = {
+                'camino_selecciones': selecciones[::-1],
+                'camino_partidos': partidos[::-1]
+            }
+    return caminos
+
+
+def guardar(r, edicion, caminos):
+    """
+    Reemplazar atómicamente los caminos de una edición
+
+    Returns:
+        int: Cantidad de pares guardados
+    """
+    clave = clave_caminos(edicion)
+    temporal = f"{clave}:tmp:{uuid.uuid4().hex}"
+    pipe = r.pipeline(transaction=True)
+    if caminos:
+        pipe.hset(temporal, mapping={
+            campo_par(a, b): json.dumps(camino, ensure_ascii=False) for (a, b), camino in caminos.items()
+        })
+        pipe.rename(temporal, clave)
+    else:
+        pipe.delete(clave)
+    pipe.execute()
+    return len(caminos)
+
+
+def buscar(r, edicion, pais_a, pais_b):
+    """
+    Buscar un camino precalculado
+
+    Returns:
+        tuple: (encontrado, camino) donde camino es None si las selecciones no
+        están conectadas; encontrado=False si el par no está precalculado
+    """
+    valor = r.hget(clave_caminos(edicion), campo_par(pais_a, pais_b))
+    if valor is None:
+        return False, None
+    return True, json.loads(valor)
@@ -0,0 +1,122 @@
+"""
+Módulo de circuit breaker para los backends de base de datos
+
+Cuando un backend acumula fallos el circuito se abre y los llamadores fallan
+rápido (BackendNoDisponible) en lugar de esperar el timeout del driver en cada
+request. Pasada la espera, un único llamador sondea el backend (semiabierto):
+si responde el circuito se cierra, si no se vuelve a abrir duplicando la espera.
+"""
+
+import threading
+import time
+
+# Estados del circuito
+CERRADO = 'cerrado'
+ABIERTO = 'abierto'
+SEMIABIERTO = 'semiabierto'
+
+
+class BackendNoDisponible(Exception):
+    """El circuito del backend está abierto o el backend no respondió"""
+
+    def __init__(self, backend, reintento_en=None):
+        self.backend = backend
+        self.reintento_en = reintento_en
+        mensaje = f"{backend} no disponible"
+        if reintento_en:
+            mensaje += f" (reintento en {reintento_en:.1f}s)"
+        super().__init__(mensaje)
+
+
+class CircuitBreaker:
+    """Circuit breaker con backoff exponencial y sondeo semiabierto"""
+
+    def __init__(self, nombre, umbral_fallos=2, ventana=30.0, espera_base=2.0, espera_maxima=60.0,
+                 reloj=time.monotonic):
+        """
+        Args:
+            nombre (str): Backend protegido
+            umbral_fallos (int): Fallos dentro de la ventana que abren el circuito
+            ventana (float): Segundos tras los cuales se olvidan los fallos
+            espera_base (float): Primera espera con el circuito abierto
+            espera_maxima (float): Tope de la espera exponencial
+            reloj (callable): Fuente de tiempo (monotónica)
+        """
+        self.nombre = nombre
+        self.umbral_fallos = umbral_fallos
+        self.ventana = ventana
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self.estado = CERRADO
+        self.fallos = []
+        self.espera = espera_base
+        self.proximo_intento = 0.0
+        self.aperturas = 0
+
+    def permitir(self):
+        """
+        Decidir si un llamador puede usar el backend
+
+        Returns:
+            bool: True si el circuito está cerrado o si este llamador es la sonda
+        """
+        with self._lock:
+            if self.estado == CERRADO:
+                return True
+            if self.estado == ABIERTO and self._reloj() >= self.proximo_intento:
+                self.estado = SEMIABIERTO
+                return True
+            return False
+
+    def es_sonda(self):
+        """True si el circuito está semiabierto (el llamador actual sondea)"""
+        return self.estado == SEMIABIERTO
+
+    def rechaza(self):
+        """True si el circuito está abierto y todavía no venció la espera"""
+        return self.estado == ABIERTO and self._reloj() < self.proximo_intento
+
+    def registrar_exito(self):
+        """Cerrar el circuito y reiniciar el backoff"""
+        with self._lock:
+            self.estado = CERRADO
+            self.fallos = []
+            self.espera = self.espera_base
+
+    def registrar_fallo(self):
+        """Contar un fallo; abre el circuito al superar el umbral o si falla la sonda"""
+        with self._lock:
+            ahora = self._reloj()
+            if self.estado == SEMIABIERTO:
+                self.espera = min(self.espera * 2, self.espera_maxima)
+                self._abrir(ahora)
+                return
+
+            self.fallos = [t for t in self.fallos if ahora - t < self.ventana]
+            self.fallos.append(ahora)
+            if self.estado == CERRADO and len(self.fallos) >= self.umbral_fallos:
+                self._abrir(ahora)
+
+    def _abrir(self, ahora):
+        self.estado = ABIERTO
+        self.proximo_intento = ahora + self.espera
+        self.aperturas += 1
+
+    def segundos_para_reintento(self):
+        """Segundos que faltan para el próximo sondeo (0 si no está abierto)"""
+        if self.estado != ABIERTO:
+            return 0.0
+        return max(0.0, self.proximo_intento - self._reloj())
+
+    def salud(self):
+        """Resumen del estado del circuito"""
+        return {
+            'backend': self.nombre,
+            'estado': self.estado,
+            'fallos_recientes': len(self.fallos),
+            'espera': self.espera,
+            'reintento_en': self.segundos_para_reintento(),
+            'aperturas': self.aperturas
+        }
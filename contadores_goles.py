@@ -0,0 +1,223 @@
+"""
+Módulo de contadores de goles en Cassandra
+
+Cada gol suma 1 a un contador por (edición, selección) y, si es de fase KO, a
+otro por (edición, jugador), sin volver a agregar la edición en PostgreSQL. Los
+incrementos de un COUNTER no son idempotentes (un reintento puede contar dos
+veces), por eso una reconciliación periódica compara los contadores con los
+totales de PostgreSQL y aplica la diferencia.
+"""
+
+import logging
+import os
+import sys
+import time
+
+from cache_l1 import cache
+from db_manager import db_manager
+import leaderboards
+
+logger = logging.getLogger(__name__)
+
+TABLA_SELECCION = 'goles_seleccion_contador'
+TABLA_GOLEADORES_KO = 'goleadores_ko_contador'
+
+# tabla -> modelo de lectura cacheado que la expone
+MODELOS_CACHE = {
+    TABLA_SELECCION: 'goles_seleccion_edicion',
+    TABLA_GOLEADORES_KO: 'goleadores_ko_contador',
+}
+
+# tabla -> columna de la clave de clustering
+CLAVES = {
+    TABLA_SELECCION: 'seleccion',
+    TABLA_GOLEADORES_KO: 'id_jugador',
+}
+
+_statements = {}
+
+# (tabla, edicion) cuyos contadores ya fueron sembrados por una reconciliación
+_sembradas = set()
+
+
+def _preparar(session, consulta):
+    """Preparar un statement una vez por sesión"""
+    clave = (id(session), consulta)
+    if clave not in _statements:
+        _statements[clave] = session.prepare(consulta)
+    return _statements[clave]
+
+
+def _incrementar(session, tabla, edicion, miembro, goles):
+    stmt = _preparar(
+        session,
+        f"UPDATE {tabla} SET goles = goles + ? WHERE edicion = ? AND {CLAVES[tabla]} = ?"
+    )
+    return session.execute_async(
+        stmt, (goles, edicion, miembro),
+        execution_profile=db_manager.cassandra_perfil_escritura
+    )
+
+
+def _sembrada(session, tabla, edicion):
+    """True si la partición de contadores de la edición ya existe"""
+    if (tabla, edicion) in _sembradas:
+        return True
+    stmt = _preparar(session, f"SELECT goles FROM {tabla} WHERE edicion = ? LIMIT 1")
+    stmt.is_idempotent = True  # habilita la ejecución especulativa
+    if session.execute(stmt, (edicion,), execution_profile=db_manager.cassandra_perfil_lectura).one() is None:
+        return False
+    _sembradas.add((tabla, edicion))
+    return True
+
+
+def registrar_gol(edicion, seleccion, id_jugador=None, ko=False, goles=1):
+    """
+    Contabilizar un gol (o una corrección con goles=-1) en los contadores
+
+    Los leaderboards de Redis se actualizan con ZINCRBY si Redis responde.
+    Si la edición todavía no tiene contadores no se incrementa nada: el
+    primer gol crearía una partición con una sola selección, que los
+    lectores preferirían a la tabla del ETL. El llamador agenda entonces el
+    refresco completo, cuya reconciliación siembra los contadores.
+
+    Args:
+        edicion (str): Nombre de la edición del mundial
+        seleccion (str): Selección que convirtió el gol
+        id_jugador (int): Autor del gol (necesario para los goleadores KO)
+        ko (bool): True si el partido es de eliminación directa
+        goles (int): Cantidad a sumar
+
+    Returns:
+        bool: True si los contadores de Cassandra se actualizaron, False si
+        hubo un error o la edición no está sembrada
+    """
+    try:
+        session = db_manager.get_cassandra_session()
+        tablas = [TABLA_SELECCION] + ([TABLA_GOLEADORES_KO] if ko and id_jugador is not None else [])
+        sin_sembrar = [tabla for tabla in tablas if not _sembrada(session, tabla, edicion)]
+        if sin_sembrar:
+            logger.info("Contadores %s de %s sin sembrar: se recarga la edición", sin_sembrar, edicion)
+            return False
+        futuros = [_incrementar(session, TABLA_SELECCION, edicion, seleccion, goles)]
+        if ko and id_jugador is not None:
+            futuros.append(_incrementar(session, TABLA_GOLEADORES_KO, edicion, int(id_jugador), goles))
+        for futuro in futuros:
+            futuro.result()
+    except Exception as e:
+        logger.error("Error contabilizando gol de %s en %s: %s", seleccion, edicion, e)
+        return False
+
+    cache.invalidar(MODELOS_CACHE[TABLA_SELECCION])
+    if ko and id_jugador is not None:
+        cache.invalidar(MODELOS_CACHE[TABLA_GOLEADORES_KO])
+
+    try:
+        r = db_manager.get_redis_client()
+        leaderboards.incrementar(r, leaderboards.LEADERBOARD_GOLES_SELECCION, edicion, seleccion, goles)
+        if ko and id_jugador is not None:
+            leaderboards.incrementar(r, leaderboards.LEADERBOARD_GOLEADORES_KO, edicion, id_jugador, goles)
+    except Exception as e:
+        logger.warning("No se pudo actualizar el leaderboard de %s: %s", edicion, e)
+    return True
+
+
+def leer(tabla, edicion):
+    """
+    Leer los contadores de una edición
+
+    Returns:
+        dict: miembro (selección o id de jugador) -> goles
+    """
+    session = db_manager.get_cassandra_session()
+    stmt = _preparar(session, f"SELECT {CLAVES[tabla]}, goles FROM {tabla} WHERE edicion = ?")
+    stmt.is_idempotent = True  # habilita la ejecución especulativa
+    rows = session.execute(stmt, (edicion,), execution_profile=db_manager.cassandra_perfil_lectura)
+    return {row[0]: row[1] for row in rows}
+
+
+def reconciliar(tabla, edicion, totales):
+    """
+    Llevar los contadores de una edición a los totales de PostgreSQL
+
+    Un COUNTER no admite asignación, así que se incrementa cada miembro en la
+    diferencia entre el total esperado y el valor actual.
+
+    Args:
+        tabla (str): TABLA_SELECCION o TABLA_GOLEADORES_KO
+        edicion (str): Nombre de la edición del mundial
+        totales (dict): miembro -> goles según PostgreSQL
+
+    Returns:
+        dict: miembro -> corrección aplicada (solo los que diferían)
+    """
+    actuales = leer(tabla, edicion)
+    correcciones = {}
+    for miembro in set(totales) | set(actuales):
+        diferencia = totales.get(miembro, 0) - actuales.get(miembro, 0)
+        if diferencia:
+            correcciones[miembro] = diferencia
+
+    if correcciones:
+        session = db_manager.get_cassandra_session()
+        futuros = [
+            _incrementar(session, tabla, edicion, miembro, diferencia)
+            for miembro, diferencia in correcciones.items()
+        ]
+        for futuro in futuros:
+            futuro.result()
+        cache.invalidar(MODELOS_CACHE[tabla])
+        logger.info("Contadores %s de %s corregidos: %s", tabla, edicion, correcciones)
+    if totales:
+        _sembradas.add((tabla, edicion))
+    return correcciones
+
+
+def reconciliar_edicion(edicion):
+    """
+    Reconciliar los contadores de una edición contra PostgreSQL
+
+    Returns:
+        dict: tabla -> correcciones aplicadas
+    """
+    cursor = db_manager.get_postgresql_cursor()
+    try:
+        cursor.execute("SELECT * FROM get_goles_por_seleccion_edicion(%s)", (edicion,))
+        por_seleccion = {row[1]: row[2] for row in cursor.fetchall()}
+        cursor.execute("SELECT * FROM get_goleadores_fases_ko(%s)", (edicion,))
+        por_goleador = {row[0]: row[4] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+    return {
+        TABLA_SELECCION: reconciliar(TABLA_SELECCION, edicion, por_seleccion),
+        TABLA_GOLEADORES_KO: reconciliar(TABLA_GOLEADORES_KO, edicion, por_goleador),
+    }
+
+
+def reconciliar_periodicamente(ediciones, intervalo=None):
+    """
+    Job de reconciliación: reconciliar las ediciones cada `intervalo` segundos
+
+    Args:
+        ediciones (list): Ediciones a mantener reconciliadas
+        intervalo (float): Segundos entre pasadas (None = FIFA_RECONCILIACION_INTERVALO)
+    """
+    intervalo = intervalo or float(os.getenv('FIFA_RECONCILIACION_INTERVALO', 300))
+    while True:
+        for edicion in ediciones:
+            try:
+                reconciliar_edicion(edicion)
+            except Exception as e:
+                logger.error("Error reconciliando %s: %s", edicion, e)
+        time.sleep(intervalo)
+
+
+if __name__ == "__main__":
+    # Uso: python contadores_goles.py "Mundial 2026" "Mundial 2030"
+    try:
+        reconciliar_periodicamente(sys.argv[1:])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db_manager.close_all()
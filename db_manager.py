@@ -2,13 +2,15 @@
 Módulo para manejar conexiones a las bases de datos
 """
 
+import importlib.util
 import os
+import time
 from dotenv import load_dotenv
-import psycopg2
 from urllib.parse import urlparse
-from cassandra.cluster import Cluster
 import logging
 from log_config import setup_logging
+import migraciones_cassandra
+from circuit_breaker import BackendNoDisponible, CircuitBreaker
 
 # Asegurar configuración de logging (log_config ya configura en import)
 setup_logging()
@@ -16,280 +18,663 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Perfiles de ejecución de Cassandra (camino de lectura y de escritura)
+PERFIL_LECTURA = 'lectura'
+PERFIL_ESCRITURA = 'escritura'
+
+# Backends protegidos por circuit breaker
+BACKENDS = ('postgresql', 'postgresql_replica', 'cassandra', 'mongodb', 'neo4j', 'redis')
+
+# Atraso de la réplica: 0 si ya reprodujo todo lo recibido (el primario puede
+# estar sin escrituras y el último replay ser viejo); None si no es una réplica
+CONSULTA_ATRASO_REPLICA = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Perfiles de conexión (FIFA_PERFIL_CONEXION): compresión, tamaños de página y
+# pools por backend. 'basico' son los valores por defecto de cada driver.
+# PostgreSQL no tiene compresión de protocolo en libpq y el tamaño de sus
+# lotes lo define ETL_TAMANIO_LOTE; el protocolo de Redis y el Bolt de Neo4j
+# no comprimen, así que en ellos el perfil solo ajusta páginas y pools.
+PERFIL_OPTIMIZADO = 'optimizado'
+PERFIL_BASICO = 'basico'
+PERFILES_CONEXION = {
+    PERFIL_OPTIMIZADO: {
+        # compression=None: se usa CASSANDRA_COMPRESSION
+        'cassandra': {'compression': None, 'fetch_size': 5000},
+        # El servidor elige el primer compresor que soporte de la lista (zstd
+        # necesita zstandard; zlib viene con Python)
+        'mongodb': {'compressors': 'zstd,zlib', 'zlibCompressionLevel': 6,
+                    'maxPoolSize': 50, 'minPoolSize': 2},
+        'neo4j': {'fetch_size': 2000, 'max_connection_pool_size': 50},
+        'redis': {'max_connections': 50, 'socket_keepalive': True},
+    },
+    PERFIL_BASICO: {
+        'cassandra': {'compression': False, 'fetch_size': 5000},
+        'mongodb': {'maxPoolSize': 100, 'minPoolSize': 0},
+        'neo4j': {'fetch_size': 1000, 'max_connection_pool_size': 100},
+        'redis': {},
+    },
+}
+
+# Librería de Python que necesita cada códec de compresión (None = incluida)
+LIBRERIAS_COMPRESION = {'lz4': 'lz4', 'snappy': 'snappy', 'zstd': 'zstandard', 'zlib': None}
+
+
+def codecs_instalados(codecs):
+    """
+    Filtrar códecs de compresión a los que tienen su librería instalada
+
+    Sin la librería, el driver de Cassandra desactiva la compresión y pymongo
+    quita el compresor de la lista, en ambos casos solo con un warning.
+
+    Args:
+        codecs (list): Nombres de códec en orden de preferencia
+
+    Returns:
+        list: Los códecs utilizables, en el mismo orden
+    """
+    return [
+        codec for codec in codecs
+        if codec in LIBRERIAS_COMPRESION and (
+            LIBRERIAS_COMPRESION[codec] is None
+            or importlib.util.find_spec(LIBRERIAS_COMPRESION[codec]) is not None
+        )
+    ]
+
 
 class DatabaseManager:
     """Gestor de conexiones a las bases de datos"""
     
-    def __init__(self):
+    def __init__(self, perfil_conexion=None):
+        """
+        Args:
+            perfil_conexion (str): Clave de PERFILES_CONEXION (None = FIFA_PERFIL_CONEXION)
+        """
         self.pg_conn = None
+        self.pg_listen_conn = None
+        self.pg_replica_conn = None
         self.cassandra_cluster = None
         self.cassandra_session = None
         self.mongodb_client = None
         self.mongodb_db = None
         self.neo4j_driver = None
+        self.redis_client = None
+        # Códec de Cassandra y compresores ofrecidos a MongoDB en la conexión actual
+        self.cassandra_compresion = None
+        self.mongodb_compresores = []
+        # Perfil de Cassandra usado por las lecturas (obtener_*) y por el ETL (etl_*)
+        self.cassandra_perfil_lectura = os.getenv('CASSANDRA_PERFIL_LECTURA', PERFIL_LECTURA)
+        self.cassandra_perfil_escritura = os.getenv('CASSANDRA_PERFIL_ESCRITURA', PERFIL_ESCRITURA)
+        # Réplica de solo lectura para las extracciones del ETL
+        self.replica_url = os.getenv('DATABASE_REPLICA_URL') or None
+        self.replica_atraso_maximo = float(os.getenv('FIFA_REPLICA_ATRASO_MAXIMO', 30))
+        self.replica_intervalo_atraso = float(os.getenv('FIFA_REPLICA_INTERVALO_ATRASO', 5))
+        self.replica_atraso = None
+        self._replica_atraso_medido = 0.0
+        # Compresión, páginas y pools de todos los drivers
+        self.perfil_conexion = perfil_conexion or os.getenv('FIFA_PERFIL_CONEXION', PERFIL_OPTIMIZADO)
+        if self.perfil_conexion not in PERFILES_CONEXION:
+            logger.warning("Perfil de conexión desconocido %s, usando %s", self.perfil_conexion, PERFIL_OPTIMIZADO)
+            self.perfil_conexion = PERFIL_OPTIMIZADO
+        # Un circuit breaker por backend para fallar rápido si está caído
+        self.breakers = {
+            backend: CircuitBreaker(
+                backend,
+                umbral_fallos=int(os.getenv('FIFA_BREAKER_FALLOS', 2)),
+                espera_base=float(os.getenv('FIFA_BREAKER_ESPERA', 2.0)),
+                espera_maxima=float(os.getenv('FIFA_BREAKER_ESPERA_MAXIMA', 60.0))
+            )
+            for backend in BACKENDS
+        }
     
     def connect_postgresql(self):
-        """Conectar a PostgreSQL (Supabase)"""
+        """
+        Conectar a PostgreSQL (Supabase)
+
+        El driver se importa recién al conectar, y si ya hay una conexión
+        abierta se reutiliza (descartando una transacción que quedó fallida).
+        """
+        if self.breakers['postgresql'].rechaza():
+            return False
         try:
-            database_url = os.getenv('DATABASE_URL')
-            result = urlparse(database_url)
+            from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+
+            if self.pg_conn and not self.pg_conn.closed:
+                if self.pg_conn.get_transaction_status() == TRANSACTION_STATUS_INERROR:
+                    self.pg_conn.rollback()
+                return True
             
-            self.pg_conn = psycopg2.connect(
-                database=result.path[1:],
-                user=result.username,
-                password=result.password,
-                host=result.hostname,
-                port=result.port
-            )
+            self.pg_conn = self._abrir_postgresql(os.getenv('DATABASE_URL'))
+            self.breakers['postgresql'].registrar_exito()
             return True
         except Exception as e:
+            self.breakers['postgresql'].registrar_fallo()
             return False
     
+    def connect_postgresql_listener(self):
+        """
+        Conectar a PostgreSQL para LISTEN/NOTIFY
+
+        LISTEN necesita autocommit, así que usa su propia conexión y no
+        interfiere con los cursores del ETL sobre pg_conn.
+        """
+        if self.breakers['postgresql'].rechaza():
+            return False
+        try:
+            self.pg_listen_conn = self._abrir_postgresql(os.getenv('DATABASE_URL'))
+            self.pg_listen_conn.set_session(autocommit=True)
+            self.breakers['postgresql'].registrar_exito()
+            return True
+        except Exception as e:
+            self.breakers['postgresql'].registrar_fallo()
+            logger.error("Error conectando listener de PostgreSQL: %s", e)
+            return False
+    
+    def connect_postgresql_replica(self):
+        """
+        Conectar a la réplica de lectura de PostgreSQL (DATABASE_REPLICA_URL)
+
+        La sesión es de solo lectura: la réplica se usa únicamente para
+        extraer, así las extracciones no compiten con las escrituras del primario.
+        """
+        if not self.replica_url or self.breakers['postgresql_replica'].rechaza():
+            return False
+        try:
+            if self.pg_replica_conn and not self.pg_replica_conn.closed:
+                return True
+            
+            self.pg_replica_conn = self._abrir_postgresql(self.replica_url)
+            self.pg_replica_conn.set_session(readonly=True)
+            self.replica_atraso = None
+            self._replica_atraso_medido = 0.0
+            self.breakers['postgresql_replica'].registrar_exito()
+            return True
+        except Exception as e:
+            self.pg_replica_conn = None
+            self.breakers['postgresql_replica'].registrar_fallo()
+            logger.error("Error conectando a la réplica de PostgreSQL: %s", e)
+            return False
+    
+    def abrir_postgresql_propia(self):
+        """
+        Abrir una conexión al primario que no comparte nadie (quien la pide la cierra)
+
+        psycopg2 serializa las consultas de una misma conexión, así que los
+        hilos que consultan en paralelo necesitan una cada uno.
+        """
+        self._verificar_backend('postgresql')
+        try:
+            conexion = self._abrir_postgresql(os.getenv('DATABASE_URL'))
+        except Exception:
+            self.breakers['postgresql'].registrar_fallo()
+            raise
+        self.breakers['postgresql'].registrar_exito()
+        return conexion
+    
+    def _abrir_postgresql(self, database_url):
+        """Abrir una conexión de psycopg2 a partir de una URL postgresql://"""
+        import psycopg2
+        
+        result = urlparse(database_url)
+        return psycopg2.connect(
+            database=result.path[1:],
+            user=result.username,
+            password=result.password,
+            host=result.hostname,
+            port=result.port
+        )
+    
     def connect_cassandra(self):
-        """Conectar a Cassandra"""
+        """
+        Conectar a Cassandra
+
+        Si ya hay una sesión abierta se reutiliza. Al conectar solo se lee la
+        versión del esquema; el DDL corre únicamente si hay migraciones pendientes.
+        """
+        if self.breakers['cassandra'].rechaza():
+            return False
         try:
+            if self.cassandra_session and not self.cassandra_session.is_shutdown:
+                return True
+            
+            from cassandra.cluster import Cluster
+            
             host = os.getenv('CASSANDRA_HOST', 'localhost')
             port = int(os.getenv('CASSANDRA_PORT', 9042))
             keyspace = os.getenv('CASSANDRA_KEYSPACE', 'fifa_db')
             
-            self.cassandra_cluster = Cluster([host], port=port)
-            self.cassandra_session = self.cassandra_cluster.connect()
-            
-            # Crear keyspace si no existe
-            self.cassandra_session.execute(f"""
-                CREATE KEYSPACE IF NOT EXISTS {keyspace}
-                WITH replication = {{'class': 'SimpleStrategy', 'replication_factor': 1}}
-            """)
-            
-            # Usar el keyspace
-            self.cassandra_session.set_keyspace(keyspace)
-            
-            # Crear tabla de posiciones si no existe
-            self.cassandra_session.execute("""
-                CREATE TABLE IF NOT EXISTS tabla_posiciones (
-                    edicion TEXT,
-                    grupo TEXT,
-                    posicion INT,
-                    pais TEXT,
-                    puntos INT,
-                    gf INT,
-                    gc INT,
-                    dg INT,
-                    PRIMARY KEY ((edicion, grupo), posicion)
-                ) WITH CLUSTERING ORDER BY (posicion ASC)
-            """)
-            
-            # Crear tabla de partidos populares si no existe
-            self.cassandra_session.execute("""
-                CREATE TABLE IF NOT EXISTS partidos_populares (
-                    edicion TEXT,
-                    grupo TEXT,
-                    popularidad INT,
-                    id_partido INT,
-                    fecha_hora TIMESTAMP,
-                    estadio TEXT,
-                    seleccionLocal TEXT,
-                    seleccionVisitante TEXT,
-                    PRIMARY KEY ((edicion, grupo), popularidad, id_partido)
-                ) WITH CLUSTERING ORDER BY (popularidad DESC)
-            """)
-            
-            # Crear tabla de goles por selección y edición si no existe
-            self.cassandra_session.execute("""
-                CREATE TABLE IF NOT EXISTS goles_seleccion_edicion (
-                    edicion TEXT,
-                    seleccion TEXT,
-                    goles INT,
-                    PRIMARY KEY (edicion, seleccion)
-                )
-            """)
-            
-            # Crear tabla de partidos por fecha y estadio si no existe
-            self.cassandra_session.execute("""
-                CREATE TABLE IF NOT EXISTS partidos_fecha_estadio (
-                    id_partido INT,
-                    fecha TIMESTAMP,
-                    estadio TEXT,
-                    seleccionLocal TEXT,
-                    seleccionVisitante TEXT,
-                    golesLocal INT,
-                    golesVisitante INT,
-                    PRIMARY KEY (estadio, fecha)
-                ) WITH CLUSTERING ORDER BY (fecha ASC)
-            """)
+            opciones = self.opciones_conexion('cassandra')
+            compresion = opciones['compression']
+            if compresion is None:
+                compresion = self._compresion_cassandra()
+            # Con un nombre de códec el driver exige que el servidor lo soporte,
+            # así que si conecta, ese es el códec negociado
+            self.cassandra_compresion = compresion or None
+            self.cassandra_cluster = Cluster(
+                [host],
+                port=port,
+                execution_profiles=self._crear_perfiles_cassandra(),
+                compression=compresion
+            )
             
-            # Crear tabla de goleadores en fases KO si no existe
-            self.cassandra_session.execute("""
-                CREATE TABLE IF NOT EXISTS goleadores_ko_edicion (
-                    edicion TEXT,
-                    golesko INT,
-                    id_jugador INT,
-                    apellidojugador TEXT,
-                    nombrejugador TEXT,
-                    seleccion TEXT,
-                    PRIMARY KEY (edicion, golesko, id_jugador)
-                ) WITH CLUSTERING ORDER BY (golesko DESC, id_jugador ASC)
-            """)
+            # Solo la ausencia del keyspace (según la metadata del cluster) cuenta
+            # como esquema vacío; un timeout o un nodo caído va al breaker y no
+            # vuelve a correr las migraciones desde la versión 1
+            self.cassandra_session = self.cassandra_cluster.connect()
+            if keyspace in self.cassandra_cluster.metadata.keyspaces:
+                self.cassandra_session.set_keyspace(keyspace)
+                version = migraciones_cassandra.leer_version(self.cassandra_session, keyspace)
+            else:
+                version = 0
             
+            migraciones_cassandra.aplicar_migraciones(self.cassandra_session, keyspace, version)
+            self.cassandra_session.default_fetch_size = opciones['fetch_size']
+            self.breakers['cassandra'].registrar_exito()
             return True
         except Exception as e:
+            self.cassandra_session = None
+            if self.cassandra_cluster is not None:
+                # Cerrar la sesión y el control connection que quedaron abiertos
+                try:
+                    self.cassandra_cluster.shutdown()
+                except Exception:
+                    pass
+                self.cassandra_cluster = None
+            self.breakers['cassandra'].registrar_fallo()
+            logger.error("Error conectando a Cassandra: %s", e)
+            return False
+    
+    def opciones_conexion(self, backend):
+        """Opciones del perfil de conexión activo para un backend"""
+        return dict(PERFILES_CONEXION[self.perfil_conexion].get(backend, {}))
+    
+    def _crear_perfiles_cassandra(self):
+        """
+        Crear los perfiles de ejecución de Cassandra
+
+        Ambos perfiles usan balanceo token-aware sobre DC-aware (cada request va
+        directo a una réplica del DC local). El perfil de lectura tiene timeout
+        corto y ejecución especulativa para statements idempotentes; el de
+        escritura tiene timeout largo para cargas masivas del ETL.
+
+        Returns:
+            dict: nombre de perfil -> ExecutionProfile
+        """
+        from cassandra import ConsistencyLevel
+        from cassandra.cluster import EXEC_PROFILE_DEFAULT, ExecutionProfile
+        from cassandra.policies import (
+            ConstantSpeculativeExecutionPolicy,
+            DCAwareRoundRobinPolicy,
+            TokenAwarePolicy,
+        )
+
+        local_dc = os.getenv('CASSANDRA_LOCAL_DC') or None
+
+        def balanceo():
+            return TokenAwarePolicy(DCAwareRoundRobinPolicy(local_dc=local_dc))
+
+        def consistencia(variable, defecto):
+            return ConsistencyLevel.name_to_value[os.getenv(variable, defecto).upper()]
+
+        lectura = ExecutionProfile(
+            load_balancing_policy=balanceo(),
+            consistency_level=consistencia('CASSANDRA_READ_CONSISTENCY', 'LOCAL_ONE'),
+            request_timeout=float(os.getenv('CASSANDRA_READ_TIMEOUT', 2.0)),
+            speculative_execution_policy=ConstantSpeculativeExecutionPolicy(
+                delay=float(os.getenv('CASSANDRA_SPECULATIVE_DELAY', 0.05)),
+                max_attempts=int(os.getenv('CASSANDRA_SPECULATIVE_ATTEMPTS', 2))
+            )
+        )
+        escritura = ExecutionProfile(
+            load_balancing_policy=balanceo(),
+            consistency_level=consistencia('CASSANDRA_WRITE_CONSISTENCY', 'LOCAL_QUORUM'),
+            request_timeout=float(os.getenv('CASSANDRA_WRITE_TIMEOUT', 30.0))
+        )
+
+        return {
+            EXEC_PROFILE_DEFAULT: escritura,
+            PERFIL_LECTURA: lectura,
+            PERFIL_ESCRITURA: escritura
+        }
+
+    def _compresion_cassandra(self):
+        """
+        Compresión del protocolo según CASSANDRA_COMPRESSION
+
+        'true' elige el primer códec instalado entre lz4 y snappy; 'lz4' o
+        'snappy' lo piden explícitamente; 'false' desactiva la compresión.
+
+        Returns:
+            str | bool: Nombre del códec, o False si no hay uno utilizable
+        """
+        valor = os.getenv('CASSANDRA_COMPRESSION', 'true').strip().lower()
+        if valor in ('false', '0', 'no'):
+            return False
+        pedidos = ['lz4', 'snappy'] if valor in ('true', '1', 'si', 'yes') else [valor]
+        instalados = codecs_instalados(pedidos)
+        if not instalados:
+            logger.warning("Cassandra: compresión %s sin librería instalada (pip install lz4), se conecta sin comprimir",
+                           '/'.join(pedidos))
             return False
+        return instalados[0]
     
     def connect_mongodb(self):
         """Conectar a MongoDB"""
+        if self.breakers['mongodb'].rechaza():
+            return False
         try:
+            if self.mongodb_db is not None:
+                return True
+            
             from pymongo import MongoClient
             
             uri = os.getenv('MONGODB_URI')
             database_name = os.getenv('MONGODB_DATABASE', 'fifa_db')
             
-            self.mongodb_client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+            opciones = self.opciones_conexion('mongodb')
+            if 'compressors' in opciones:
+                pedidos = opciones.pop('compressors').split(',')
+                self.mongodb_compresores = codecs_instalados(pedidos)
+                if self.mongodb_compresores:
+                    opciones['compressors'] = ','.join(self.mongodb_compresores)
+                if self.mongodb_compresores != pedidos:
+                    logger.warning("MongoDB: compresores sin librería instalada omitidos (se ofrecen: %s)",
+                                   opciones.get('compressors', 'ninguno'))
+            
+            self.mongodb_client = MongoClient(
+                uri, serverSelectionTimeoutMS=5000, **opciones
+            )
             
             # Probar la conexión
             self.mongodb_client.server_info()
             self.mongodb_db = self.mongodb_client[database_name]
+            self.breakers['mongodb'].registrar_exito()
             return True
         except Exception as e:
+            self.mongodb_db = None
+            self.breakers['mongodb'].registrar_fallo()
             return False
     
     def connect_neo4j(self):
         """Conectar a Neo4j"""
+        if self.breakers['neo4j'].rechaza():
+            return False
         try:
+            if self.neo4j_driver is not None:
+                return True
+            
             from neo4j import GraphDatabase
             
             uri = os.getenv('NEO4J_URI')
             user = os.getenv('NEO4J_USER', 'neo4j')
             password = os.getenv('NEO4J_PASSWORD')
             
-            self.neo4j_driver = GraphDatabase.driver(uri, auth=(user, password))
+            self.neo4j_driver = GraphDatabase.driver(
+                uri, auth=(user, password), **self.opciones_conexion('neo4j')
+            )
             
             # Verificar conexión
             with self.neo4j_driver.session() as session:
                 result = session.run("RETURN 1 as test")
                 result.single()
             
+            self.breakers['neo4j'].registrar_exito()
             return True
         except Exception as e:
+            self.neo4j_driver = None
+            self.breakers['neo4j'].registrar_fallo()
+            return False
+    
+    def connect_redis(self):
+        """Conectar a Redis (REDIS_URL o REDIS_HOST/REDIS_PORT)"""
+        if self.breakers['redis'].rechaza():
             return False
-        """Conectar a Cassandra"""
         try:
-            host = os.getenv('CASSANDRA_HOST', 'localhost')
-            port = int(os.getenv('CASSANDRA_PORT', 9042))
-            keyspace = os.getenv('CASSANDRA_KEYSPACE', 'fifa_db')
-            
-            self.cassandra_cluster = Cluster([host], port=port)
-            self.cassandra_session = self.cassandra_cluster.connect()
-            
-            # Crear keyspace si no existe
-            self.cassandra_session.execute(f"""
-                CREATE KEYSPACE IF NOT EXISTS {keyspace}
-                WITH replication = {{'class': 'SimpleStrategy', 'replication_factor': 1}}
-            """)
-            
-            # Usar el keyspace
-            self.cassandra_session.set_keyspace(keyspace)
+            if self.redis_client is not None:
+                return True
             
-            # Crear tabla de posiciones si no existe
-            self.cassandra_session.execute("""
-                CREATE TABLE IF NOT EXISTS tabla_posiciones (
-                    edicion TEXT,
-                    grupo TEXT,
-                    posicion INT,
-                    pais TEXT,
-                    puntos INT,
-                    gf INT,
-                    gc INT,
-                    dg INT,
-                    PRIMARY KEY ((edicion, grupo), posicion)
-                ) WITH CLUSTERING ORDER BY (posicion ASC)
-            """)
+            import redis
             
-            # Crear tabla de partidos populares si no existe
-            self.cassandra_session.execute("""
-                CREATE TABLE IF NOT EXISTS partidos_populares (
-                    edicion TEXT,
-                    grupo TEXT,
-                    popularidad INT,
-                    id_partido INT,
-                    fecha_hora TIMESTAMP,
-                    estadio TEXT,
-                    seleccionLocal TEXT,
-                    seleccionVisitante TEXT,
-                    PRIMARY KEY ((edicion, grupo), popularidad, id_partido)
-                ) WITH CLUSTERING ORDER BY (popularidad DESC)
-            """)
-            
-            # Crear tabla de goles por selección y edición si no existe
-            self.cassandra_session.execute("""
-                CREATE TABLE IF NOT EXISTS goles_seleccion_edicion (
-                    edicion TEXT,
-                    seleccion TEXT,
-                    goles INT,
-                    PRIMARY KEY (edicion, seleccion)
+            opciones = self.opciones_conexion('redis')
+            redis_url = os.getenv('REDIS_URL') or os.getenv('REDIS_URI')
+            if redis_url:
+                self.redis_client = redis.from_url(redis_url, decode_responses=True, **opciones)
+            else:
+                host = os.getenv('REDIS_HOST', 'localhost')
+                port = int(os.getenv('REDIS_PORT', 6379))
+                pwd = os.getenv('REDIS_PASSWORD', None)
+                db = int(os.getenv('REDIS_DB', 0))
+                self.redis_client = redis.Redis(
+                    host=host, port=port, password=pwd, db=db, decode_responses=True, **opciones
                 )
-            """)
-            
-            # Crear tabla de partidos por fecha y estadio si no existe
-            self.cassandra_session.execute("""
-                CREATE TABLE IF NOT EXISTS partidos_fecha_estadio (
-                    id_partido INT,
-                    fecha TIMESTAMP,
-                    estadio TEXT,
-                    seleccionLocal TEXT,
-                    seleccionVisitante TEXT,
-                    golesLocal INT,
-                    golesVisitante INT,
-                    PRIMARY KEY (estadio, fecha)
-                ) WITH CLUSTERING ORDER BY (fecha ASC)
-            """)
-            
-            # Crear tabla de goleadores en fases KO si no existe
-            self.cassandra_session.execute("""
-                CREATE TABLE IF NOT EXISTS goleadores_ko_edicion (
-                    edicion TEXT,
-                    golesko INT,
-                    id_jugador INT,
-                    apellidojugador TEXT,
-                    nombrejugador TEXT,
-                    seleccion TEXT,
-                    PRIMARY KEY (edicion, golesko, id_jugador)
-                ) WITH CLUSTERING ORDER BY (golesko DESC, id_jugador ASC)
-            """)
             
+            self.redis_client.ping()
+            self.breakers['redis'].registrar_exito()
             return True
         except Exception as e:
-            print(f"❌ Error conectando a Cassandra: {e}")
+            self.redis_client = None
+            self.breakers['redis'].registrar_fallo()
             return False
     
-    def get_postgresql_cursor(self):
-        """Obtener cursor de PostgreSQL"""
+    def get_postgresql_cursor(self, nombre=None):
+        """
+        Obtener cursor de PostgreSQL
+        
+        Args:
+            nombre (str): Si se indica, cursor del lado del servidor (lectura en streaming)
+        """
+        sonda = self._verificar_backend('postgresql')
         if not self.pg_conn or self.pg_conn.closed:
             self.connect_postgresql()
-        return self.pg_conn.cursor()
+        elif sonda:
+            self._sondear('postgresql')
+        if not self.pg_conn or self.pg_conn.closed:
+            raise BackendNoDisponible('postgresql')
+        return self.pg_conn.cursor(name=nombre)
+    
+    def get_postgresql_cursor_extraccion(self, nombre=None):
+        """
+        Obtener un cursor para extraer: de la réplica si está al día, si no del primario
+        
+        El atraso de la réplica se mide como mucho cada FIFA_REPLICA_INTERVALO_ATRASO
+        segundos; si supera FIFA_REPLICA_ATRASO_MAXIMO, no responde o no está
+        configurada, la extracción va al primario.
+        
+        Args:
+            nombre (str): Si se indica, cursor del lado del servidor (lectura en streaming)
+        
+        Returns:
+            tuple: (cursor, origen) con origen 'replica' o 'primario'
+        """
+        if self.replica_url:
+            try:
+                if self._replica_disponible():
+                    return self.pg_replica_conn.cursor(name=nombre), 'replica'
+            except BackendNoDisponible:
+                pass
+            except Exception as e:
+                self.breakers['postgresql_replica'].registrar_fallo()
+                self._cerrar_replica()
+                logger.warning("Réplica de PostgreSQL no disponible, extrayendo del primario: %s", e)
+        return self.get_postgresql_cursor(nombre=nombre), 'primario'
+    
+    def terminar_extraccion(self, cursor):
+        """Cerrar la transacción de lectura de una extracción hecha en la réplica"""
+        if self.pg_replica_conn is not None and cursor.connection is self.pg_replica_conn:
+            try:
+                self.pg_replica_conn.rollback()
+            except Exception as e:
+                logger.warning("No se pudo cerrar la transacción de la réplica: %s", e)
+    
+    def atraso_replica(self, forzar=False):
+        """
+        Segundos de atraso de la réplica respecto del primario
+        
+        Args:
+            forzar (bool): Medir aunque la última medición sea reciente
+        
+        Returns:
+            float: Atraso en segundos (None si la URL no apunta a una réplica)
+        
+        Raises:
+            BackendNoDisponible: Si la réplica no está configurada o no responde
+        """
+        sonda = self._verificar_backend('postgresql_replica')
+        if not self.connect_postgresql_replica():
+            raise BackendNoDisponible('postgresql_replica')
+        
+        ahora = time.monotonic()
+        if forzar or sonda or ahora - self._replica_atraso_medido >= self.replica_intervalo_atraso:
+            try:
+                with self.pg_replica_conn.cursor() as cursor:
+                    cursor.execute(CONSULTA_ATRASO_REPLICA)
+                    valor = cursor.fetchone()[0]
+            finally:
+                self.pg_replica_conn.rollback()
+            self.replica_atraso = None if valor is None else float(valor)
+            self._replica_atraso_medido = ahora
+            self.breakers['postgresql_replica'].registrar_exito()
+        return self.replica_atraso
+    
+    def _replica_disponible(self):
+        """True si la réplica responde y su atraso no supera el máximo"""
+        atraso = self.atraso_replica()
+        if atraso is not None and atraso > self.replica_atraso_maximo:
+            logger.warning(
+                "Réplica de PostgreSQL atrasada %.1fs (máximo %.1fs), extrayendo del primario",
+                atraso, self.replica_atraso_maximo
+            )
+            return False
+        return True
+    
+    def _cerrar_replica(self):
+        try:
+            if self.pg_replica_conn:
+                self.pg_replica_conn.close()
+        except Exception:
+            pass
+        self.pg_replica_conn = None
+    
+    def get_postgresql_listener(self):
+        """Obtener conexión de PostgreSQL para LISTEN/NOTIFY"""
+        sonda = self._verificar_backend('postgresql')
+        if not self.pg_listen_conn or self.pg_listen_conn.closed:
+            self.connect_postgresql_listener()
+        elif sonda:
+            # Comparte el breaker con pg_conn: la sonda debe cerrarlo o reabrirlo
+            self._sondear('postgresql', self.pg_listen_conn)
+        if not self.pg_listen_conn or self.pg_listen_conn.closed:
+            raise BackendNoDisponible('postgresql')
+        return self.pg_listen_conn
     
     def get_cassandra_session(self):
         """Obtener sesión de Cassandra"""
+        sonda = self._verificar_backend('cassandra')
         if not self.cassandra_session:
             self.connect_cassandra()
+        elif sonda:
+            self._sondear('cassandra')
+        if not self.cassandra_session:
+            raise BackendNoDisponible('cassandra')
         return self.cassandra_session
     
     def get_mongodb_db(self):
         """Obtener base de datos de MongoDB"""
+        sonda = self._verificar_backend('mongodb')
         if self.mongodb_db is None:
             self.connect_mongodb()
+        elif sonda:
+            self._sondear('mongodb')
+        if self.mongodb_db is None:
+            raise BackendNoDisponible('mongodb')
         return self.mongodb_db
     
     def get_neo4j_driver(self):
         """Obtener driver de Neo4j"""
+        sonda = self._verificar_backend('neo4j')
         if self.neo4j_driver is None:
             self.connect_neo4j()
+        elif sonda:
+            self._sondear('neo4j')
+        if self.neo4j_driver is None:
+            raise BackendNoDisponible('neo4j')
         return self.neo4j_driver
     
+    def get_redis_client(self):
+        """Obtener cliente de Redis"""
+        sonda = self._verificar_backend('redis')
+        if self.redis_client is None:
+            self.connect_redis()
+        elif sonda:
+            self._sondear('redis')
+        if self.redis_client is None:
+            raise BackendNoDisponible('redis')
+        return self.redis_client
+    
+    def _verificar_backend(self, backend):
+        """
+        Fallar rápido si el circuito del backend está abierto
+        
+        Returns:
+            bool: True si este llamador debe sondear el backend (semiabierto)
+        
+        Raises:
+            BackendNoDisponible: Si el circuito está abierto o ya hay una sonda en curso
+        """
+        breaker = self.breakers[backend]
+        if not breaker.permitir():
+            raise BackendNoDisponible(backend, breaker.segundos_para_reintento())
+        return breaker.es_sonda()
+    
+    def _sondear(self, backend, conexion=None):
+        """
+        Verificar con una operación mínima un backend cuya conexión ya existe
+
+        Args:
+            backend (str): Backend a sondear
+            conexion: Conexión de PostgreSQL a usar (None = pg_conn)
+        """
+        breaker = self.breakers[backend]
+        try:
+            if backend == 'postgresql':
+                with (conexion or self.pg_conn).cursor() as cursor:
+                    cursor.execute("SELECT 1")
+
+            elif backend == 'cassandra':
+                self.cassandra_session.execute("SELECT release_version FROM system.local")
+            elif backend == 'mongodb':
+                self.mongodb_client.admin.command('ping')
+            elif backend == 'neo4j':
+                self.neo4j_driver.verify_connectivity()
+            elif backend == 'redis':
+                self.redis_client.ping()
+            breaker.registrar_exito()
+        except Exception as e:
+            breaker.registrar_fallo()
+            raise BackendNoDisponible(backend, breaker.segundos_para_reintento()) from e
+    
+    def reportar_fallo(self, backend):
+        """Registrar un fallo de una operación sobre el backend (timeouts, nodos caídos)"""
+        self.breakers[backend].registrar_fallo()
+    
+    def salud(self):
+        """Estado del circuit breaker de cada backend"""
+        return {backend: breaker.salud() for backend, breaker in self.breakers.items()}
+    
     def close_all(self):
         """Cerrar todas las conexiones"""
         try:
             if self.pg_conn:
                 self.pg_conn.close()
+            if self.pg_listen_conn:
+                self.pg_listen_conn.close()
+            if self.pg_replica_conn:
+                self.pg_replica_conn.close()
             if self.cassandra_session:
                 self.cassandra_session.shutdown()
             if self.cassandra_cluster:
@@ -298,8 +683,16 @@ class DatabaseManager:
                 self.mongodb_client.close()
             if self.neo4j_driver:
                 self.neo4j_driver.close()
+            if self.redis_client:
+                self.redis_client.close()
         except Exception as e:
             logger.exception("Error cerrando conexiones: %s", e)
+        # La próxima conexión vuelve a abrirse bajo demanda
+        self.pg_conn = self.pg_listen_conn = self.pg_replica_conn = None
+        self.cassandra_cluster = self.cassandra_session = None
+        self.mongodb_client = self.mongodb_db = None
+        self.neo4j_driver = None
+        self.redis_client = None
 
 
 # Instancia global
@@ -2,8 +2,48 @@
 Módulo para operaciones ETL (Extract, Transform, Load)
 """
 
+import logging
+import threading
+from datetime import datetime, timedelta
+
 from db_manager import db_manager
-from collections import defaultdict
+from cache_l1 import cacheado
+import calendario
+from circuit_breaker import BackendNoDisponible
+import caminos_ko
+import grafo_ko
+import leaderboards
+import vista_arbitros
+from paginacion import (
+    Pagina,
+    leer_cassandra,
+    leer_mongo,
+    leer_mongo_agregacion,
+    leer_particiones_cassandra,
+    paginar_ordenado,
+)
+from perfilado import perfilador, perfilar_cypher, opciones_cassandra, registrar_cassandra, registrar_neo4j
+from pipeline_etl import motor_etl
+import modelos_lectura
+
+logger = logging.getLogger(__name__)
+
+# Los obtener_* no propagan sus errores: se cuentan por hilo para quien mida
+_errores_hilo = threading.local()
+
+
+def errores_lectura():
+    """
+    Cantidad de errores de lectura informados por el hilo actual
+
+    Returns:
+        int: Errores acumulados (compararlo antes y después de una lectura)
+    """
+    return getattr(_errores_hilo, 'cantidad', 0)
+
+
+def _contar_error_lectura():
+    _errores_hilo.cantidad = errores_lectura() + 1
 
 
 class ETLManager:
@@ -21,95 +61,23 @@ class ETLManager:
         Returns:
             bool: True si fue exitoso, False si hubo error
         """
-        try:
-            print(f"\n🔄 Iniciando ETL para {edicion} - Grupo {grupo}...")
-            
-            # EXTRACT: Obtener datos desde PostgreSQL
-            print("📥 Extrayendo datos desde PostgreSQL...")
-            cursor = db_manager.get_postgresql_cursor()
-            
-            # Llamar a la función de PostgreSQL
-            cursor.execute("SELECT * FROM get_tabla_posiciones_grupo(%s, %s)", (edicion, grupo))
-            
-            rows = cursor.fetchall()
-            
-            if not rows:
-                print(f"⚠️  No se encontraron datos para {edicion} - Grupo {grupo}")
-                return False
-            
-            print(f"✅ Extraídos {len(rows)} registros desde PostgreSQL")
-            
-            # TRANSFORM & LOAD: Insertar en Cassandra
-            print("📤 Cargando datos en Cassandra...")
-            session = db_manager.get_cassandra_session()
-            
-            # Limpiar datos anteriores del mismo grupo y edición
-            delete_stmt = session.prepare("""
-                DELETE FROM tabla_posiciones 
-                WHERE edicion = ? AND grupo = ?
-            """)
-            session.execute(delete_stmt, (edicion, grupo))
-            
-            # Preparar statement de inserción
-            insert_query = """
-                INSERT INTO tabla_posiciones 
-                (edicion, grupo, posicion, pais, puntos, gf, gc, dg)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            prepared = session.prepare(insert_query)
-            
-            # Insertar cada registro
-            for row in rows:
-                # Ajustar según la estructura que devuelve PostgreSQL
-                # Puede ser que la función devuelva solo: (posicion, pais, puntos, gf, gc, dg)
-                # O puede incluir: (edicion, grupo, posicion, pais, puntos, gf, gc, dg)
-                
-                if len(row) == 6:
-                    # Si solo devuelve los datos sin edicion y grupo
-                    session.execute(prepared, (
-                        edicion,  # edicion (parámetro)
-                        grupo,    # grupo (parámetro)
-                        row[0],   # posicion
-                        row[1],   # pais
-                        row[2],   # puntos
-                        row[3],   # gf
-                        row[4],   # gc
-                        row[5]    # dg
-                    ))
-                else:
-                    # Si devuelve todos los campos incluyendo edicion y grupo
-                    session.execute(prepared, (
-                        row[0],   # edicion
-                        row[1],   # grupo
-                        row[2],   # posicion
-                        row[3],   # pais
-                        row[4],   # puntos
-                        row[5],   # gf
-                        row[6],   # gc
-                        row[7]    # dg
-                    ))
-            
-            print(f"✅ Cargados {len(rows)} registros en Cassandra")
-            print("✨ ETL completado exitosamente\n")
-            
-            cursor.close()
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error en ETL: {e}")
-            return False
+        return motor_etl.ejecutar(modelos_lectura.TABLA_POSICIONES, edicion=edicion, grupo=grupo)
     
     @staticmethod
-    def obtener_tabla_posiciones_cassandra(edicion, grupo):
+    @cacheado('tabla_posiciones')
+    def obtener_tabla_posiciones_cassandra(edicion, grupo, limit=None, page_token=None, stream=False):
         """
         Obtener tabla de posiciones desde Cassandra
         
         Args:
             edicion (str): Nombre de la edición del mundial
             grupo (str): Letra del grupo
+            limit (int): Cantidad máxima de filas (None = todas)
+            page_token (str): Token de la página anterior (ver paginacion.Pagina)
+            stream (bool): Devolver un generador que recorre las páginas a demanda
         
         Returns:
-            list: Lista de tuplas con los datos de la tabla
+            Pagina: Lista de tuplas con los datos de la tabla (o generador si stream)
         """
         try:
             session = db_manager.get_cassandra_session()
@@ -120,13 +88,39 @@ class ETLManager:
                 WHERE edicion = ? AND grupo = ?
                 ORDER BY posicion ASC
             """)
+            query_stmt.is_idempotent = True  # habilita la ejecución especulativa
             
-            rows = session.execute(query_stmt, (edicion, grupo))
-            return list(rows)
+            return leer_cassandra(
+                session, query_stmt, (edicion, grupo), limit, page_token, stream,
+                execution_profile=db_manager.cassandra_perfil_lectura,
+                al_fallar=ETLManager._fallo_stream('cassandra')
+            )
             
         except Exception as e:
-            print(f"❌ Error obteniendo datos de Cassandra: {e}")
-            return []
+            ETLManager._error_lectura('cassandra', e)
+            return Pagina()
+    
+    @staticmethod
+    def obtener_tablas_posiciones_cassandra(claves, limit=None):
+        """
+        Obtener las tablas de posiciones de varios grupos en una sola ida y vuelta
+        
+        Las particiones se leen en paralelo, así que traer los doce grupos de
+        una edición cuesta lo que la lectura más lenta y no la suma.
+        
+        Args:
+            claves (list): Tuplas (edicion, grupo)
+            limit (int): Cantidad máxima de filas por grupo (None = todas)
+        
+        Returns:
+            dict: (edicion, grupo) -> Pagina de tuplas, en el orden de entrada
+        """
+        return ETLManager._leer_particiones_cassandra("""
+            SELECT posicion, pais, puntos, gf, gc, dg
+            FROM tabla_posiciones
+            WHERE edicion = ? AND grupo = ?
+            ORDER BY posicion ASC
+        """, claves, limit)
     
     @staticmethod
     def etl_partidos_populares(edicion, grupo):
@@ -140,77 +134,23 @@ class ETLManager:
         Returns:
             bool: True si fue exitoso, False si hubo error
         """
-        try:
-            print(f"\n🔄 Iniciando ETL para partidos populares {edicion} - Grupo {grupo}...")
-            
-            # EXTRACT: Obtener datos desde PostgreSQL
-            print("📥 Extrayendo datos desde PostgreSQL...")
-            cursor = db_manager.get_postgresql_cursor()
-            
-            cursor.execute("SELECT * FROM get_partidos_grupo_por_popularidad(%s, %s)", (edicion, grupo))
-            
-            rows = cursor.fetchall()
-            
-            if not rows:
-                print(f"⚠️  No se encontraron partidos para {edicion} - Grupo {grupo}")
-                return False
-            
-            print(f"✅ Extraídos {len(rows)} partidos desde PostgreSQL")
-            
-            # TRANSFORM & LOAD: Insertar en Cassandra
-            print("📤 Cargando datos en Cassandra...")
-            session = db_manager.get_cassandra_session()
-            
-            # Limpiar datos anteriores del mismo grupo y edición
-            delete_stmt = session.prepare("""
-                DELETE FROM partidos_populares 
-                WHERE edicion = ? AND grupo = ?
-            """)
-            session.execute(delete_stmt, (edicion, grupo))
-            
-            # Preparar statement de inserción
-            insert_query = """
-                INSERT INTO partidos_populares 
-                (edicion, grupo, popularidad, id_partido, fecha_hora, estadio, seleccionLocal, seleccionVisitante)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            prepared = session.prepare(insert_query)
-            
-            # Insertar cada registro
-            for row in rows:
-                # Asumiendo que PostgreSQL devuelve: (id_partido, fecha_hora, estadio, local, visitante, popularidad)
-                session.execute(prepared, (
-                    edicion,
-                    grupo,
-                    row[5],  # popularidad
-                    row[0],  # id_partido
-                    row[1],  # fecha_hora
-                    row[2],  # estadio
-                    row[3],  # seleccionLocal
-                    row[4]   # seleccionVisitante
-                ))
-            
-            print(f"✅ Cargados {len(rows)} partidos en Cassandra")
-            print("✨ ETL completado exitosamente\n")
-            
-            cursor.close()
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error en ETL: {e}")
-            return False
+        return motor_etl.ejecutar(modelos_lectura.PARTIDOS_POPULARES, edicion=edicion, grupo=grupo)
     
     @staticmethod
-    def obtener_partidos_populares_cassandra(edicion, grupo):
+    @cacheado('partidos_populares')
+    def obtener_partidos_populares_cassandra(edicion, grupo, limit=None, page_token=None, stream=False):
         """
         Obtener partidos ordenados por popularidad desde Cassandra
         
         Args:
             edicion (str): Nombre de la edición del mundial
             grupo (str): Letra del grupo
+            limit (int): Cantidad máxima de filas (None = todas)
+            page_token (str): Token de la página anterior (ver paginacion.Pagina)
+            stream (bool): Devolver un generador que recorre las páginas a demanda
         
         Returns:
-            list: Lista de tuplas con los datos de los partidos
+            Pagina: Lista de tuplas con los datos de los partidos (o generador si stream)
         """
         try:
             session = db_manager.get_cassandra_session()
@@ -220,13 +160,35 @@ class ETLManager:
                 FROM partidos_populares
                 WHERE edicion = ? AND grupo = ?
             """)
+            query_stmt.is_idempotent = True  # habilita la ejecución especulativa
             
-            rows = session.execute(query_stmt, (edicion, grupo))
-            return list(rows)
+            return leer_cassandra(
+                session, query_stmt, (edicion, grupo), limit, page_token, stream,
+                execution_profile=db_manager.cassandra_perfil_lectura,
+                al_fallar=ETLManager._fallo_stream('cassandra')
+            )
             
         except Exception as e:
-            print(f"❌ Error obteniendo datos de Cassandra: {e}")
-            return []
+            ETLManager._error_lectura('cassandra', e)
+            return Pagina()
+    
+    @staticmethod
+    def obtener_partidos_populares_grupos_cassandra(claves, limit=None):
+        """
+        Obtener los partidos por popularidad de varios grupos en paralelo
+        
+        Args:
+            claves (list): Tuplas (edicion, grupo)
+            limit (int): Cantidad máxima de partidos por grupo (None = todos)
+        
+        Returns:
+            dict: (edicion, grupo) -> Pagina de tuplas, en el orden de entrada
+        """
+        return ETLManager._leer_particiones_cassandra("""
+            SELECT id_partido, fecha_hora, estadio, seleccionLocal, seleccionVisitante, popularidad
+            FROM partidos_populares
+            WHERE edicion = ? AND grupo = ?
+        """, claves, limit)
     
     @staticmethod
     def etl_goles_seleccion_edicion(edicion):
@@ -239,85 +201,59 @@ class ETLManager:
         Returns:
             bool: True si fue exitoso, False si hubo error
         """
-        try:
-            print(f"\n🔄 Iniciando ETL para goles por selección - {edicion}...")
-            
-            # EXTRACT: Obtener datos desde PostgreSQL
-            print("📥 Extrayendo datos desde PostgreSQL...")
-            cursor = db_manager.get_postgresql_cursor()
-            
-            cursor.execute("SELECT * FROM get_goles_por_seleccion_edicion(%s)", (edicion,))
-            
-            rows = cursor.fetchall()
-            
-            if not rows:
-                print(f"⚠️  No se encontraron datos para {edicion}")
-                return False
-            
-            print(f"✅ Extraídos {len(rows)} registros desde PostgreSQL")
-            
-            # TRANSFORM & LOAD: Insertar en Cassandra
-            print("📤 Cargando datos en Cassandra...")
-            session = db_manager.get_cassandra_session()
-            
-            # Preparar statement de inserción
-            insert_query = """
-                INSERT INTO goles_seleccion_edicion 
-                (edicion, seleccion, goles)
-                VALUES (?, ?, ?)
-            """
-            prepared = session.prepare(insert_query)
-            
-            # Insertar cada registro (reemplazará si ya existe por la PRIMARY KEY)
-            for row in rows:
-                # Asumiendo que PostgreSQL devuelve: (edicion, seleccion, goles_totales)
-                session.execute(prepared, (
-                    row[0],  # edicion
-                    row[1],  # seleccion
-                    row[2]   # goles
-                ))
-            
-            print(f"✅ Cargados {len(rows)} registros en Cassandra")
-            print("✨ ETL completado exitosamente\n")
-            
-            cursor.close()
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error en ETL: {e}")
-            return False
+        return motor_etl.ejecutar(modelos_lectura.GOLES_SELECCION_EDICION, edicion=edicion)
     
     @staticmethod
-    def obtener_goles_seleccion_edicion_cassandra(edicion):
+    @cacheado('goles_seleccion_edicion')
+    def obtener_goles_seleccion_edicion_cassandra(edicion, limit=None, page_token=None, stream=False):
         """
         Obtener goles por selección ordenados descendentemente desde Cassandra
         
+        Se leen los contadores vivos (goles_seleccion_contador, ver
+        contadores_goles); si la edición todavía no tiene contadores se usa la
+        tabla cargada por el ETL. La partición está ordenada por selección, no
+        por goles, así que el orden se resuelve en el cliente (con heapq para top-N).
+        
         Args:
             edicion (str): Nombre de la edición del mundial
+            limit (int): Cantidad máxima de filas (None = todas)
+            page_token (str): Token de la página anterior (ver paginacion.Pagina)
+            stream (bool): Devolver un generador que recorre las páginas a demanda
         
         Returns:
-            list: Lista de tuplas con los datos ordenados por goles
+            Pagina: Lista de tuplas con los datos ordenados por goles (o generador si stream)
         """
         try:
             session = db_manager.get_cassandra_session()
             
-            query_stmt = session.prepare("""
-                SELECT seleccion, goles
-                FROM goles_seleccion_edicion
-                WHERE edicion = ?
-            """)
-            
-            rows = session.execute(query_stmt, (edicion,))
+            rows = None
+            for tabla in ('goles_seleccion_contador', 'goles_seleccion_edicion'):
+                query_stmt = session.prepare(f"""
+                    SELECT seleccion, goles
+                    FROM {tabla}
+                    WHERE edicion = ?
+                """)
+                query_stmt.is_idempotent = True  # habilita la ejecución especulativa
+                
+                rs = session.execute(
+                    query_stmt, (edicion,),
+                    **opciones_cassandra({'execution_profile': db_manager.cassandra_perfil_lectura})
+                )
+                registrar_cassandra(query_stmt, (edicion,), rs)
+                rows = list(rs)
+                if rows:
+                    break
             
             # Ordenar por goles descendentemente (Cassandra no ordena por columna no-clave)
-            rows_list = list(rows)
-            rows_list.sort(key=lambda x: x.goles, reverse=True)
-            
-            return rows_list
+            return paginar_ordenado(rows, lambda x: x.goles, limit, page_token, stream)
             
         except Exception as e:
-            print(f"❌ Error obteniendo datos de Cassandra: {e}")
-            return []
+            ETLManager._error_lectura('cassandra', e)
+            # Respaldo: leaderboard de Redis con el mismo formato (seleccion, goles)
+            return ETLManager._leer_leaderboard_respaldo(
+                leaderboards.LEADERBOARD_GOLES_SELECCION, edicion, limit,
+                lambda item: (item['miembro'], item['goles'])
+            )
     
     @staticmethod
     def etl_partidos_fecha_estadio(anio, estadio):
@@ -331,84 +267,143 @@ class ETLManager:
         Returns:
             bool: True si fue exitoso, False si hubo error
         """
+        return motor_etl.ejecutar(modelos_lectura.PARTIDOS_FECHA_ESTADIO, anio=anio, estadio=estadio)
+    
+    @staticmethod
+    @cacheado('partidos_fecha_estadio')
+    def obtener_partidos_fecha_estadio_cassandra(estadio, anio, desde=None, hasta=None, limit=None,
+                                                 page_token=None, stream=False):
+        """
+        Obtener partidos de un estadio en un año ordenados por fecha desde Cassandra
+        
+        Se lee solo la partición (estadio, anio); el rango de fechas se resuelve
+        con límites sobre la clave de clustering, sin filtrar en el cliente.
+        
+        Args:
+            estadio (str): Nombre del estadio
+            anio (int): Año del mundial
+            desde (datetime | date): Fecha mínima inclusive (None = sin límite)
+            hasta (datetime | date): Fecha máxima exclusiva (None = sin límite)
+            limit (int): Cantidad máxima de filas (None = todas)
+            page_token (str): Token de la página anterior (ver paginacion.Pagina)
+            stream (bool): Devolver un generador que recorre las páginas a demanda
+        
+        Returns:
+            Pagina: Lista de tuplas con los datos de los partidos (o generador si stream)
+        """
         try:
-            print(f"\n🔄 Iniciando ETL para partidos en {estadio} - Año {anio}...")
-            
-            # EXTRACT: Obtener datos desde PostgreSQL
-            print("📥 Extrayendo datos desde PostgreSQL...")
-            cursor = db_manager.get_postgresql_cursor()
-            
-            cursor.execute("SELECT * FROM get_partidos_por_anio_estadio(%s, %s)", (anio, estadio))
-            
-            rows = cursor.fetchall()
-            
-            if not rows:
-                print(f"⚠️  No se encontraron partidos para {estadio} en {anio}")
-                return False
-            
-            print(f"✅ Extraídos {len(rows)} partidos desde PostgreSQL")
-            
-            # TRANSFORM & LOAD: Insertar en Cassandra
-            print("📤 Cargando datos en Cassandra...")
             session = db_manager.get_cassandra_session()
             
-            # Preparar statement de inserción
-            insert_query = """
-                INSERT INTO partidos_fecha_estadio 
-                (id_partido, fecha, estadio, seleccionLocal, seleccionVisitante, golesLocal, golesVisitante)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            prepared = session.prepare(insert_query)
-            
-            # Insertar cada registro
-            for row in rows:
-                # Asumiendo que PostgreSQL devuelve: (id_partido, fecha, estadio, local, visitante, goles_local, goles_visitante)
-                session.execute(prepared, (
-                    row[0],  # id_partido
-                    row[1],  # fecha
-                    row[2],  # estadio
-                    row[3],  # seleccionLocal
-                    row[4],  # seleccionVisitante
-                    row[5],  # golesLocal
-                    row[6]   # golesVisitante
-                ))
-            
-            print(f"✅ Cargados {len(rows)} partidos en Cassandra")
-            print("✨ ETL completado exitosamente\n")
+            query, params = ETLManager._consulta_partidos_fecha_estadio(desde, hasta)
+            query_stmt = session.prepare(query)
+            query_stmt.is_idempotent = True  # habilita la ejecución especulativa
             
-            cursor.close()
-            return True
+            return leer_cassandra(
+                session, query_stmt, (estadio, int(anio)) + params, limit, page_token, stream,
+                execution_profile=db_manager.cassandra_perfil_lectura,
+                al_fallar=ETLManager._fallo_stream('cassandra')
+            )
             
         except Exception as e:
-            print(f"❌ Error en ETL: {e}")
-            return False
+            ETLManager._error_lectura('cassandra', e)
+            return Pagina()
     
     @staticmethod
-    def obtener_partidos_fecha_estadio_cassandra(estadio):
+    def obtener_partidos_fecha_estadios_cassandra(claves, limit=None):
         """
-        Obtener partidos de un estadio ordenados por fecha desde Cassandra
+        Obtener los partidos de varios estadios y años en paralelo
         
         Args:
-            estadio (str): Nombre del estadio
+            claves (list): Tuplas (estadio, anio)
+            limit (int): Cantidad máxima de partidos por clave (None = todos)
         
         Returns:
-            list: Lista de tuplas con los datos de los partidos
+            dict: (estadio, anio) -> Pagina de tuplas, en el orden de entrada
+        """
+        query, _ = ETLManager._consulta_partidos_fecha_estadio(None, None)
+        return ETLManager._leer_particiones_cassandra(
+            query, [(estadio, int(anio)) for estadio, anio in claves], limit
+        )
+    
+    @staticmethod
+    def _consulta_partidos_fecha_estadio(desde, hasta):
+        """
+        Armar el SELECT de una partición de partidos_fecha_estadio con su rango de fechas
+        
+        Returns:
+            tuple: (query, valores de los límites)
+        """
+        condiciones, params = ["estadio = ?", "anio = ?"], ()
+        for operador, limite in ((">=", desde), ("<", hasta)):
+            if limite is None:
+                continue
+            if not isinstance(limite, datetime):
+                limite = datetime.combine(limite, datetime.min.time())
+            condiciones.append(f"fecha {operador} ?")
+            params += (limite,)
+        return f"""
+            SELECT id_partido, fecha, seleccionLocal, seleccionVisitante, golesLocal, golesVisitante
+            FROM partidos_fecha_estadio
+            WHERE {' AND '.join(condiciones)}
+        """, params
+    
+    @staticmethod
+    @cacheado('partidos_fecha_estadio')
+    def obtener_calendario_dia_cassandra(dia, limit=None, page_token=None, stream=False):
+        """
+        Obtener los partidos de un día en todos los estadios, ordenados por hora
+        
+        Args:
+            dia (date): Día del calendario
+            limit (int): Cantidad máxima de filas (None = todas)
+            page_token (str): Token de la página anterior (ver paginacion.Pagina)
+            stream (bool): Devolver un generador que recorre las páginas a demanda
+        
+        Returns:
+            Pagina: Tuplas (fecha, id_partido, estadio, local, visitante, goles_local,
+            goles_visitante) (o generador si stream)
         """
         try:
             session = db_manager.get_cassandra_session()
             
-            query_stmt = session.prepare("""
-                SELECT id_partido, fecha, seleccionLocal, seleccionVisitante, golesLocal, golesVisitante
-                FROM partidos_fecha_estadio
-                WHERE estadio = ?
+            query_stmt = session.prepare(f"""
+                SELECT fecha, id_partido, estadio, seleccionLocal, seleccionVisitante, golesLocal, golesVisitante
+                FROM {calendario.TABLA}
+                WHERE dia = ?
             """)
+            query_stmt.is_idempotent = True  # habilita la ejecución especulativa
             
-            rows = session.execute(query_stmt, (estadio,))
-            return list(rows)
+            return leer_cassandra(
+                session, query_stmt, (dia,), limit, page_token, stream,
+                execution_profile=db_manager.cassandra_perfil_lectura,
+                al_fallar=ETLManager._fallo_stream('cassandra')
+            )
             
         except Exception as e:
-            print(f"❌ Error obteniendo datos de Cassandra: {e}")
-            return []
+            ETLManager._error_lectura('cassandra', e)
+            return Pagina()
+    
+    @staticmethod
+    def obtener_calendario_proximas_horas_cassandra(horas=48, desde=None, limit=None):
+        """
+        Obtener los partidos de las próximas horas en todos los estadios
+        
+        Se lee en paralelo una partición por cada día del intervalo, acotada por
+        hora de inicio, y se concatenan en orden.
+        
+        Args:
+            horas (float): Largo del intervalo
+            desde (datetime): Inicio del intervalo (None = ahora)
+            limit (int): Cantidad máxima de partidos (None = todos)
+        
+        Returns:
+            Pagina: Tuplas como obtener_calendario_dia_cassandra, ordenadas por hora
+        """
+        desde = desde or datetime.now()
+        rangos = calendario.rangos_por_dia(desde, desde + timedelta(hours=horas))
+        resultados = ETLManager._leer_particiones_cassandra(calendario.CONSULTA_RANGO, rangos, limit)
+        partidos = [fila for rango in rangos for fila in resultados[rango]]
+        return Pagina(partidos[:limit] if limit else partidos)
     
     @staticmethod
     def etl_goleadores_ko_edicion(edicion):
@@ -421,189 +416,207 @@ class ETLManager:
         Returns:
             bool: True si fue exitoso, False si hubo error
         """
+        return motor_etl.ejecutar(modelos_lectura.GOLEADORES_KO_EDICION, edicion=edicion)
+    
+    @staticmethod
+    @cacheado('goleadores_ko_edicion')
+    def obtener_goleadores_ko_edicion_cassandra(edicion, limit=None, page_token=None, stream=False):
+        """
+        Obtener goleadores de fases KO ordenados por goles desde Cassandra
+        
+        El clustering (golesko DESC) ya ordena la partición, por lo que un
+        top-N con limit lee solo las primeras N filas.
+        
+        Args:
+            edicion (str): Nombre de la edición del mundial
+            limit (int): Cantidad máxima de filas (None = todas)
+            page_token (str): Token de la página anterior (ver paginacion.Pagina)
+            stream (bool): Devolver un generador que recorre las páginas a demanda
+        
+        Returns:
+            Pagina: Lista de tuplas con los datos de los goleadores (o generador si stream)
+        """
         try:
-            print(f"\n🔄 Iniciando ETL para goleadores KO - {edicion}...")
-            
-            # EXTRACT: Obtener datos desde PostgreSQL
-            print("📥 Extrayendo datos desde PostgreSQL...")
-            cursor = db_manager.get_postgresql_cursor()
-            
-            cursor.execute("SELECT * FROM get_goleadores_fases_ko(%s)", (edicion,))
-            
-            rows = cursor.fetchall()
-            
-            if not rows:
-                print(f"⚠️  No se encontraron goleadores para {edicion}")
-                return False
-            
-            print(f"✅ Extraídos {len(rows)} goleadores desde PostgreSQL")
-            
-            # TRANSFORM & LOAD: Insertar en Cassandra
-            print("📤 Cargando datos en Cassandra...")
             session = db_manager.get_cassandra_session()
             
-            # Preparar statement de inserción
-            insert_query = """
-                INSERT INTO goleadores_ko_edicion 
-                (edicion, golesko, id_jugador, apellidojugador, nombrejugador, seleccion)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """
-            prepared = session.prepare(insert_query)
-            
-            # Insertar cada registro
-            for row in rows:
-                # Asumiendo que PostgreSQL devuelve: (id_jugador, nombre, apellido, pais, goles_ko)
-                session.execute(prepared, (
-                    edicion,
-                    row[4],  # golesko (goles_ko)
-                    row[0],  # id_jugador
-                    row[2],  # apellidojugador
-                    row[1],  # nombrejugador
-                    row[3]   # seleccion (pais)
-                ))
-            
-            print(f"✅ Cargados {len(rows)} goleadores en Cassandra")
-            print("✨ ETL completado exitosamente\n")
+            query_stmt = session.prepare("""
+                SELECT id_jugador, nombrejugador, apellidojugador, seleccion, golesko
+                FROM goleadores_ko_edicion
+                WHERE edicion = ?
+            """)
+            query_stmt.is_idempotent = True  # habilita la ejecución especulativa
             
-            cursor.close()
-            return True
+            return leer_cassandra(
+                session, query_stmt, (edicion,), limit, page_token, stream,
+                execution_profile=db_manager.cassandra_perfil_lectura,
+                al_fallar=ETLManager._fallo_stream('cassandra')
+            )
             
         except Exception as e:
-            print(f"❌ Error en ETL: {e}")
-            return False
+            ETLManager._error_lectura('cassandra', e)
+            # Respaldo: leaderboard de Redis con el mismo formato de fila
+            return ETLManager._leer_leaderboard_respaldo(
+                leaderboards.LEADERBOARD_GOLEADORES_KO, edicion, limit,
+                lambda item: (int(item['miembro']), item.get('nombre'), item.get('apellido'),
+                              item.get('seleccion'), item['goles'])
+            )
     
     @staticmethod
-    def obtener_goleadores_ko_edicion_cassandra(edicion):
+    @cacheado('goleadores_ko_contador')
+    def obtener_goleadores_ko_contador_cassandra(edicion, limit=None, page_token=None, stream=False):
         """
-        Obtener goleadores de fases KO ordenados por goles desde Cassandra
+        Obtener los goles KO por jugador desde los contadores vivos de Cassandra
         
         Args:
             edicion (str): Nombre de la edición del mundial
+            limit (int): Cantidad máxima de filas (None = todas)
+            page_token (str): Token de la página anterior (ver paginacion.Pagina)
+            stream (bool): Devolver un generador que recorre las páginas a demanda
         
         Returns:
-            list: Lista de tuplas con los datos de los goleadores
+            Pagina: Tuplas (id_jugador, goles) ordenadas por goles (o generador si stream)
         """
         try:
             session = db_manager.get_cassandra_session()
             
             query_stmt = session.prepare("""
-                SELECT id_jugador, nombrejugador, apellidojugador, seleccion, golesko
-                FROM goleadores_ko_edicion
+                SELECT id_jugador, goles
+                FROM goleadores_ko_contador
                 WHERE edicion = ?
             """)
+            query_stmt.is_idempotent = True  # habilita la ejecución especulativa
             
-            rows = session.execute(query_stmt, (edicion,))
-            return list(rows)
+            rows = session.execute(
+                query_stmt, (edicion,),
+                **opciones_cassandra({'execution_profile': db_manager.cassandra_perfil_lectura})
+            )
+            registrar_cassandra(query_stmt, (edicion,), rows)
+            return paginar_ordenado(rows, lambda x: x.goles, limit, page_token, stream)
             
         except Exception as e:
-            print(f"❌ Error obteniendo datos de Cassandra: {e}")
-            return []
+            ETLManager._error_lectura('cassandra', e)
+            return Pagina()
     
     @staticmethod
-    def etl_arbitros_fases_finales(edicion):
+    def etl_arbitros_fases_finales(edicion, workers=None):
         """
         ETL: Extraer árbitros de fases finales desde PostgreSQL y cargar en MongoDB
         
         Args:
             edicion (str): Nombre de la edición del mundial (ej: 'Mundial 2030')
+            workers (int): Procesos para la transformación (None = ETL_WORKERS)
         
         Returns:
             bool: True si fue exitoso, False si hubo error
         """
-        try:
-            print(f"\n🔄 Iniciando ETL para árbitros fases finales - {edicion}...")
-            
-            # EXTRACT: Obtener datos desde PostgreSQL
-            print("📥 Extrayendo datos desde PostgreSQL...")
-            cursor = db_manager.get_postgresql_cursor()
-            
-            cursor.execute("SELECT * FROM get_arbitros_fases_finales(%s)", (edicion,))
-            
-            rows = cursor.fetchall()
-            
-            if not rows:
-                print(f"⚠️  No se encontraron árbitros para {edicion}")
-                return False
-            
-            print(f"✅ Extraídos {len(rows)} registros desde PostgreSQL")
-            
-            # TRANSFORM: Agrupar por partido
-            print("🔄 Transformando datos...")
-            partidos = defaultdict(lambda: {
-                'edicion': edicion,
-                'fase': None,
-                'idPartido': None,
-                'local': None,
-                'visitante': None,
-                'arbitros': []
-            })
-            
-            for row in rows:
-                # row contiene: (edicion, fase, id_partido, local, visitante, arbitro, rol)
-                id_partido = row[2]
-                
-                # Si es la primera vez que vemos este partido, llenar datos básicos
-                if partidos[id_partido]['idPartido'] is None:
-                    partidos[id_partido]['fase'] = row[1]
-                    partidos[id_partido]['idPartido'] = id_partido
-                    partidos[id_partido]['local'] = row[3]
-                    partidos[id_partido]['visitante'] = row[4]
-                
-                # Agregar árbitro
-                partidos[id_partido]['arbitros'].append({
-                    'nombre': row[5],
-                    'rol': row[6]
-                })
-            
-            # LOAD: Insertar en MongoDB
-            print("📤 Cargando datos en MongoDB...")
-            db = db_manager.get_mongodb_db()
-            collection = db['arbitros_fases_finales']
-            
-            # Limpiar datos anteriores de la misma edición
-            collection.delete_many({'edicion': edicion})
-            
-            # Insertar documentos
-            documentos = list(partidos.values())
-            if documentos:
-                collection.insert_many(documentos)
-            
-            print(f"✅ Cargados {len(documentos)} partidos en MongoDB")
-            print("✨ ETL completado exitosamente\n")
-            
-            cursor.close()
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error en ETL: {e}")
-            return False
+        return motor_etl.ejecutar(modelos_lectura.ARBITROS_FASES_FINALES, workers, edicion=edicion)
     
     @staticmethod
-    def obtener_arbitros_fases_finales_mongodb(edicion):
+    @cacheado('arbitros_fases_finales')
+    def obtener_arbitros_fases_finales_mongodb(edicion, limit=None, page_token=None, stream=False):
         """
         Obtener árbitros de fases finales desde MongoDB
         
         Args:
             edicion (str): Nombre de la edición del mundial
+            limit (int): Cantidad máxima de filas (None = todas)
+            page_token (str): Token de la página anterior (ver paginacion.Pagina)
+            stream (bool): Devolver un generador que recorre las páginas a demanda
         
         Returns:
-            list: Lista de documentos con los datos
+            Pagina: Lista de documentos con los datos (o generador si stream)
         """
         try:
             db = db_manager.get_mongodb_db()
             collection = db['arbitros_fases_finales']
             
             # Consultar documentos y ordenar por fase y id de partido
-            documentos = list(collection.find(
+            return leer_mongo(
+                collection,
                 {'edicion': edicion},
-                {'_id': 0}  # Excluir el _id de los resultados
-            ).sort([('fase', 1), ('idPartido', 1)]))
+                {'_id': 0},  # Excluir el _id de los resultados
+                [('fase', 1), ('idPartido', 1)],
+                limit, page_token, stream,
+                al_fallar=ETLManager._fallo_stream('mongodb')
+            )
+            
+        except Exception as e:
+            ETLManager._error_lectura('mongodb', e)
+            return Pagina()
+    
+    @staticmethod
+    @cacheado('arbitros_fases_finales')
+    def obtener_partidos_arbitro_mongodb(arbitro, rol=None, edicion=None, limit=None, page_token=None,
+                                         stream=False):
+        """
+        Obtener los partidos de fases finales que dirigió un árbitro
+        
+        Lee la vista por árbitro con el índice (arbitro, rol, edicion, idPartido).
+        
+        Args:
+            arbitro (str): Nombre del árbitro
+            rol (str): Filtrar por rol (None = todos los roles)
+            edicion (str): Filtrar por edición (None = todas las ediciones)
+            limit (int): Cantidad máxima de filas (None = todas)
+            page_token (str): Token de la página anterior (ver paginacion.Pagina)
+            stream (bool): Devolver un generador que recorre las páginas a demanda
+        
+        Returns:
+            Pagina: Documentos {arbitro, rol, edicion, idPartido, fase, local, visitante}
+        """
+        try:
+            filtro = {'arbitro': arbitro}
+            if rol is not None:
+                filtro['rol'] = rol
+            if edicion is not None:
+                filtro['edicion'] = edicion
+            return leer_mongo(
+                db_manager.get_mongodb_db()[vista_arbitros.COLECCION],
+                filtro,
+                {'_id': 0},
+                vista_arbitros.ORDEN_POR_ARBITRO,
+                limit, page_token, stream,
+                al_fallar=ETLManager._fallo_stream('mongodb')
+            )
             
-            return documentos
+        except Exception as e:
+            ETLManager._error_lectura('mongodb', e)
+            return Pagina()
+    
+    @staticmethod
+    @cacheado('arbitros_fases_finales')
+    def obtener_arbitros_por_rol_mongodb(rol, edicion=None, limit=None, page_token=None, stream=False):
+        """
+        Obtener las designaciones de todos los árbitros en un rol
+        
+        Lee la vista por árbitro con el índice (rol, edicion, idPartido, arbitro).
+        
+        Args:
+            rol (str): Rol del árbitro (ej: 'Principal')
+            edicion (str): Filtrar por edición (None = todas las ediciones)
+            limit (int): Cantidad máxima de filas (None = todas)
+            page_token (str): Token de la página anterior (ver paginacion.Pagina)
+            stream (bool): Devolver un generador que recorre las páginas a demanda
+        
+        Returns:
+            Pagina: Documentos {arbitro, rol, edicion, idPartido, fase, local, visitante}
+        """
+        try:
+            filtro = {'rol': rol}
+            if edicion is not None:
+                filtro['edicion'] = edicion
+            return leer_mongo(
+                db_manager.get_mongodb_db()[vista_arbitros.COLECCION],
+                filtro,
+                {'_id': 0},
+                vista_arbitros.ORDEN_POR_ROL,
+                limit, page_token, stream,
+                al_fallar=ETLManager._fallo_stream('mongodb')
+            )
             
         except Exception as e:
-            print(f"❌ Error obteniendo datos de MongoDB: {e}")
-            return []
+            ETLManager._error_lectura('mongodb', e)
+            return Pagina()
     
     @staticmethod
     def etl_jugadores_goles_pais(edicion, pais, min_goles):
@@ -618,106 +631,240 @@ class ETLManager:
         Returns:
             bool: True si fue exitoso, False si hubo error
         """
-        try:
-            print(f"\n🔄 Iniciando ETL para jugadores de {pais} - {edicion}...")
-            
-            # EXTRACT: Obtener datos desde PostgreSQL (con mínimo de goles para extraer)
-            print("📥 Extrayendo datos desde PostgreSQL...")
-            cursor = db_manager.get_postgresql_cursor()
-            
-            cursor.execute("SELECT * FROM get_jugadores_pais_min_goles(%s, %s, %s)", (edicion, pais, min_goles))
-            
-            rows = cursor.fetchall()
-            
-            if not rows:
-                print(f"⚠️  No se encontraron jugadores de {pais} con {min_goles}+ goles")
-                return False
-            
-            print(f"✅ Extraídos {len(rows)} jugadores desde PostgreSQL")
-            
-            # TRANSFORM: Crear documento con array de jugadores
-            print("🔄 Transformando datos...")
-            from datetime import datetime
-            
-            jugadores = []
-            for row in rows:
-                # row contiene: (id_jugador, nombre, apellido, pais, goles_totales)
-                jugadores.append({
-                    'id_jugador': row[0],
-                    'nombre': row[1],
-                    'apellido': row[2],
-                    'goles_totales': row[4]
-                })
-            
-            documento = {
-                'edicion': edicion,
-                'pais': pais,
-                'jugadores': jugadores,
-                'actualizado_en': datetime.utcnow()
-            }
-            
-            # LOAD: Insertar en MongoDB
-            print("📤 Cargando datos en MongoDB...")
-            db = db_manager.get_mongodb_db()
-            collection = db['jugadores_goleadores']
-            
-            # Reemplazar documento existente de la misma edición y país
-            collection.replace_one(
-                {'edicion': edicion, 'pais': pais},
-                documento,
-                upsert=True
-            )
-            
-            print(f"✅ Cargado documento con {len(jugadores)} jugadores en MongoDB")
-            print("✨ ETL completado exitosamente\n")
-            
-            cursor.close()
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error en ETL: {e}")
-            return False
+        return motor_etl.ejecutar(
+            modelos_lectura.JUGADORES_GOLEADORES, edicion=edicion, pais=pais, min_goles=min_goles
+        )
     
     @staticmethod
-    def obtener_jugadores_goles_pais_mongodb(edicion, pais, min_goles):
+    @cacheado('jugadores_goleadores')
+    def obtener_jugadores_goles_pais_mongodb(edicion, pais, min_goles, limit=None, page_token=None, stream=False):
         """
         Obtener jugadores con mínimo de goles desde MongoDB
         
+        El filtrado, el orden y el límite se resuelven en el servidor con una
+        agregación sobre el array de jugadores del documento.
+        
         Args:
             edicion (str): Nombre de la edición del mundial
             pais (str): País de los jugadores
             min_goles (int): Mínimo de goles para filtrar
+            limit (int): Cantidad máxima de filas (None = todas)
+            page_token (str): Token de la página anterior (ver paginacion.Pagina)
+            stream (bool): Devolver un generador que recorre las páginas a demanda
         
         Returns:
-            list: Lista de jugadores que cumplen el criterio
+            Pagina: Lista de jugadores que cumplen el criterio (o generador si stream)
         """
         try:
             db = db_manager.get_mongodb_db()
             collection = db['jugadores_goleadores']
             
-            # Buscar documento del país y edición
-            documento = collection.find_one(
-                {'edicion': edicion, 'pais': pais},
-                {'_id': 0}
+            # Filtrar jugadores por mínimo de goles y ordenar por goles descendente
+            pipeline = [
+                {'$match': {'edicion': edicion, 'pais': pais}},
+                {'$unwind': '$jugadores'},
+                {'$replaceRoot': {'newRoot': '$jugadores'}},
+                {'$match': {'goles_totales': {'$gte': min_goles}}},
+                {'$sort': {'goles_totales': -1, 'id_jugador': 1}}
+            ]
+            return leer_mongo_agregacion(
+                collection, pipeline, limit, page_token, stream,
+                al_fallar=ETLManager._fallo_stream('mongodb')
             )
             
-            if not documento:
-                return []
-            
-            # Filtrar jugadores por mínimo de goles
-            jugadores_filtrados = [
-                j for j in documento['jugadores'] 
-                if j['goles_totales'] >= min_goles
-            ]
+        except Exception as e:
+            ETLManager._error_lectura('mongodb', e)
+            return Pagina()
+    
+    @staticmethod
+    def etl_arbitros_fases_finales_ediciones(ediciones, workers=None):
+        """
+        ETL: Reprocesar árbitros de fases finales de varias ediciones a la vez
+
+        La extracción se hace edición por edición; la transformación de todas
+        las ediciones se reparte por partido en un pool de procesos.
+
+        Args:
+            ediciones (list): Nombres de las ediciones (ej: ['Mundial 2026', 'Mundial 2030'])
+            workers (int): Procesos para la transformación (None = ETL_WORKERS)
+
+        Returns:
+            bool: True si fue exitoso, False si hubo error
+        """
+        return motor_etl.ejecutar_lote(
+            modelos_lectura.ARBITROS_FASES_FINALES,
+            [{'edicion': edicion} for edicion in ediciones],
+            workers
+        )
+
+    @staticmethod
+    def etl_jugadores_goles_paises(ediciones, paises, min_goles, workers=None):
+        """
+        ETL: Reprocesar jugadores goleadores de varias ediciones y países a la vez
+
+        Args:
+            ediciones (list): Nombres de las ediciones del mundial
+            paises (list): Países de los jugadores
+            min_goles (int): Mínimo de goles (usado solo para extracción inicial)
+            workers (int): Procesos para la transformación (None = ETL_WORKERS)
+
+        Returns:
+            bool: True si fue exitoso, False si hubo error
+        """
+        return motor_etl.ejecutar_lote(
+            modelos_lectura.JUGADORES_GOLEADORES,
+            [{'edicion': e, 'pais': p, 'min_goles': min_goles} for e in ediciones for p in paises],
+            workers
+        )
+
+    @staticmethod
+    def obtener_top_leaderboard_redis(leaderboard, edicion, n=10):
+        """
+        Obtener los N primeros de un leaderboard de Redis
+        
+        Args:
+            leaderboard (str): leaderboards.LEADERBOARD_GOLES_SELECCION o LEADERBOARD_GOLEADORES_KO
+            edicion (str): Nombre de la edición del mundial
+            n (int): Cantidad de posiciones
+        
+        Returns:
+            list: Dicts con 'miembro', 'goles' y los detalles del miembro
+        """
+        try:
+            return leaderboards.top(db_manager.get_redis_client(), leaderboard, edicion, n)
+        except Exception as e:
+            logger.error("❌ Error obteniendo datos de Redis: %s", e)
+            return []
+    
+    @staticmethod
+    def obtener_posicion_leaderboard_redis(leaderboard, edicion, miembro):
+        """
+        Obtener la posición y los goles de una selección o jugador en un leaderboard
+        
+        Args:
+            leaderboard (str): Leaderboard a consultar
+            edicion (str): Nombre de la edición del mundial
+            miembro (str | int): Selección o id de jugador
+        
+        Returns:
+            dict: {'posicion', 'goles'} o None si no está en el ranking
+        """
+        try:
+            return leaderboards.posicion(db_manager.get_redis_client(), leaderboard, edicion, miembro)
+        except Exception as e:
+            logger.error("❌ Error obteniendo datos de Redis: %s", e)
+            return None
+    
+    @staticmethod
+    def obtener_rango_goles_leaderboard_redis(leaderboard, edicion, minimo, maximo='+inf'):
+        """
+        Obtener los miembros de un leaderboard con goles dentro de un rango
+        
+        Args:
+            leaderboard (str): Leaderboard a consultar
+            edicion (str): Nombre de la edición del mundial
+            minimo (int): Goles mínimos (inclusive)
+            maximo (int): Goles máximos (inclusive, '+inf' = sin tope)
+        
+        Returns:
+            list: Dicts con 'miembro', 'goles' y los detalles, de mayor a menor
+        """
+        try:
+            return leaderboards.por_goles(db_manager.get_redis_client(), leaderboard, edicion, minimo, maximo)
+        except Exception as e:
+            logger.error("❌ Error obteniendo datos de Redis: %s", e)
+            return []
+    
+    @staticmethod
+    def activar_perfilado():
+        """
+        Empezar una corrida de perfilado (ver perfilado.py)
+
+        Mientras está activo, el ETL registra el EXPLAIN (ANALYZE, BUFFERS) de
+        cada extracción y las lecturas (sin cache L1) la traza de Cassandra,
+        el explain() de MongoDB y el PROFILE de Neo4j.
+        """
+        perfilador.activar()
+
+    @staticmethod
+    def desactivar_perfilado(guardar=True):
+        """
+        Terminar la corrida de perfilado
+
+        Args:
+            guardar (bool): Guardar también el reporte en JSON
+
+        Returns:
+            dict: Reporte con los planes de todas las consultas de la corrida
+        """
+        reporte = perfilador.desactivar()
+        if guardar:
+            try:
+                ruta = perfilador.guardar()
+                logger.info("💾 Reporte de perfilado guardado en %s", ruta)
+            except OSError as e:
+                logger.warning("⚠️  No se pudo guardar el reporte de perfilado: %s", e)
+        return reporte
+
+    @staticmethod
+    def reporte_perfilado():
+        """
+        Reporte de la corrida de perfilado actual
+
+        Returns:
+            dict: inicio, fin, consultas por backend y entradas con sus planes
+        """
+        return perfilador.reporte()
+
+    @staticmethod
+    def _error_lectura(backend, e):
+        """Informar un error de lectura y contarlo en el circuit breaker del backend"""
+        nombres = {'cassandra': 'Cassandra', 'mongodb': 'MongoDB', 'redis': 'Redis'}
+        logger.error("❌ Error obteniendo datos de %s: %s", nombres[backend], e)
+        _contar_error_lectura()
+        # Un circuito abierto o un page_token inválido no son fallos nuevos del backend
+        if not isinstance(e, (BackendNoDisponible, ValueError)):
+            db_manager.reportar_fallo(backend)
+    
+    @staticmethod
+    def _fallo_stream(backend):
+        """Callback para paginacion: un error a mitad de un stream se informa como los demás"""
+        return lambda e: ETLManager._error_lectura(backend, e)
+    
+    @staticmethod
+    def _leer_particiones_cassandra(query, claves, limit):
+        """Fan-out de una lectura por partición; las claves que fallan quedan vacías"""
+        try:
+            session = db_manager.get_cassandra_session()
             
-            # Ordenar por goles descendente
-            jugadores_filtrados.sort(key=lambda x: x['goles_totales'], reverse=True)
+            query_stmt = session.prepare(query)
+            query_stmt.is_idempotent = True  # habilita la ejecución especulativa
             
-            return jugadores_filtrados
+            resultados, errores = leer_particiones_cassandra(
+                session, query_stmt, claves, limit,
+                execution_profile=db_manager.cassandra_perfil_lectura
+            )
+            if errores:
+                clave, e = next(iter(errores.items()))
+                ETLManager._error_lectura('cassandra', e)
+                logger.warning("⚠️  %s de %s particiones sin datos (ej: %s)", len(errores), len(resultados), clave)
+            return resultados
             
         except Exception as e:
-            print(f"❌ Error obteniendo datos de MongoDB: {e}")
-            return []
+            ETLManager._error_lectura('cassandra', e)
+            return {clave: Pagina() for clave in claves}
+    
+    @staticmethod
+    def _leer_leaderboard_respaldo(leaderboard, edicion, limit, convertir):
+        """Leer un ranking desde Redis cuando Cassandra no está disponible"""
+        try:
+            r = db_manager.get_redis_client()
+            items = leaderboards.top(r, leaderboard, edicion, limit or 0)
+            logger.info("↪️  Usando leaderboard de Redis (%s entradas)", len(items))
+            return Pagina(convertir(item) for item in items)
+        except Exception as e:
+            ETLManager._error_lectura('redis', e)
+            return Pagina()
 
 
 def etl_partidos_ko_neo4j(db_manager, edicion):
@@ -731,91 +878,114 @@ def etl_partidos_ko_neo4j(db_manager, edicion):
     Returns:
         int: Número de relaciones creadas
     """
-    try:
-        # Obtener conexiones
-        pg_conn = db_manager.pg_conn
-        neo4j_driver = db_manager.get_neo4j_driver()
-        
-        # Primero obtener el id_edicion numérico desde el nombre
-        cursor = pg_conn.cursor()
-        cursor.execute("""
-            SELECT DISTINCT id_edicion 
-            FROM vw_partidos_ko_edges 
-            WHERE edicion_nombre = %s
-        """, (edicion,))
-        
-        result = cursor.fetchone()
-        if not result:
-            print(f"⚠️ No se encontró la edición '{edicion}'")
-            return 0
-        
-        id_edicion = result[0]
-        print(f"📌 ID de edición: {id_edicion}")
-        
-        # Extraer datos desde PostgreSQL
-        print(f"🔄 Extrayendo datos de vw_partidos_ko_edges para edición {edicion}...")
-        cursor.execute("""
-            SELECT id_edicion, id_partido, fase, sel_a, pais_a, sel_b, pais_b
-            FROM vw_partidos_ko_edges
-            WHERE edicion_nombre = %s
-        """, (edicion,))
-        
-        rows = cursor.fetchall()
-        cursor.close()
-        
-        if not rows:
-            print(f"⚠️ No se encontraron partidos KO para la edición {edicion}")
-            return 0
-        
-        print(f"📊 {len(rows)} partidos encontrados")
-        
-        # Cargar en Neo4j
-        print(f"🔄 Cargando grafo en Neo4j...")
+    # La extracción y la carga usan el gestor global del motor (misma instancia)
+    _asegurar_indices_grafo(db_manager)
+    if not motor_etl.ejecutar(modelos_lectura.PARTIDOS_KO, edicion=edicion):
+        return 0
+    return motor_etl.ultima_ejecucion(modelos_lectura.PARTIDOS_KO.nombre)['filas_cargadas']
+
+
+def etl_partidos_ko_historico_neo4j(db_manager, ediciones=None):
+    """
+    Cargar en el mismo grafo los partidos de eliminación directa de varias ediciones
+    
+    Cada edición se reemplaza por separado (DETACH DELETE de su id_edicion), así
+    que las que no se recargan quedan intactas y el grafo acumula el historial.
+    
+    Args:
+        db_manager: Instancia del gestor de bases de datos
+        ediciones (list): Nombres de las ediciones (None = todas las de PostgreSQL)
         
-        with neo4j_driver.session() as session:
-            # Limpiar TODOS los datos anteriores de esta edición usando el ID numérico
-            print(f"🧹 Limpiando datos anteriores de edición {id_edicion}...")
-            session.run("""
-                MATCH (s:Seleccion)
-                WHERE s.id_edicion = $id_edicion
-                DETACH DELETE s
-            """, id_edicion=id_edicion)
-            
-            relaciones_creadas = 0
-            
-            for row in rows:
-                id_edicion_val, id_partido, fase, sel_a, pais_a, sel_b, pais_b = row
-                
-                # MERGE de los nodos de selecciones CON id_edicion como parte de la clave única
-                session.run("""
-                    MERGE (a:Seleccion {id_seleccion: $sel_a, id_edicion: $id_edicion})
-                    ON CREATE SET a.nombre = $pais_a
-                    MERGE (b:Seleccion {id_seleccion: $sel_b, id_edicion: $id_edicion})
-                    ON CREATE SET b.nombre = $pais_b
-                """, sel_a=sel_a, pais_a=pais_a, sel_b=sel_b, pais_b=pais_b, id_edicion=id_edicion_val)
-                
-                # MERGE de la relación JUEGA_CONTRA (evita duplicados)
-                session.run("""
-                    MATCH (a:Seleccion {id_seleccion: $sel_a, id_edicion: $id_edicion})
-                    MATCH (b:Seleccion {id_seleccion: $sel_b, id_edicion: $id_edicion})
-                    MERGE (a)-[r:JUEGA_CONTRA {id_partido: $id_partido, id_edicion: $id_edicion}]->(b)
-                    ON CREATE SET r.fase = $fase
-                """, sel_a=sel_a, sel_b=sel_b, 
-                     id_edicion=id_edicion_val, id_partido=id_partido, fase=fase)
-                
-                relaciones_creadas += 1
-            
-            print(f"✅ Grafo cargado: {relaciones_creadas} relaciones creadas")
-            return relaciones_creadas
-            
+    Returns:
+        int: Número de relaciones creadas
+    """
+    try:
+        if ediciones is None:
+            cursor = db_manager.get_postgresql_cursor()
+            try:
+                cursor.execute("""
+                    SELECT edicion_nombre
+                    FROM vw_partidos_ko_edges
+                    GROUP BY edicion_nombre
+                    ORDER BY MIN(id_edicion)
+                """)
+                ediciones = [row[0] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
     except Exception as e:
-        print(f"❌ Error en ETL de Neo4j: {e}")
+        logger.error("❌ No se pudieron listar las ediciones: %s", e)
         return 0
+    
+    if not ediciones:
+        logger.warning("⚠️ No hay ediciones con partidos de eliminación directa")
+        return 0
+    
+    _asegurar_indices_grafo(db_manager)
+    lista_parametros = [{'edicion': edicion} for edicion in ediciones]
+    if not motor_etl.ejecutar_lote(modelos_lectura.PARTIDOS_KO, lista_parametros):
+        return 0
+    return motor_etl.ultima_ejecucion(modelos_lectura.PARTIDOS_KO.nombre)['filas_cargadas']
+
+
+def _asegurar_indices_grafo(db_manager):
+    """Crear los índices del grafo KO sin hacer fallar la carga si no se puede"""
+    try:
+        grafo_ko.asegurar_indices(db_manager.get_neo4j_driver())
+    except Exception as e:
+        logger.warning("⚠️  No se pudieron crear los índices de Neo4j: %s", e)
+
+
+def enfrentamientos_ko_neo4j(db_manager, pais_a, pais_b):
+    """
+    Todos los cruces de eliminación directa entre dos selecciones en todas las ediciones
+    
+    Args:
+        db_manager: Instancia del gestor de bases de datos
+        pais_a: Primera selección
+        pais_b: Segunda selección
+        
+    Returns:
+        list: Dicts {edicion, id_edicion, fase, id_partido} (vacía si hubo error)
+    """
+    try:
+        return grafo_ko.enfrentamientos(db_manager.get_neo4j_driver(), pais_a, pais_b)
+    except Exception as e:
+        logger.error("❌ Error buscando enfrentamientos: %s", e)
+        return []
+
+
+def historial_ko_neo4j(db_manager, pais):
+    """
+    Historial de partidos de eliminación directa de una selección en todas las ediciones
+    
+    Returns:
+        list: Dicts {edicion, id_edicion, fase, id_partido, rival} (vacía si hubo error)
+    """
+    try:
+        return grafo_ko.historial(db_manager.get_neo4j_driver(), pais)
+    except Exception as e:
+        logger.error("❌ Error leyendo el historial KO: %s", e)
+        return []
+
+
+CONSULTA_CAMINO_ELIMINACION = """
+    MATCH (a:Seleccion {nombre: $pais_a, id_edicion: $id_edicion}), 
+          (b:Seleccion {nombre: $pais_b, id_edicion: $id_edicion}),
+          p = shortestPath((a)-[:JUEGA_CONTRA*]-(b))
+    WHERE ALL(r IN relationships(p) WHERE r.id_edicion = $id_edicion)
+    RETURN 
+        [n IN nodes(p) | n.nombre] AS camino_selecciones,
+        [r IN relationships(p) | {fase: r.fase, id_partido: r.id_partido}] AS camino_partidos
+"""
 
 
 def buscar_camino_eliminacion_neo4j(db_manager, edicion, pais_a, pais_b):
     """
-    Busca el camino más corto de eliminación entre dos selecciones en Neo4j
+    Busca el camino más corto de eliminación entre dos selecciones
+    
+    Primero consulta los caminos precalculados en Redis (ver caminos_ko); si el
+    par no está, ejecuta shortestPath en Neo4j. Con el perfilado activo va
+    siempre a Neo4j, para registrar el PROFILE de la consulta.
     
     Args:
         db_manager: Instancia del gestor de bases de datos
@@ -827,40 +997,45 @@ def buscar_camino_eliminacion_neo4j(db_manager, edicion, pais_a, pais_b):
         dict: Diccionario con 'camino_selecciones' y 'camino_partidos'
     """
     try:
-        pg_conn = db_manager.pg_conn
+        if not perfilador.activo:
+            encontrado, camino = caminos_ko.buscar(db_manager.get_redis_client(), edicion, pais_a, pais_b)
+            if encontrado:
+                logger.info("⚡ Camino obtenido de Redis (precalculado)")
+                return camino
+    except Exception as e:
+        logger.warning("⚠️  Caminos precalculados no disponibles (%s), consultando Neo4j", e)
+    
+    try:
         neo4j_driver = db_manager.get_neo4j_driver()
         
-        # Obtener el id_edicion numérico desde PostgreSQL
-        cursor = pg_conn.cursor()
-        cursor.execute("""
-            SELECT DISTINCT id_edicion 
-            FROM vw_partidos_ko_edges 
-            WHERE edicion_nombre = %s
-        """, (edicion,))
-        
-        result = cursor.fetchone()
-        cursor.close()
+        # Obtener el id_edicion numérico desde PostgreSQL (conecta si hace falta)
+        cursor = db_manager.get_postgresql_cursor()
+        try:
+            cursor.execute("""
+                SELECT DISTINCT id_edicion 
+                FROM vw_partidos_ko_edges 
+                WHERE edicion_nombre = %s
+            """, (edicion,))
+            result = cursor.fetchone()
+        finally:
+            cursor.close()
         
         if not result:
-            print(f"⚠️ No se encontró la edición '{edicion}'")
+            logger.warning("⚠️ No se encontró la edición '%s'", edicion)
             return None
         
         id_edicion = result[0]
-        print(f"🔍 Buscando en edición ID: {id_edicion}")
+        logger.info("🔍 Buscando en edición ID: %s", id_edicion)
         
         with neo4j_driver.session() as session:
             # Buscar camino usando el ID numérico de edición
-            result = session.run("""
-                MATCH (a:Seleccion {nombre: $pais_a, id_edicion: $id_edicion}), 
-                      (b:Seleccion {nombre: $pais_b, id_edicion: $id_edicion}),
-                      p = shortestPath((a)-[:JUEGA_CONTRA*]-(b))
-                WHERE ALL(r IN relationships(p) WHERE r.id_edicion = $id_edicion)
-                RETURN 
-                    [n IN nodes(p) | n.nombre] AS camino_selecciones,
-                    [r IN relationships(p) | {fase: r.fase, id_partido: r.id_partido}] AS camino_partidos
-            """, pais_a=pais_a, pais_b=pais_b, id_edicion=id_edicion)
+            parametros = {'pais_a': pais_a, 'pais_b': pais_b, 'id_edicion': id_edicion}
+            result = session.run(perfilar_cypher(CONSULTA_CAMINO_ELIMINACION), parametros)
             
             record = result.single()
+            if perfilador.activo:
+                with perfilador.operacion('buscar_camino_eliminacion_neo4j'):
+                    registrar_neo4j(CONSULTA_CAMINO_ELIMINACION, parametros, result.consume())
             
             if record:
                 return {
@@ -871,5 +1046,6 @@ def buscar_camino_eliminacion_neo4j(db_manager, edicion, pais_a, pais_b):
                 return None
                 
     except Exception as e:
-        print(f"❌ Error en búsqueda de camino: {e}")
+        logger.error("❌ Error en búsqueda de camino: %s", e)
+        _contar_error_lectura()
         return None
@@ -0,0 +1,309 @@
+"""
+Módulo de ETL disparado por eventos de PostgreSQL (LISTEN/NOTIFY)
+
+PostgreSQL publica un NOTIFY cada vez que cambia un resultado, un gol o una
+designación arbitral. El listener traduce cada evento en refrescos puntuales de
+los modelos de lectura afectados y los agrupa (debounce) para que una ráfaga de
+goles dispare un único refresco por modelo.
+
+Contrato de los eventos (payload JSON de pg_notify):
+    fifa_partidos: {"edicion", "grupo"?, "fase"?, "anio"?, "estadio"?, <resultado>?}
+    fifa_goles:    {"edicion", "grupo"?, "fase"?, "seleccion"?, "id_jugador"?, <resultado>?}
+    fifa_arbitros: {"edicion"}
+
+    <resultado>: "id_partido", "local", "visitante", "goles_local",
+    "goles_visitante" (y opcionalmente "goles_local_anterior" y
+    "goles_visitante_anterior"). Si un evento de un partido de grupo trae el
+    marcador, la tabla de posiciones se actualiza al instante con el motor
+    incremental en lugar de recalcularse en PostgreSQL.
+
+    Un fifa_goles con "seleccion" (e "id_jugador" en fases KO) se suma a los
+    contadores de goles de Cassandra en lugar de reagregar la edición.
+
+Ejemplo de trigger en PostgreSQL:
+    PERFORM pg_notify('fifa_goles', json_build_object(
+        'edicion', e.nombre, 'grupo', p.grupo, 'fase', p.fase)::text);
+"""
+
+import json
+import logging
+import select
+import threading
+import time
+
+import contadores_goles
+from circuit_breaker import BackendNoDisponible
+from db_manager import db_manager
+from etl_manager import ETLManager
+from posiciones_incrementales import MotorPosiciones
+
+logger = logging.getLogger(__name__)
+
+# Canales de notificación
+CANAL_PARTIDOS = 'fifa_partidos'
+CANAL_GOLES = 'fifa_goles'
+CANAL_ARBITROS = 'fifa_arbitros'
+CANALES = (CANAL_PARTIDOS, CANAL_GOLES, CANAL_ARBITROS)
+
+# Refrescos disponibles: nombre -> función ETL
+REFRESCOS = {
+    'tabla_posiciones': ETLManager.etl_tabla_posiciones,
+    'partidos_populares': ETLManager.etl_partidos_populares,
+    'partidos_fecha_estadio': ETLManager.etl_partidos_fecha_estadio,
+    'goles_seleccion_edicion': ETLManager.etl_goles_seleccion_edicion,
+    'goleadores_ko_edicion': ETLManager.etl_goleadores_ko_edicion,
+    'arbitros_fases_finales': ETLManager.etl_arbitros_fases_finales,
+}
+
+
+CAMPOS_RESULTADO = ('id_partido', 'local', 'visitante', 'goles_local', 'goles_visitante')
+
+
+def resultado_de_evento(datos):
+    """
+    Extraer el marcador de un partido de grupo incluido en el evento
+
+    Returns:
+        dict: Argumentos para MotorPosiciones.aplicar_resultado, o None
+    """
+    if not datos.get('grupo') or any(datos.get(c) is None for c in CAMPOS_RESULTADO):
+        return None
+    resultado = {c: datos[c] for c in CAMPOS_RESULTADO}
+    resultado.update(edicion=datos['edicion'], grupo=datos['grupo'])
+    if datos.get('goles_local_anterior') is not None:
+        resultado['anterior'] = (datos['goles_local_anterior'], datos['goles_visitante_anterior'])
+    return resultado
+
+
+def refrescos_para_evento(canal, datos):
+    """
+    Traducir un evento en los refrescos de modelos de lectura que lo necesitan
+
+    Args:
+        canal (str): Canal por el que llegó la notificación
+        datos (dict): Payload del evento
+
+    Returns:
+        set: Conjunto de (nombre_refresco, args)
+    """
+    edicion = datos.get('edicion')
+    if not edicion:
+        return set()
+
+    grupo = datos.get('grupo')
+    # Con el marcador en el evento la tabla se actualiza de forma incremental
+    recalcular_tabla = grupo and resultado_de_evento(datos) is None
+    refrescos = set()
+
+    if canal == CANAL_PARTIDOS:
+        if grupo:
+            if recalcular_tabla:
+                refrescos.add(('tabla_posiciones', (edicion, grupo)))
+            refrescos.add(('partidos_populares', (edicion, grupo)))
+        if datos.get('anio') and datos.get('estadio'):
+            refrescos.add(('partidos_fecha_estadio', (int(datos['anio']), datos['estadio'])))
+
+    elif canal == CANAL_GOLES:
+        # Un gol identificado se suma a los contadores; sin datos se reagrega la edición
+        contabilizado = bool(datos.get('seleccion'))
+        if not contabilizado:
+            refrescos.add(('goles_seleccion_edicion', (edicion,)))
+        if grupo:
+            if recalcular_tabla:
+                refrescos.add(('tabla_posiciones', (edicion, grupo)))
+        else:
+            # Los lectores de goleadores KO usan goleadores_ko_edicion (nombre,
+            # apellido, selección), que el contador por jugador no tiene
+            refrescos.add(('goleadores_ko_edicion', (edicion,)))
+
+    elif canal == CANAL_ARBITROS:
+        refrescos.add(('arbitros_fases_finales', (edicion,)))
+
+    return refrescos
+
+
+class EscuchaETL:
+    """Listener de NOTIFY que ejecuta los refrescos agrupados con debounce"""
+
+    def __init__(self, debounce=0.5, espera_maxima=5.0, espera_reconexion=1.0, espera_reconexion_maxima=60.0):
+        """
+        Args:
+            debounce (float): Segundos sin eventos nuevos antes de refrescar una clave
+            espera_maxima (float): Tope de espera desde el primer evento de la clave
+            espera_reconexion (float): Primera espera antes de reconectar el LISTEN
+            espera_reconexion_maxima (float): Tope del backoff exponencial de reconexión
+        """
+        self.debounce = debounce
+        self.espera_maxima = espera_maxima
+        self.espera_reconexion = espera_reconexion
+        self.espera_reconexion_maxima = espera_reconexion_maxima
+        # (nombre, args) -> [primer_evento, ultimo_evento]
+        self.pendientes = {}
+        # Refrescos completos de todo lo que tocó algún evento: se reprograman
+        # al reconectar, porque los NOTIFY enviados sin conexión se pierden
+        self.conocidos = set()
+        self.reconexiones = 0
+        self.eventos_recibidos = 0
+        self.refrescos_ejecutados = 0
+        self.posiciones = MotorPosiciones()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def registrar_evento(self, canal, payload, ahora=None):
+        """Registrar una notificación y programar sus refrescos"""
+        ahora = time.monotonic() if ahora is None else ahora
+        try:
+            datos = json.loads(payload) if payload else {}
+        except ValueError:
+            logger.warning("Payload inválido en %s: %r", canal, payload)
+            return
+
+        self.eventos_recibidos += 1
+        refrescos = refrescos_para_evento(canal, datos)
+
+        resultado = resultado_de_evento(datos) if canal in (CANAL_PARTIDOS, CANAL_GOLES) else None
+        if resultado and not self._aplicar_resultado(resultado):
+            # Sin tabla previa o con error: recalcular el grupo completo
+            refrescos.add(('tabla_posiciones', (resultado['edicion'], resultado['grupo'])))
+
+        if canal == CANAL_GOLES and datos.get('seleccion') and not self._contabilizar_gol(datos):
+            refrescos.add(('goles_seleccion_edicion', (datos['edicion'],)))
+            if not datos.get('grupo'):
+                refrescos.add(('goleadores_ko_edicion', (datos['edicion'],)))
+
+        self._programar(refrescos, ahora)
+
+        self.conocidos.update(refrescos)
+        if resultado:
+            self.conocidos.add(('tabla_posiciones', (resultado['edicion'], resultado['grupo'])))
+        if canal == CANAL_GOLES and datos.get('seleccion'):
+            self.conocidos.add(('goles_seleccion_edicion', (datos['edicion'],)))
+
+    def _programar(self, refrescos, ahora):
+        for clave in refrescos:
+            if clave in self.pendientes:
+                self.pendientes[clave][1] = ahora
+            else:
+                self.pendientes[clave] = [ahora, ahora]
+
+    def _aplicar_resultado(self, resultado):
+        """Aplicar un marcador con el motor incremental (sin debounce)"""
+        try:
+            return self.posiciones.aplicar_resultado(**resultado) is not None
+        except Exception as e:
+            logger.error("Error aplicando resultado %s: %s", resultado, e)
+            return False
+
+    def _contabilizar_gol(self, datos):
+        """Sumar el gol a los contadores (sin debounce)"""
+        return contadores_goles.registrar_gol(
+            datos['edicion'],
+            datos['seleccion'],
+            id_jugador=datos.get('id_jugador'),
+            ko=not datos.get('grupo')
+        )
+
+    def refrescos_listos(self, ahora=None):
+        """Sacar de pendientes las claves cuyo debounce (o espera máxima) venció"""
+        ahora = time.monotonic() if ahora is None else ahora
+        listos = [
+            clave for clave, (primero, ultimo) in self.pendientes.items()
+            if ahora - ultimo >= self.debounce or ahora - primero >= self.espera_maxima
+        ]
+        for clave in listos:
+            del self.pendientes[clave]
+        return listos
+
+    def ejecutar_refrescos(self, claves):
+        """Ejecutar los refrescos de a uno (comparten la conexión de PostgreSQL)"""
+        for nombre, args in claves:
+            logger.info("Refrescando %s%s", nombre, args)
+            try:
+                if nombre == 'tabla_posiciones':
+                    # El recálculo completo reemplaza la tabla en memoria
+                    self.posiciones.invalidar(*args)
+                REFRESCOS[nombre](*args)
+                self.refrescos_ejecutados += 1
+            except Exception as e:
+                logger.error("Error refrescando %s%s: %s", nombre, args, e)
+
+    def escuchar(self):
+        """
+        Bucle principal: esperar notificaciones y refrescar al vencer el debounce
+
+        Si se pierde la conexión se reintenta con backoff exponencial, se vuelve
+        a hacer LISTEN en todos los canales y se reprograma el refresco
+        completo de todo lo conocido (los NOTIFY de ese intervalo se perdieron).
+        """
+        from psycopg2 import InterfaceError, OperationalError
+
+        conn = None
+        espera = self.espera_reconexion
+        perdida = False
+        while not self._detener.is_set():
+            try:
+                if conn is None:
+                    conn = self._suscribir()
+                    if perdida:
+                        self.reconexiones += 1
+                        logger.info("LISTEN restablecido, reprogramando %s refrescos completos", len(self.conocidos))
+                        self._programar(self.conocidos, time.monotonic())
+                        perdida = False
+                    espera = self.espera_reconexion
+                self._atender(conn)
+            except (OperationalError, InterfaceError, BackendNoDisponible) as e:
+                logger.error("Conexión de LISTEN perdida (%s), reintentando en %.1fs", e, espera)
+                if conn is not None and not conn.closed:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                conn = None
+                perdida = True
+                self._detener.wait(espera)
+                espera = min(espera * 2, self.espera_reconexion_maxima)
+
+    def _suscribir(self):
+        """Abrir (o reutilizar) la conexión del listener y hacer LISTEN en todos los canales"""
+        conn = db_manager.get_postgresql_listener()
+        cursor = conn.cursor()
+        for canal in CANALES:
+            cursor.execute(f"LISTEN {canal}")
+        cursor.close()
+        logger.info("Escuchando canales: %s", ', '.join(CANALES))
+        return conn
+
+    def _atender(self, conn):
+        """Una vuelta del bucle: leer notificaciones y ejecutar los refrescos vencidos"""
+        if select.select([conn], [], [], self.debounce / 2) != ([], [], []):
+            conn.poll()
+            while conn.notifies:
+                notificacion = conn.notifies.pop(0)
+                self.registrar_evento(notificacion.channel, notificacion.payload)
+
+        listos = self.refrescos_listos()
+        if listos:
+            self.ejecutar_refrescos(listos)
+
+    def iniciar(self):
+        """Escuchar en un hilo en segundo plano"""
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self.escuchar, name='escucha-etl', daemon=True)
+        self._hilo.start()
+        return self._hilo
+
+    def detener(self):
+        """Detener el hilo de escucha"""
+        self._detener.set()
+        if self._hilo:
+            self._hilo.join()
+
+
+if __name__ == "__main__":
+    escucha = EscuchaETL()
+    try:
+        escucha.escuchar()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db_manager.close_all()
@@ -0,0 +1,145 @@
+"""
+Módulo de extracción masiva con COPY ... TO STDOUT
+
+Para reconstrucciones grandes (una edición completa o varias) el SELECT con
+cursor arma una tupla de Python por fila dentro del driver. Con COPY el
+servidor envía el resultado como texto en un solo flujo: un hilo lo recibe con
+copy_expert en trozos y el generador los parte en líneas y las convierte en
+lotes de tuplas, con los tipos que informa cursor.description, mientras el
+COPY sigue llegando.
+
+Se usa el formato texto de COPY (tabulaciones, NULL como \\N y saltos de línea
+escapados), que a diferencia de CSV distingue NULL de la cadena vacía.
+"""
+
+import queue
+import re
+import threading
+from datetime import date, datetime, time
+from decimal import Decimal
+
+_FIN = object()
+
+_ESCAPES = {'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t', 'v': '\v', '\\': '\\'}
+_PATRON_ESCAPE = re.compile(r'\\(.)')
+
+# OID del tipo de PostgreSQL -> conversión desde su representación de texto
+CONVERTIDORES = {
+    16: lambda v: v == 't',              # bool
+    20: int, 21: int, 23: int, 26: int,  # int8, int2, int4, oid
+    700: float, 701: float,              # float4, float8
+    1700: Decimal,                       # numeric
+    1082: date.fromisoformat,            # date
+    1083: time.fromisoformat,            # time
+    1114: datetime.fromisoformat,        # timestamp
+    1184: datetime.fromisoformat,        # timestamptz
+}
+
+
+def _desescapar(valor):
+    if '\\' not in valor:
+        return valor
+    return _PATRON_ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), valor)
+
+
+def convertidores(descripcion):
+    """
+    Funciones de conversión por columna a partir de cursor.description
+
+    Los tipos sin conversión conocida (text, varchar, json, ...) quedan como str.
+    """
+    return [CONVERTIDORES.get(columna.type_code, str) for columna in descripcion]
+
+
+def describir(cursor, consulta, valores):
+    """
+    Obtener cursor.description de una consulta sin traer filas
+
+    Returns:
+        tuple: Descripción de las columnas
+    """
+    cursor.execute(f"SELECT * FROM ({consulta}) AS q LIMIT 0", valores)
+    return cursor.description
+
+
+class _Canal:
+    """Archivo de destino de copy_expert que pasa los trozos a una cola acotada"""
+
+    def __init__(self, maximo):
+        self.cola = queue.Queue(maxsize=maximo)
+        self.cancelado = False
+
+    def write(self, datos):
+        if self.cancelado:
+            raise RuntimeError("Extracción COPY cancelada")
+        self.cola.put(bytes(datos))
+        return len(datos)
+
+
+def extraer_copy(cursor, consulta, valores, descripcion, tamanio_lote, trozos_en_vuelo=64):
+    """
+    Ejecutar COPY (consulta) TO STDOUT y devolver las filas en lotes
+
+    Args:
+        cursor: Cursor de psycopg2 (no nombrado)
+        consulta (str): SELECT con marcadores %s
+        valores (tuple): Valores de los marcadores
+        descripcion: cursor.description de la consulta (ver describir)
+        tamanio_lote (int): Filas por lote
+        trozos_en_vuelo (int): Trozos recibidos sin procesar como máximo
+
+    Yields:
+        list: Lotes de tuplas con los tipos de Python de cada columna
+    """
+    from psycopg2.extensions import encodings
+
+    codificacion = encodings.get(cursor.connection.encoding, 'utf-8')
+    conversiones = convertidores(descripcion)
+    sql = cursor.mogrify(consulta, valores).decode(codificacion)
+    canal = _Canal(trozos_en_vuelo)
+
+    def copiar():
+        try:
+            cursor.execute("SET LOCAL datestyle = 'ISO, YMD'")
+            cursor.copy_expert(f"COPY ({sql}) TO STDOUT", canal)
+        except Exception as e:
+            canal.cola.put(e)
+        finally:
+            canal.cola.put(_FIN)
+
+    hilo = threading.Thread(target=copiar, name='copy-extraccion', daemon=True)
+    hilo.start()
+
+    pendiente = b''
+    lote = []
+    terminado = False
+    try:
+        while True:
+            trozo = canal.cola.get()
+            if trozo is _FIN:
+                terminado = True
+                break
+            if isinstance(trozo, Exception):
+                raise trozo
+
+            lineas = (pendiente + trozo).split(b'\n')
+            pendiente = lineas.pop()
+            for linea in lineas:
+                campos = linea.decode(codificacion).split('\t')
+                lote.append(tuple(
+                    None if campo == '\\N' else convertir(_desescapar(campo))
+                    for campo, convertir in zip(campos, conversiones)
+                ))
+                if len(lote) >= tamanio_lote:
+                    yield lote
+                    lote = []
+
+        if lote:
+            yield lote
+    finally:
+        if not terminado:
+            # El consumidor abandonó el generador o falló: cortar el COPY y vaciar la cola
+            canal.cancelado = True
+            while canal.cola.get() is not _FIN:
+                pass
+        hilo.join()
@@ -0,0 +1,338 @@
+"""
+Generador de carga para los modelos de lectura
+
+Reproduce una mezcla configurable de los nueve casos de uso a una tasa objetivo
+(requests por segundo) con muchos usuarios virtuales concurrentes, y reporta
+por caso de uso throughput, latencias p50/p95/p99 y tasa de error.
+
+La llegada de requests es de lazo abierto: cada request tiene su instante
+programado y la latencia se mide desde ese instante, así una base saturada no
+esconde su cola de espera (coordinated omission).
+
+Los drivers son sincrónicos, por eso cada request corre en un pool de hilos
+del tamaño de la cantidad de usuarios virtuales. La línea de base de PostgreSQL
+usa una conexión por hilo: una sola conexión de psycopg2 serializa las consultas.
+
+Los obtener_* no propagan sus errores (devuelven una página vacía), así que un
+request cuenta como error si informó un error de lectura (ver
+etl_manager.errores_lectura), incluido un circuit breaker abierto.
+
+Uso:
+    python generador_carga.py --tasa 200 --usuarios 64 --duracion 30 \\
+        --mezcla tabla_posiciones=30,goles_seleccion=20,camino=5 --env .env.local
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+# Mezcla por defecto: peso relativo de cada caso de uso
+MEZCLA_DEFECTO = {
+    'tabla_posiciones': 25,
+    'arbitros': 5,
+    'jugadores': 10,
+    'partidos_populares': 10,
+    'fecha_estadio': 10,
+    'goles_seleccion': 15,
+    'sesion_periodista': 10,
+    'camino': 5,
+    'goleadores_ko': 10,
+}
+
+
+def parsear_mezcla(texto):
+    """
+    Convertir 'caso=peso,caso=peso' en un dict
+
+    Raises:
+        ValueError: Si el formato es inválido o el caso no existe
+    """
+    mezcla = {}
+    for parte in texto.split(','):
+        caso, _, peso = parte.partition('=')
+        caso = caso.strip()
+        if caso not in MEZCLA_DEFECTO and caso != 'postgres_tabla_posiciones':
+            raise ValueError(f"Caso de uso desconocido: {caso}")
+        mezcla[caso] = float(peso or 1)
+    return mezcla
+
+
+def percentil(valores_ordenados, p):
+    """Percentil p (0-100) por rango más cercano sobre una lista ya ordenada"""
+    if not valores_ordenados:
+        return 0.0
+    indice = max(0, min(len(valores_ordenados) - 1, int(round(p / 100 * len(valores_ordenados))) - 1))
+    return valores_ordenados[indice]
+
+
+class ConexionesPorHilo:
+    """Una conexión de PostgreSQL propia por hilo del pool, abierta al primer uso"""
+
+    def __init__(self, abrir):
+        """
+        Args:
+            abrir (callable): Abre una conexión nueva
+        """
+        self._abrir = abrir
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._abiertas = []
+
+    def obtener(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None or conexion.closed:
+            conexion = self._local.conexion = self._abrir()
+            conexion.autocommit = True  # sin transacciones abiertas entre requests
+            with self._lock:
+                self._abiertas.append(conexion)
+        return conexion
+
+    def cerrar(self):
+        with self._lock:
+            abiertas, self._abiertas = self._abiertas, []
+        for conexion in abiertas:
+            try:
+                conexion.close()
+            except Exception:
+                pass
+
+
+def crear_casos(args, conexiones_pg):
+    """
+    Funciones sin argumentos que ejecutan una lectura de cada caso de uso
+
+    Args:
+        args: Argumentos de la línea de comandos
+        conexiones_pg (ConexionesPorHilo): Conexiones para la línea de base de PostgreSQL
+
+    Returns:
+        dict: caso -> callable que devuelve el resultado de la lectura
+    """
+    from db_manager import db_manager
+    from etl_manager import ETLManager, buscar_camino_eliminacion_neo4j
+
+    def sesion_periodista():
+        # Caso 7: crear/renovar la sesión y leerla (mismo formato de clave que main)
+        r = db_manager.get_redis_client()
+        nombre = f"carga_{random.randint(1, args.periodistas)}"
+        clave = f"sesion:periodista:{nombre}_token"
+        r.set(clave, json.dumps({'periodista': nombre}), ex=7200)
+        return r.get(clave)
+
+    def postgres_tabla_posiciones():
+        # Línea de base: la misma consulta resuelta en PostgreSQL con JOINs y agregaciones
+        cursor = conexiones_pg.obtener().cursor()
+        try:
+            cursor.execute("SELECT * FROM get_tabla_posiciones_grupo(%s, %s)", (args.edicion, args.grupo))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    return {
+        'tabla_posiciones': lambda: ETLManager.obtener_tabla_posiciones_cassandra(args.edicion, args.grupo),
+        'arbitros': lambda: ETLManager.obtener_arbitros_fases_finales_mongodb(args.edicion),
+        'jugadores': lambda: ETLManager.obtener_jugadores_goles_pais_mongodb(
+            args.edicion, args.pais, args.min_goles),
+        'partidos_populares': lambda: ETLManager.obtener_partidos_populares_cassandra(args.edicion, args.grupo),
+        'fecha_estadio': lambda: ETLManager.obtener_partidos_fecha_estadio_cassandra(
+            args.estadio, args.anio),
+        'goles_seleccion': lambda: ETLManager.obtener_goles_seleccion_edicion_cassandra(args.edicion),
+        'sesion_periodista': sesion_periodista,
+        'camino': lambda: buscar_camino_eliminacion_neo4j(db_manager, args.edicion, args.pais_a, args.pais_b),
+        'goleadores_ko': lambda: ETLManager.obtener_goleadores_ko_edicion_cassandra(args.edicion),
+        'postgres_tabla_posiciones': postgres_tabla_posiciones,
+    }
+
+
+class Resultados:
+    """Latencias y errores por caso de uso"""
+
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.errores = defaultdict(int)
+        self.vacios = defaultdict(int)
+
+    def registrar(self, caso, segundos, error=False, vacio=False):
+        self.latencias[caso].append(segundos)
+        if error:
+            self.errores[caso] += 1
+        elif vacio:
+            self.vacios[caso] += 1
+
+    def reporte(self, duracion):
+        """
+        Resumen por caso de uso
+
+        Returns:
+            list: Dicts con requests, throughput, p50/p95/p99 (ms) y tasa de error
+        """
+        filas = []
+        for caso in sorted(self.latencias):
+            latencias = sorted(self.latencias[caso])
+            total = len(latencias)
+            filas.append({
+                'caso': caso,
+                'requests': total,
+                'throughput': total / duracion if duracion else 0.0,
+                'p50_ms': percentil(latencias, 50) * 1000,
+                'p95_ms': percentil(latencias, 95) * 1000,
+                'p99_ms': percentil(latencias, 99) * 1000,
+                'media_ms': statistics.fmean(latencias) * 1000,
+                'errores': self.errores[caso],
+                'vacios': self.vacios[caso],
+                'tasa_error': self.errores[caso] / total if total else 0.0
+            })
+        return filas
+
+
+async def ejecutar_carga(casos, mezcla, tasa, usuarios, duracion):
+    """
+    Lanzar requests a `tasa` por segundo durante `duracion` segundos
+
+    Args:
+        casos (dict): caso -> callable
+        mezcla (dict): caso -> peso relativo
+        tasa (float): Requests por segundo objetivo
+        usuarios (int): Usuarios virtuales (requests en vuelo como máximo)
+        duracion (float): Segundos de carga
+
+    Returns:
+        tuple: (Resultados, segundos reales)
+    """
+    loop = asyncio.get_running_loop()
+    resultados = Resultados()
+    nombres = list(mezcla)
+    pesos = [mezcla[n] for n in nombres]
+    usuarios_libres = asyncio.Semaphore(usuarios)
+    pendientes = set()
+
+    from etl_manager import errores_lectura
+
+    def medir(caso, programado):
+        try:
+            errores_previos = errores_lectura()
+            valor = casos[caso]()
+            error = errores_lectura() > errores_previos
+            vacio = valor is None or (hasattr(valor, '__len__') and len(valor) == 0)
+            resultados.registrar(caso, time.perf_counter() - programado, error=error, vacio=vacio)
+        except Exception:
+            resultados.registrar(caso, time.perf_counter() - programado, error=True)
+
+    async def request(caso, programado):
+        async with usuarios_libres:
+            await loop.run_in_executor(pool, medir, caso, programado)
+
+    with ThreadPoolExecutor(max_workers=usuarios) as pool:
+        inicio = time.perf_counter()
+        intervalo = 1.0 / tasa
+        enviados = 0
+        while True:
+            programado = inicio + enviados * intervalo
+            if programado - inicio >= duracion:
+                break
+            espera = programado - time.perf_counter()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            caso = random.choices(nombres, pesos)[0]
+            tarea = asyncio.create_task(request(caso, programado))
+            pendientes.add(tarea)
+            tarea.add_done_callback(pendientes.discard)
+            enviados += 1
+
+        if pendientes:
+            await asyncio.gather(*pendientes)
+        total = time.perf_counter() - inicio
+
+    return resultados, total
+
+
+def imprimir_reporte(filas, duracion):
+    print("\n" + "=" * 100)
+    print(f"📈 RESULTADOS ({duracion:.1f}s)")
+    print("=" * 100)
+    print(f"{'Caso':<26} {'Req':>7} {'Req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'Errores':>8} {'Vacíos':>7} {'% error':>8}")
+    print("-" * 100)
+    for f in filas:
+        print(f"{f['caso']:<26} {f['requests']:>7} {f['throughput']:>8.1f} {f['p50_ms']:>9.2f} "
+              f"{f['p95_ms']:>9.2f} {f['p99_ms']:>9.2f} {f['errores']:>8} {f['vacios']:>7} "
+              f"{f['tasa_error'] * 100:>7.2f}%")
+    total = sum(f['requests'] for f in filas)
+    errores = sum(f['errores'] for f in filas)
+    print("-" * 100)
+    print(f"{'TOTAL':<26} {total:>7} {total / duracion:>8.1f} {'':>29} {errores:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para los casos de uso FIFA")
+    parser.add_argument('--tasa', type=float, default=100, help="Requests por segundo objetivo")
+    parser.add_argument('--usuarios', type=int, default=32, help="Usuarios virtuales concurrentes")
+    parser.add_argument('--duracion', type=float, default=30, help="Segundos de carga")
+    parser.add_argument('--mezcla', type=parsear_mezcla, default=MEZCLA_DEFECTO,
+                        help="Pesos 'caso=peso,...' (incluye postgres_tabla_posiciones como línea de base)")
+    parser.add_argument('--env', help="Archivo .env con las bases locales de prueba")
+    parser.add_argument('--con-cache', action='store_true', help="Mantener la cache L1 (por defecto se mide el backend)")
+    parser.add_argument('--preparar', action='store_true', help="Ejecutar los ETL una vez antes de la carga")
+    parser.add_argument('--json', help="Guardar el reporte en un archivo JSON")
+    parser.add_argument('--edicion', default='Mundial 2030')
+    parser.add_argument('--grupo', default='A')
+    parser.add_argument('--pais', default='Argentina')
+    parser.add_argument('--min-goles', type=int, default=1)
+    parser.add_argument('--anio', type=int, default=2030)
+    parser.add_argument('--estadio', default='Estadio Centenario')
+    parser.add_argument('--pais-a', default='Argentina')
+    parser.add_argument('--pais-b', default='Brasil')
+    parser.add_argument('--periodistas', type=int, default=1000, help="Periodistas distintos en el caso 7")
+    args = parser.parse_args()
+
+    # Las variables del archivo indicado tienen prioridad sobre el .env del proyecto
+    if args.env:
+        load_dotenv(args.env, override=True)
+
+    from cache_l1 import cache
+    from db_manager import db_manager
+
+    cache.habilitada = args.con_cache
+
+    if args.preparar:
+        from etl_manager import ETLManager, etl_partidos_ko_neo4j
+        ETLManager.etl_tabla_posiciones(args.edicion, args.grupo)
+        ETLManager.etl_partidos_populares(args.edicion, args.grupo)
+        ETLManager.etl_goles_seleccion_edicion(args.edicion)
+        ETLManager.etl_partidos_fecha_estadio(args.anio, args.estadio)
+        ETLManager.etl_goleadores_ko_edicion(args.edicion)
+        ETLManager.etl_arbitros_fases_finales(args.edicion)
+        ETLManager.etl_jugadores_goles_pais(args.edicion, args.pais, args.min_goles)
+        etl_partidos_ko_neo4j(db_manager, args.edicion)
+
+    conexiones_pg = ConexionesPorHilo(db_manager.abrir_postgresql_propia)
+    casos = crear_casos(args, conexiones_pg)
+    print(f"\n🚀 Carga: {args.tasa:.0f} req/s, {args.usuarios} usuarios, {args.duracion:.0f}s")
+    print(f"   Mezcla: {', '.join(f'{c}={p:g}' for c, p in args.mezcla.items())}")
+
+    try:
+        resultados, duracion = asyncio.run(
+            ejecutar_carga(casos, args.mezcla, args.tasa, args.usuarios, args.duracion)
+        )
+    finally:
+        conexiones_pg.cerrar()
+        db_manager.close_all()
+
+    filas = resultados.reporte(duracion)
+    imprimir_reporte(filas, duracion)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump({'duracion': duracion, 'casos': filas}, archivo, indent=2, ensure_ascii=False)
+        print(f"\n💾 Reporte guardado en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
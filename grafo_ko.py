@@ -0,0 +1,82 @@
+"""
+Módulo del grafo histórico de eliminación directa en Neo4j
+
+Cada edición se carga en el mismo grafo con sus propios nodos Seleccion
+(id_seleccion, id_edicion), así que todas las ediciones conviven y se pueden
+consultar juntas. Los índices hacen que cada carga (MERGE por id_seleccion e
+id_edicion) y cada consulta por selección arranquen con una búsqueda por
+índice en lugar de recorrer todos los nodos, sin importar cuántas ediciones
+haya en el grafo.
+"""
+
+import threading
+
+INDICES = [
+    # MERGE de la carga
+    "CREATE INDEX seleccion_id IF NOT EXISTS FOR (s:Seleccion) ON (s.id_seleccion, s.id_edicion)",
+    # DETACH DELETE de una edición antes de recargarla
+    "CREATE INDEX seleccion_edicion IF NOT EXISTS FOR (s:Seleccion) ON (s.id_edicion)",
+    # Historial y enfrentamientos de una selección en todas las ediciones
+    "CREATE INDEX seleccion_nombre IF NOT EXISTS FOR (s:Seleccion) ON (s.nombre)",
+    "CREATE INDEX juega_contra_edicion IF NOT EXISTS FOR ()-[r:JUEGA_CONTRA]-() ON (r.id_edicion)",
+]
+
+_lock = threading.Lock()
+_drivers_con_indices = set()
+
+
+def asegurar_indices(driver):
+    """Crear los índices del grafo una vez por driver (no hace nada si ya existen)"""
+    with _lock:
+        if id(driver) in _drivers_con_indices:
+            return
+        with driver.session() as session:
+            for sentencia in INDICES:
+                session.run(sentencia).consume()
+        _drivers_con_indices.add(id(driver))
+
+
+def enfrentamientos(driver, pais_a, pais_b):
+    """
+    Todos los cruces de eliminación directa entre dos selecciones
+
+    Args:
+        driver: Driver de Neo4j
+        pais_a (str): Primera selección
+        pais_b (str): Segunda selección
+
+    Returns:
+        list: Dicts {edicion, id_edicion, fase, id_partido} por orden cronológico
+    """
+    with driver.session() as session:
+        result = session.run("""
+            MATCH (a:Seleccion {nombre: $pais_a})-[r:JUEGA_CONTRA]-(b:Seleccion {nombre: $pais_b})
+            RETURN DISTINCT
+                coalesce(r.edicion, toString(r.id_edicion)) AS edicion,
+                r.id_edicion AS id_edicion,
+                r.fase AS fase,
+                r.id_partido AS id_partido
+            ORDER BY id_edicion, id_partido
+        """, pais_a=pais_a, pais_b=pais_b)
+        return [record.data() for record in result]
+
+
+def historial(driver, pais):
+    """
+    Todos los partidos de eliminación directa de una selección
+
+    Returns:
+        list: Dicts {edicion, id_edicion, fase, id_partido, rival} por orden cronológico
+    """
+    with driver.session() as session:
+        result = session.run("""
+            MATCH (s:Seleccion {nombre: $pais})-[r:JUEGA_CONTRA]-(rival:Seleccion)
+            RETURN
+                coalesce(r.edicion, toString(r.id_edicion)) AS edicion,
+                r.id_edicion AS id_edicion,
+                r.fase AS fase,
+                r.id_partido AS id_partido,
+                rival.nombre AS rival
+            ORDER BY id_edicion, id_partido
+        """, pais=pais)
+        return [record.data() for record in result]
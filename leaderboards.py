@@ -0,0 +1,129 @@
+"""
+Módulo de leaderboards por edición sobre sorted sets de Redis
+
+Cada leaderboard es un sorted set (miembro -> goles) con un hash opcional de
+detalles por miembro. El ETL los reconstruye completos en claves temporales y
+los publica con RENAME dentro de una transacción, así un lector nunca ve un
+ranking a medio cargar.
+"""
+
+import json
+import uuid
+
+# Leaderboards disponibles
+LEADERBOARD_GOLES_SELECCION = 'goles_seleccion'
+LEADERBOARD_GOLEADORES_KO = 'goleadores_ko'
+
+
+def clave_ranking(leaderboard, edicion):
+    """Clave del sorted set de un leaderboard para una edición"""
+    return f"leaderboard:{leaderboard}:{edicion}"
+
+
+def clave_detalles(leaderboard, edicion):
+    """Clave del hash con los datos de cada miembro del leaderboard"""
+    return f"leaderboard:{leaderboard}:{edicion}:detalles"
+
+
+def reconstruir(r, leaderboard, edicion, puntajes, detalles=None):
+    """
+    Reemplazar atómicamente el leaderboard de una edición
+
+    Args:
+        r: Cliente de Redis
+        leaderboard (str): LEADERBOARD_GOLES_SELECCION o LEADERBOARD_GOLEADORES_KO
+        edicion (str): Nombre de la edición del mundial
+        puntajes (dict): miembro -> goles
+        detalles (dict): miembro -> dict con datos para mostrar (opcional)
+
+    Returns:
+        int: Cantidad de miembros cargados
+    """
+    ranking = clave_ranking(leaderboard, edicion)
+    info = clave_detalles(leaderboard, edicion)
+    sufijo = f":tmp:{uuid.uuid4().hex}"
+
+    pipe = r.pipeline(transaction=True)
+    if puntajes:
+        pipe.zadd(ranking + sufijo, {str(m): g for m, g in puntajes.items()})
+        pipe.rename(ranking + sufijo, ranking)
+    else:
+        pipe.delete(ranking)
+
+    if detalles:
+        pipe.hset(info + sufijo, mapping={
+            str(m): json.dumps(d, ensure_ascii=False) for m, d in detalles.items()
+        })
+        pipe.rename(info + sufijo, info)
+    else:
+        pipe.delete(info)
+
+    pipe.execute()
+    return len(puntajes)
+
+
+def incrementar(r, leaderboard, edicion, miembro, goles=1):
+    """
+    Sumar goles a un miembro del leaderboard (ZINCRBY)
+
+    Returns:
+        int: Goles del miembro después del incremento
+    """
+    return int(r.zincrby(clave_ranking(leaderboard, edicion), goles, str(miembro)))
+
+
+def _con_detalles(r, leaderboard, edicion, pares):
+    """Convertir pares (miembro, score) en dicts, agregando los detalles guardados"""
+    if not pares:
+        return []
+    valores = r.hmget(clave_detalles(leaderboard, edicion), [m for m, _ in pares])
+    resultado = []
+    for (miembro, score), valor in zip(pares, valores):
+        item = json.loads(valor) if valor else {}
+        item.update({'miembro': miembro, 'goles': int(score)})
+        resultado.append(item)
+    return resultado
+
+
+def top(r, leaderboard, edicion, n=10):
+    """
+    Obtener los N primeros del leaderboard (ZREVRANGE)
+
+    Args:
+        n (int): Cantidad de posiciones (0 = todo el ranking)
+
+    Returns:
+        list: Dicts con 'miembro', 'goles' y los detalles del miembro
+    """
+    pares = r.zrevrange(clave_ranking(leaderboard, edicion), 0, n - 1, withscores=True)
+    return _con_detalles(r, leaderboard, edicion, pares)
+
+
+def posicion(r, leaderboard, edicion, miembro):
+    """
+    Obtener la posición (1 = primero) y los goles de un miembro
+
+    Returns:
+        dict: {'posicion', 'goles'} o None si el miembro no está en el ranking
+    """
+    ranking = clave_ranking(leaderboard, edicion)
+    pipe = r.pipeline(transaction=False)
+    pipe.zrevrank(ranking, str(miembro))
+    pipe.zscore(ranking, str(miembro))
+    rank, score = pipe.execute()
+    if rank is None:
+        return None
+    return {'posicion': rank + 1, 'goles': int(score)}
+
+
+def por_goles(r, leaderboard, edicion, minimo, maximo='+inf'):
+    """
+    Obtener los miembros con goles entre minimo y maximo, de mayor a menor
+
+    Returns:
+        list: Dicts con 'miembro', 'goles' y los detalles del miembro
+    """
+    pares = r.zrevrangebyscore(
+        clave_ranking(leaderboard, edicion), maximo, minimo, withscores=True
+    )
+    return _con_detalles(r, leaderboard, edicion, pares)
@@ -0,0 +1,170 @@
+"""
+Módulo de locks con lease sobre Redis para deduplicar corridas de ETL
+
+Dos clientes que refrescan el mismo modelo con los mismos parámetros a la vez
+harían el mismo DELETE + INSERT dos veces y competirían entre sí. Con el lease
+solo uno ejecuta; el otro espera y reutiliza su resultado.
+
+- Adquisición: SET clave token NX PX ttl
+- Renovación: un watchdog extiende el lease (PEXPIRE si el token sigue siendo nuestro)
+- Liberación: script Lua que borra la clave solo si el token coincide
+- Si el dueño muere, el lease vence y el siguiente que espera lo toma
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = 'etl:lock'
+
+_LUA_LIBERAR = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_LUA_RENOVAR = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def clave_lock(modelo, parametros):
+    """
+    Clave del lease de un modelo de lectura y sus parámetros
+
+    Args:
+        modelo (str): Nombre del modelo de lectura
+        parametros: Parámetros serializables a JSON (ej: lista de dicts)
+    """
+    contenido = json.dumps(parametros, sort_keys=True, default=str, ensure_ascii=False)
+    resumen = hashlib.sha1(contenido.encode('utf-8')).hexdigest()[:16]
+    return f"{PREFIJO}:{modelo}:{resumen}"
+
+
+class Lease:
+    """Lease exclusivo sobre una clave de Redis con renovación automática"""
+
+    def __init__(self, r, clave, ttl_ms=None):
+        """
+        Args:
+            r: Cliente de Redis
+            clave (str): Clave del lock
+            ttl_ms (int): Duración del lease (None = FIFA_ETL_LOCK_TTL_MS)
+        """
+        self.r = r
+        self.clave = clave
+        self.ttl_ms = ttl_ms or int(os.getenv('FIFA_ETL_LOCK_TTL_MS', 30000))
+        self.token = uuid.uuid4().hex
+        self.perdido = False
+        self._detener = threading.Event()
+        self._watchdog = None
+        self._liberar = r.register_script(_LUA_LIBERAR)
+        self._renovar = r.register_script(_LUA_RENOVAR)
+
+    def adquirir(self):
+        """
+        Intentar tomar el lease (no bloquea)
+
+        Returns:
+            bool: True si el lease es nuestro
+        """
+        if not self.r.set(self.clave, self.token, nx=True, px=self.ttl_ms):
+            return False
+        self._detener.clear()
+        self._watchdog = threading.Thread(
+            target=self._renovar_periodicamente, name=f"lease-{self.clave}", daemon=True
+        )
+        self._watchdog.start()
+        return True
+
+    def renovar(self):
+        """Extender el lease; False si ya no nos pertenece"""
+        return bool(self._renovar(keys=[self.clave], args=[self.token, self.ttl_ms]))
+
+    def liberar(self):
+        """Detener el watchdog y borrar la clave si el token sigue siendo nuestro"""
+        self._detener.set()
+        if self._watchdog:
+            self._watchdog.join()
+        try:
+            self._liberar(keys=[self.clave], args=[self.token])
+        except Exception as e:
+            # Si no se puede borrar, el lease vence solo
+            logger.warning("No se pudo liberar %s: %s", self.clave, e)
+
+    def _renovar_periodicamente(self):
+        while not self._detener.wait(self.ttl_ms / 3000):
+            try:
+                if not self.renovar():
+                    self.perdido = True
+                    logger.warning("Lease %s perdido (venció antes de renovarse)", self.clave)
+                    return
+            except Exception as e:
+                logger.warning("No se pudo renovar %s: %s", self.clave, e)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.liberar()
+
+
+def ejecutar_deduplicado(r, clave, funcion, espera_maxima=None, ttl_resultado=60, intervalo=0.1):
+    """
+    Ejecutar funcion una sola vez entre todos los clientes que piden la misma clave
+
+    El que toma el lease ejecuta y publica su resultado en
+    `{clave}:resultado:{token}`. Los demás sondean hasta que el lease se libera
+    y devuelven ese resultado; si el dueño murió sin publicarlo, el lease vence
+    y uno de los que esperan lo toma y ejecuta.
+
+    Args:
+        r: Cliente de Redis
+        clave (str): Clave del lock (ver clave_lock)
+        funcion (callable): () -> resultado serializable a JSON
+        espera_maxima (float): Segundos máximos de espera (None = FIFA_ETL_LOCK_ESPERA)
+        ttl_resultado (int): Segundos que se conserva el resultado publicado
+        intervalo (float): Segundos entre sondeos
+
+    Returns:
+        tuple: (resultado, ejecutado) con ejecutado=False si se reutilizó otra corrida
+    """
+    espera_maxima = espera_maxima or float(os.getenv('FIFA_ETL_LOCK_ESPERA', 300))
+    limite = time.monotonic() + espera_maxima
+
+    while True:
+        lease = Lease(r, clave)
+        if lease.adquirir():
+            with lease:
+                resultado = funcion()
+                r.set(f"{clave}:resultado:{lease.token}", json.dumps(resultado), ex=ttl_resultado)
+            return resultado, True
+
+        # Otro cliente tiene el lease: esperar su resultado
+        dueno = r.get(clave)
+        while dueno is not None and time.monotonic() < limite:
+            time.sleep(intervalo)
+            actual = r.get(clave)
+            if actual != dueno:
+                break
+
+        if dueno is not None:
+            if isinstance(dueno, bytes):
+                dueno = dueno.decode('utf-8')
+            publicado = r.get(f"{clave}:resultado:{dueno}")
+            if publicado is not None:
+                return json.loads(publicado), False
+
+        if time.monotonic() >= limite:
+            raise TimeoutError(f"Tiempo de espera agotado para {clave}")
+        # El dueño terminó sin publicar (murió o falló): volver a intentar tomar el lease
@@ -1,43 +1,246 @@
-import logging
-
-
-def setup_logging():
-    """Configura el logging para salida clara en consola.
-
-    Formato: TIMESTAMP LEVEL [logger_name] message
-    """
-    root = logging.getLogger()
-    if not root.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            '%(asctime)s %(levelname)-8s [%(name)s] %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        handler.setFormatter(formatter)
-        root.addHandler(handler)
-        root.setLevel(logging.INFO)
-        # Reducir ruido de librerías externas que imprimen muchos warnings
-        noisy = [
-            'cassandra',
-            'cassandra.cluster',
-            'cassandra.policies',
-            'cassandra.pool',
-            'urllib3',
-            'pika',
-            'asyncio',
-            'dns.resolver',
-            'dnspython'
-        ]
-        for name in noisy:
-            logging.getLogger(name).setLevel(logging.ERROR)
-
-        # Capturar warnings de la librería warnings y redirigirlos al logging
-        try:
-            import warnings
-            logging.captureWarnings(True)
-        except Exception:
-            pass
-
-
-# Configure logging on import for simplicity in small scripts
-setup_logging()
+"""
+Configuración de logging del sistema
+
+Los registros pasan por una cola a un hilo (QueueListener) que es el único que
+escribe en la terminal: quien loguea solo encola el registro, así que la E/S
+de consola no queda en el camino crítico de los ETL ni de las lecturas. Si la
+cola se llena, los registros nuevos se descartan (y se cuentan) en lugar de
+bloquear.
+
+Variables de entorno:
+    FIFA_LOG_NIVEL: Nivel del logger raíz (INFO)
+    FIFA_LOG_FORMATO: texto (por defecto) o json (un objeto por línea, con los
+        campos pasados en extra=)
+    FIFA_LOG_MUESTREO: Fracción de registros DEBUG/INFO que se conserva por
+        logger, ej: "pipeline_etl=0.1,etl_manager=0.5" (WARNING o más grave
+        nunca se muestrea)
+    FIFA_LOG_COLA: Capacidad de la cola de registros (10000)
+"""
+
+import atexit
+import copy
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Atributos propios de LogRecord; el resto son campos pasados con extra=
+_ATRIBUTOS_REGISTRO = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_cola = None
+_handler = None
+_listener = None
+
+
+class FormatoJSON(logging.Formatter):
+    """Un objeto JSON por registro, con los campos de extra= como claves propias"""
+
+    def format(self, record):
+        documento = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'hilo': record.threadName,
+        }
+        documento.update(
+            (clave, valor) for clave, valor in vars(record).items() if clave not in _ATRIBUTOS_REGISTRO
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            documento['excepcion'] = record.exc_text
+        if record.stack_info:
+            documento['pila'] = record.stack_info
+        return json.dumps(documento, ensure_ascii=False, default=str)
+
+
+class FiltroMuestreo(logging.Filter):
+    """
+    Conservar uno de cada N registros DEBUG/INFO de los loggers indicados
+
+    El muestreo es determinístico por logger (el primero, el N+1, ...), así
+    que una línea que se repite en cada corrida sigue apareciendo cada tanto.
+    """
+
+    def __init__(self, fracciones):
+        """
+        Args:
+            fracciones (dict): Nombre de logger -> fracción a conservar (0 a 1);
+                aplica también a sus loggers hijos
+        """
+        super().__init__()
+        self.fracciones = fracciones
+        self._cada = {}
+        self._contadores = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        cada = self._cada.get(record.name)
+        if cada is None:
+            cada = self._cada[record.name] = self._resolver(record.name)
+        if cada == 1:
+            return True
+        if cada == 0:
+            return False
+        contador = self._contadores.setdefault(record.name, itertools.count())
+        return next(contador) % cada == 0
+
+    def _resolver(self, nombre):
+        """1 de cada cuántos registros conservar según el logger más específico configurado"""
+        while nombre:
+            if nombre in self.fracciones:
+                fraccion = self.fracciones[nombre]
+                if fraccion >= 1:
+                    return 1
+                return max(1, round(1 / fraccion)) if fraccion > 0 else 0
+            nombre = nombre.rpartition('.')[0]
+        return 1
+
+
+class _HandlerCola(QueueHandler):
+    """QueueHandler que descarta el registro si la cola está llena en lugar de bloquear"""
+
+    def __init__(self, cola):
+        super().__init__(cola)
+        self.descartados = 0
+        self.formatter_excepciones = logging.Formatter()
+
+    def prepare(self, record):
+        """Resolver el mensaje y el traceback sin formatear la línea (eso lo hace el hilo)"""
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatter_excepciones.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+def _leer_muestreo(valor):
+    """Parsear FIFA_LOG_MUESTREO ("logger=fraccion,...") ignorando entradas inválidas"""
+    fracciones = {}
+    for entrada in valor.split(','):
+        nombre, _, fraccion = entrada.partition('=')
+        try:
+            fracciones[nombre.strip()] = float(fraccion)
+        except ValueError:
+            continue
+    return fracciones
+
+
+def setup_logging():
+    """Configura el logging con una cola y un hilo que escribe en consola.
+
+    Formato texto: TIMESTAMP LEVEL [logger_name] message
+    """
+    global _cola, _handler, _listener
+
+    root = logging.getLogger()
+    if not root.handlers:
+        consola = logging.StreamHandler()
+        if os.getenv('FIFA_LOG_FORMATO', 'texto').lower() == 'json':
+            consola.setFormatter(FormatoJSON())
+        else:
+            consola.setFormatter(logging.Formatter(
+                '%(asctime)s %(levelname)-8s [%(name)s] %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            ))
+
+        _cola = queue.Queue(maxsize=int(os.getenv('FIFA_LOG_COLA', 10000)))
+        _handler = _HandlerCola(_cola)
+        fracciones = _leer_muestreo(os.getenv('FIFA_LOG_MUESTREO', ''))
+        if fracciones:
+            # En el handler: lo muestreado se descarta antes de copiar y encolar el registro
+            _handler.addFilter(FiltroMuestreo(fracciones))
+        root.addHandler(_handler)
+        root.setLevel(os.getenv('FIFA_LOG_NIVEL', 'INFO').upper())
+
+        _listener = QueueListener(_cola, consola, respect_handler_level=True)
+        _listener.start()
+        atexit.register(detener_logging)
+
+        # Reducir ruido de librerías externas que imprimen muchos warnings
+        noisy = [
+            'cassandra',
+            'cassandra.cluster',
+            'cassandra.policies',
+            'cassandra.pool',
+            'urllib3',
+            'pika',
+            'asyncio',
+            'dns.resolver',
+            'dnspython'
+        ]
+        for name in noisy:
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+        # Capturar warnings de la librería warnings y redirigirlos al logging
+        try:
+            import warnings
+            logging.captureWarnings(True)
+        except Exception:
+            pass
+
+
+def vaciar(timeout=1.0):
+    """
+    Esperar a que el hilo escriba los registros encolados
+
+    Para salidas interactivas que deben quedar ordenadas respecto de print;
+    los caminos de carga nunca deberían llamarla.
+    """
+    if _cola is None:
+        return
+    limite = time.monotonic() + timeout
+    while _cola.unfinished_tasks and time.monotonic() < limite:
+        time.sleep(0.005)
+
+
+def estadisticas():
+    """
+    Estado de la cola de logging
+
+    Returns:
+        dict: Registros en cola y descartados por cola llena
+    """
+    return {
+        'en_cola': _cola.qsize() if _cola is not None else 0,
+        'descartados': _handler.descartados if _handler is not None else 0
+    }
+
+
+def detener_logging():
+    """Escribir lo pendiente y detener el hilo de logging (se registra con atexit)"""
+    global _listener
+    if _listener is None:
+        return
+    vaciar(timeout=5.0)
+    try:
+        _listener.stop()
+    except queue.Full:
+        pass
+    _listener = None
+    if _handler is not None and _handler.descartados:
+        sys.stderr.write(f"⚠️  Logging: {_handler.descartados} registros descartados por cola llena\n")
+
+
+# Configure logging on import for simplicity in small scripts
+setup_logging()
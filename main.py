@@ -6,11 +6,13 @@ Sistema de consultas para bases de datos del Mundial
 import os
 from dotenv import load_dotenv
 from db_manager import db_manager
-import redis
 import json
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from etl_manager import ETLManager
+from cache_l1 import cache
+from perfilado import perfilador
+import log_config
 import time
 
 # Cargar variables de entorno
@@ -20,9 +22,20 @@ load_dotenv()
 class FIFAQuerySystem:
     """Sistema de consultas para datos del Mundial FIFA"""
     
-    def __init__(self):
+    def __init__(self, perfilado=None):
+        """
+        Args:
+            perfilado (bool): Perfilar las consultas desde el arranque (None = lo que
+                indique FIFA_PERFILADO, que perfilado.py lee al importarse)
+        """
         self.running = True
         self.connections_initialized = False
+        if perfilado is None:
+            pass  # el perfilador ya quedó activo o no según FIFA_PERFILADO
+        elif perfilado and not perfilador.activo:
+            ETLManager.activar_perfilado()
+        elif not perfilado and perfilador.activo:
+            ETLManager.desactivar_perfilado(guardar=False)
         
     def mostrar_inicio(self):
         """Mostrar proceso de inicialización"""
@@ -43,7 +56,19 @@ class FIFAQuerySystem:
         self.inicializar_conexiones()
         
     def inicializar_conexiones(self):
-        """Inicializar todas las conexiones a las bases de datos"""
+        """
+        Inicializar las conexiones a las bases de datos
+
+        Por defecto cada base (y su driver) se conecta recién cuando un caso de
+        uso la necesita; con FIFA_CONEXION_ANTICIPADA=true se conectan todas al
+        arrancar, como verificación de las credenciales.
+        """
+        if os.getenv('FIFA_CONEXION_ANTICIPADA', 'false').lower() != 'true':
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            print(f"[{timestamp}] 💤 Cada base de datos se conecta en su primer uso")
+            self.connections_initialized = True
+            return
+        
         conexiones = [
             ("PostgreSQL", lambda: db_manager.connect_postgresql(), "🚂"),
             ("Cassandra", lambda: db_manager.connect_cassandra(), "📊"),
@@ -70,16 +95,7 @@ class FIFAQuerySystem:
         
     def _test_redis_local(self):
         """Test de conexión Redis local"""
-        try:
-            host = os.getenv('REDIS_HOST', 'localhost')
-            port = int(os.getenv('REDIS_PORT', 6379))
-            pwd = os.getenv('REDIS_PASSWORD', None)
-            db = int(os.getenv('REDIS_DB', 0))
-            r = redis.Redis(host=host, port=port, password=pwd, db=db, decode_responses=True)
-            r.ping()
-            return True
-        except:
-            return False
+        return db_manager.connect_redis()
         
     def mostrar_menu(self):
         """Mostrar el menú principal"""
@@ -98,7 +114,9 @@ class FIFAQuerySystem:
         print("  7) Sesión de periodista (2h)")
         print("  8) Camino corto de eliminación entre dos selecciones")
         print("  9) Goleadores en fases KO de 2030")
-        print("\n  0) Salir")
+        estado = "activo" if perfilador.activo else "inactivo"
+        print(f"\n  P) Perfilado de consultas ({estado})")
+        print("  0) Salir")
         print("\n" + "="*70)
         
     def ejecutar_opcion(self, opcion):
@@ -121,6 +139,8 @@ class FIFAQuerySystem:
             self.camino_eliminacion()
         elif opcion == "9":
             self.goleadores_ko_2030()
+        elif opcion.upper() == "P":
+            self.alternar_perfilado()
         elif opcion == "0":
             timestamp = datetime.now().strftime("%H:%M:%S")
             print(f"\n[{timestamp}] 👋 Saliendo del sistema...")
@@ -159,13 +179,13 @@ class FIFAQuerySystem:
                 input("\nPresione ENTER para continuar...")
                 return
             
-            if ETLManager.etl_tabla_posiciones(mundial, grupo):
+            if self._con_logs(ETLManager.etl_tabla_posiciones(mundial, grupo)):
                 print("📊 TABLA DE POSICIONES:")
                 print("-" * 70)
                 print(f"{'Pos':<5} {'País':<20} {'Pts':<6} {'GF':<6} {'GC':<6} {'DG':<6}")
                 print("-" * 70)
                 
-                rows = ETLManager.obtener_tabla_posiciones_cassandra(mundial, grupo)
+                rows = self._con_logs(ETLManager.obtener_tabla_posiciones_cassandra(mundial, grupo))
                 
                 if rows:
                     for row in rows:
@@ -203,11 +223,11 @@ class FIFAQuerySystem:
                 input("\nPresione ENTER para continuar...")
                 return
             
-            if ETLManager.etl_arbitros_fases_finales(mundial):
+            if self._con_logs(ETLManager.etl_arbitros_fases_finales(mundial)):
                 print(f"📊 ÁRBITROS DE FASES FINALES - {mundial}:")
                 print("=" * 100)
                 
-                documentos = ETLManager.obtener_arbitros_fases_finales_mongodb(mundial)
+                documentos = self._con_logs(ETLManager.obtener_arbitros_fases_finales_mongodb(mundial))
                 
                 if documentos:
                     for doc in documentos:
@@ -254,13 +274,13 @@ class FIFAQuerySystem:
                 input("\nPresione ENTER para continuar...")
                 return
             
-            if ETLManager.etl_jugadores_goles_pais(mundial, pais, min_goles):
+            if self._con_logs(ETLManager.etl_jugadores_goles_pais(mundial, pais, min_goles)):
                 print(f"📊 JUGADORES DE {pais.upper()} CON {min_goles}+ GOLES - {mundial}:")
                 print("-" * 80)
                 print(f"{'Pos':<6} {'Nombre':<20} {'Apellido':<20} {'⚽ Goles':<10}")
                 print("-" * 80)
                 
-                jugadores = ETLManager.obtener_jugadores_goles_pais_mongodb(mundial, pais, min_goles)
+                jugadores = self._con_logs(ETLManager.obtener_jugadores_goles_pais_mongodb(mundial, pais, min_goles))
                 
                 if jugadores:
                     for idx, jugador in enumerate(jugadores, 1):
@@ -305,13 +325,13 @@ class FIFAQuerySystem:
                 input("\nPresione ENTER para continuar...")
                 return
             
-            if ETLManager.etl_partidos_populares(mundial, grupo):
+            if self._con_logs(ETLManager.etl_partidos_populares(mundial, grupo)):
                 print(f"📊 PARTIDOS DEL GRUPO {grupo} (ORDENADOS POR POPULARIDAD):")
                 print("-" * 100)
                 print(f"{'ID':<6} {'Fecha/Hora':<20} {'Estadio':<22} {'Local':<15} {'vs':<4} {'Visitante':<15} {'👥 Pop.':<10}")
                 print("-" * 100)
                 
-                rows = ETLManager.obtener_partidos_populares_cassandra(mundial, grupo)
+                rows = self._con_logs(ETLManager.obtener_partidos_populares_cassandra(mundial, grupo))
                 
                 if rows:
                     for row in rows:
@@ -354,13 +374,13 @@ class FIFAQuerySystem:
                 input("\nPresione ENTER para continuar...")
                 return
             
-            if ETLManager.etl_partidos_fecha_estadio(anio_int, estadio):
+            if self._con_logs(ETLManager.etl_partidos_fecha_estadio(anio_int, estadio)):
                 print(f"📊 PARTIDOS EN {estadio} - AÑO {anio}:")
                 print("-" * 110)
                 print(f"{'ID':<6} {'Fecha/Hora':<20} {'Local':<20} {'vs':<4} {'Visitante':<20} {'Goles':<15}")
                 print("-" * 110)
                 
-                rows = ETLManager.obtener_partidos_fecha_estadio_cassandra(estadio)
+                rows = self._con_logs(ETLManager.obtener_partidos_fecha_estadio_cassandra(estadio, anio_int))
                 
                 if rows:
                     for row in rows:
@@ -402,13 +422,13 @@ class FIFAQuerySystem:
                 input("\nPresione ENTER para continuar...")
                 return
             
-            if ETLManager.etl_goles_seleccion_edicion(mundial):
+            if self._con_logs(ETLManager.etl_goles_seleccion_edicion(mundial)):
                 print(f"📊 RANKING DE GOLES POR SELECCIÓN - {mundial}:")
                 print("-" * 70)
                 print(f"{'Posición':<12} {'Selección':<30} {'⚽ Goles':<10}")
                 print("-" * 70)
                 
-                rows = ETLManager.obtener_goles_seleccion_edicion_cassandra(mundial)
+                rows = self._con_logs(ETLManager.obtener_goles_seleccion_edicion_cassandra(mundial))
                 
                 if rows:
                     for idx, row in enumerate(rows, 1):
@@ -437,6 +457,8 @@ class FIFAQuerySystem:
         print(f"\n🔍 Iniciando sesión de 2 horas para {periodista}...")
 
         try:
+            import redis
+
             redis_url = os.getenv('REDIS_URL') or os.getenv('REDIS_URI')
             if redis_url:
                 r = redis.from_url(redis_url, decode_responses=True)
@@ -537,7 +559,7 @@ class FIFAQuerySystem:
         
         input("\n\nPresione ENTER para continuar...")
 
-    def _find_journalist_sessions(self, r: redis.Redis, periodista: str):
+    def _find_journalist_sessions(self, r: 'redis.Redis', periodista: str):
         """Buscar sesiones de periodista en Redis"""
         patterns = ["session:*", "sesion:*", "session:periodista:*", "sesion:periodista:*"]
         matches = []
@@ -659,11 +681,11 @@ class FIFAQuerySystem:
             print(f"\n📊 Cargando grafo de eliminación directa para {edicion}...")
             from etl_manager import etl_partidos_ko_neo4j, buscar_camino_eliminacion_neo4j
             
-            relaciones = etl_partidos_ko_neo4j(db_manager, edicion)
+            relaciones = self._con_logs(etl_partidos_ko_neo4j(db_manager, edicion))
             
             if relaciones > 0:
                 print(f"\n🔍 Buscando camino entre {pais_a} y {pais_b}...")
-                resultado = buscar_camino_eliminacion_neo4j(db_manager, edicion, pais_a, pais_b)
+                resultado = self._con_logs(buscar_camino_eliminacion_neo4j(db_manager, edicion, pais_a, pais_b))
                 
                 if resultado and resultado['camino_selecciones']:
                     print(f"\n✅ CAMINO ENCONTRADO:")
@@ -713,13 +735,13 @@ class FIFAQuerySystem:
                 input("\nPresione ENTER para continuar...")
                 return
             
-            if ETLManager.etl_goleadores_ko_edicion(mundial):
+            if self._con_logs(ETLManager.etl_goleadores_ko_edicion(mundial)):
                 print(f"📊 GOLEADORES EN FASES ELIMINATORIAS - {mundial}:")
                 print("-" * 90)
                 print(f"{'Pos':<6} {'Nombre':<25} {'Apellido':<25} {'País':<20} {'⚽ Goles':<10}")
                 print("-" * 90)
                 
-                rows = ETLManager.obtener_goleadores_ko_edicion_cassandra(mundial)
+                rows = self._con_logs(ETLManager.obtener_goleadores_ko_edicion_cassandra(mundial))
                 
                 if rows:
                     for idx, row in enumerate(rows, 1):
@@ -737,6 +759,23 @@ class FIFAQuerySystem:
         
         input("\n\nPresione ENTER para continuar...")
     
+    def _con_logs(self, resultado):
+        """Devolver un resultado después de que se escriban los logs que generó (orden en pantalla)"""
+        log_config.vaciar()
+        return resultado
+    
+    def alternar_perfilado(self):
+        """Activar o desactivar el perfilado de consultas (al desactivar muestra y guarda el reporte)"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        if perfilador.activo:
+            log_config.vaciar()
+            perfilador.imprimir()
+            ETLManager.desactivar_perfilado()
+            print(f"\n[{timestamp}] 🔬 Perfilado desactivado")
+        else:
+            ETLManager.activar_perfilado()
+            print(f"\n[{timestamp}] 🔬 Perfilado activo: cada consulta registra su plan (sin cache L1)")
+    
     # ==================================================================
     # MÉTODOS PRINCIPALES
     # ==================================================================
@@ -754,7 +793,18 @@ class FIFAQuerySystem:
                 self.ejecutar_opcion(opcion)
         finally:
             timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"\n[{timestamp}] 🔌 Cerrando conexiones...")
+            estadisticas = cache.estadisticas()
+            print(
+                f"\n[{timestamp}] 📦 Cache L1: {estadisticas['aciertos']} aciertos, "
+                f"{estadisticas['fallos']} fallos, {estadisticas['coalescidas']} coalescidas, "
+                f"{estadisticas['desalojos']} desalojos"
+            )
+            log_config.vaciar()
+            if perfilador.activo:
+                perfilador.imprimir()
+                ETLManager.desactivar_perfilado()
+                log_config.vaciar()
+            print(f"[{timestamp}] 🔌 Cerrando conexiones...")
             db_manager.close_all()
         
         timestamp = datetime.now().strftime("%H:%M:%S")
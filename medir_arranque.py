@@ -0,0 +1,162 @@
+"""
+Medición del tiempo de arranque del CLI
+
+Mide dos cosas, cada una en un proceso nuevo (arranque en frío):
+
+- Importación: `python -X importtime -c "import main"`, con el desglose de los
+  módulos que más tardan en importarse (acumulado, incluye sus dependencias)
+- Primer menú: lanza `python main.py` y mide hasta que aparece el menú
+  principal; después elige la opción 0 para salir
+
+Cada medición se repite y se reporta la mediana. Con --historial se agrega una
+línea JSON por corrida para seguir la evolución entre versiones.
+
+Uso:
+    python medir_arranque.py --repeticiones 5 --historial arranque.jsonl
+"""
+
+import argparse
+import json
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+MARCA_MENU = 'Menú Principal'
+
+
+def medir_importacion(modulo='main'):
+    """
+    Importar un módulo en un proceso nuevo con -X importtime
+
+    Returns:
+        tuple: (segundos totales, dict módulo -> segundos acumulados de sus importaciones)
+    """
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=DIRECTORIO, capture_output=True, text=True, encoding='utf-8'
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}: {proceso.stderr.strip().splitlines()[-1:]}")
+
+    # Formato: "import time: self [us] | cumulative | imported package"
+    acumulados = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        # Hasta dos niveles (las importaciones directas de main): los más
+        # profundos ya están en el acumulado de quien los importa
+        if not nombre[1:].startswith('    '):
+            acumulados[nombre.strip()] = int(acumulado) / 1e6
+    total = acumulados.pop(modulo, sum(acumulados.values()))
+    return total, acumulados
+
+
+def _leer_lineas(stream, lineas):
+    """Pasar las líneas de un pipe a una cola (None al cerrarse)"""
+    for linea in stream:
+        lineas.put(linea)
+    lineas.put(None)
+
+
+def medir_primer_menu(timeout=60.0):
+    """
+    Lanzar el CLI y medir hasta que imprime el menú principal
+
+    La salida se lee en un hilo aparte, así el timeout se cumple aunque el
+    proceso quede colgado sin imprimir nada (select no sirve con pipes en Windows).
+
+    Returns:
+        float: Segundos hasta el menú
+
+    Raises:
+        TimeoutError: Si el menú no aparece dentro de timeout segundos
+    """
+    entorno = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, 'main.py'], cwd=DIRECTORIO, env=entorno,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, encoding='utf-8'
+    )
+    lineas = queue.Queue()
+    lector = threading.Thread(target=_leer_lineas, args=(proceso.stdout, lineas), daemon=True)
+    lector.start()
+    limite = inicio + timeout
+    try:
+        while True:
+            try:
+                linea = lineas.get(timeout=max(0.0, limite - time.perf_counter()))
+            except queue.Empty:
+                raise TimeoutError(f"El menú no apareció en {timeout:.0f}s")
+            if linea is None:
+                raise RuntimeError(f"main.py terminó sin mostrar el menú (código {proceso.wait()})")
+            if MARCA_MENU in linea:
+                segundos = time.perf_counter() - inicio
+                break
+        # El hilo sigue vaciando stdout, así que alcanza con escribir la opción y esperar
+        proceso.stdin.write('0\n')
+        proceso.stdin.close()
+        proceso.wait(timeout=timeout)
+        return segundos
+    finally:
+        if proceso.poll() is None:
+            proceso.kill()
+            proceso.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Medir el tiempo de arranque del CLI")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="Módulos más lentos a mostrar")
+    parser.add_argument('--sin-menu', action='store_true', help="Medir solo la importación")
+    parser.add_argument('--historial', help="Archivo JSONL al que agregar el resultado")
+    args = parser.parse_args()
+
+    importaciones, desgloses, menus = [], [], []
+    for _ in range(args.repeticiones):
+        total, acumulados = medir_importacion()
+        importaciones.append(total)
+        desgloses.append(acumulados)
+        if not args.sin_menu:
+            menus.append(medir_primer_menu())
+
+    modulos = {
+        nombre: statistics.median(d.get(nombre, 0.0) for d in desgloses)
+        for nombre in set().union(*desgloses)
+    }
+    lentos = sorted(modulos.items(), key=lambda m: m[1], reverse=True)[:args.top]
+
+    resultado = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'repeticiones': args.repeticiones,
+        'importacion_ms': statistics.median(importaciones) * 1000,
+        'primer_menu_ms': statistics.median(menus) * 1000 if menus else None,
+        'modulos_ms': {nombre: segundos * 1000 for nombre, segundos in lentos}
+    }
+
+    print("\n" + "=" * 60)
+    print(f"⏱️  ARRANQUE DEL CLI (mediana de {args.repeticiones})")
+    print("=" * 60)
+    print(f"Importación de main: {resultado['importacion_ms']:>9.1f} ms")
+    if menus:
+        print(f"Hasta el menú:       {resultado['primer_menu_ms']:>9.1f} ms")
+    print("\nMódulos más lentos (acumulado, incluye lo que importan):")
+    for nombre, ms in resultado['modulos_ms'].items():
+        print(f"  {nombre:<40} {ms:>9.1f} ms")
+
+    if args.historial:
+        with open(args.historial, 'a', encoding='utf-8') as archivo:
+            archivo.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        print(f"\n💾 Resultado agregado a {args.historial}")
+
+
+if __name__ == "__main__":
+    main()
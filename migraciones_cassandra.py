@@ -0,0 +1,281 @@
+"""
+Módulo de migraciones versionadas del esquema de Cassandra
+
+Cada migración es una lista de sentencias DDL con un número de versión. La
+versión aplicada se guarda en la tabla schema_version del keyspace, de modo que
+conectar solo cuesta leer esa versión: el DDL se ejecuta únicamente cuando el
+esquema está atrasado.
+
+Varios procesos pueden conectar a la vez (CLI, listener, generador de carga,
+reconciliación). Antes de ejecutar una migración se reclama su versión con una
+transacción liviana (IF NOT EXISTS / IF version = anterior): solo el proceso
+cuyo LWT se aplicó ejecuta las sentencias, así un paso destructivo no corre dos
+veces ni después de que otro proceso ya recargó los datos.
+"""
+
+import logging
+
+import calendario
+
+logger = logging.getLogger(__name__)
+
+# Identificador de la fila de versión dentro de schema_version
+ESQUEMA = 'fifa_db'
+
+def _registrar_calendario(session):
+    registrados, borradas = calendario.registrar_fechas_existentes(session)
+    logger.info("Calendario: %s partidos registrados, %s filas duplicadas borradas", registrados, borradas)
+
+
+# (version, descripcion, pasos) en orden creciente de versión; cada paso es
+# una sentencia CQL o una función que recibe la sesión (para completar datos)
+MIGRACIONES = [
+    (1, "Tablas iniciales de los casos de uso", [
+        """
+        CREATE TABLE IF NOT EXISTS tabla_posiciones (
+            edicion TEXT,
+            grupo TEXT,
+            posicion INT,
+            pais TEXT,
+            puntos INT,
+            gf INT,
+            gc INT,
+            dg INT,
+            PRIMARY KEY ((edicion, grupo), posicion)
+        ) WITH CLUSTERING ORDER BY (posicion ASC)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS partidos_populares (
+            edicion TEXT,
+            grupo TEXT,
+            popularidad INT,
+            id_partido INT,
+            fecha_hora TIMESTAMP,
+            estadio TEXT,
+            seleccionLocal TEXT,
+            seleccionVisitante TEXT,
+            PRIMARY KEY ((edicion, grupo), popularidad, id_partido)
+        ) WITH CLUSTERING ORDER BY (popularidad DESC)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS goles_seleccion_edicion (
+            edicion TEXT,
+            seleccion TEXT,
+            goles INT,
+            PRIMARY KEY (edicion, seleccion)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS partidos_fecha_estadio (
+            id_partido INT,
+            fecha TIMESTAMP,
+            estadio TEXT,
+            seleccionLocal TEXT,
+            seleccionVisitante TEXT,
+            golesLocal INT,
+            golesVisitante INT,
+            PRIMARY KEY (estadio, fecha)
+        ) WITH CLUSTERING ORDER BY (fecha ASC)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS goleadores_ko_edicion (
+            edicion TEXT,
+            golesko INT,
+            id_jugador INT,
+            apellidojugador TEXT,
+            nombrejugador TEXT,
+            seleccion TEXT,
+            PRIMARY KEY (edicion, golesko, id_jugador)
+        ) WITH CLUSTERING ORDER BY (golesko DESC, id_jugador ASC)
+        """,
+    ]),
+    (2, "Contadores de goles por selección y por goleador KO", [
+        """
+        CREATE TABLE IF NOT EXISTS goles_seleccion_contador (
+            edicion TEXT,
+            seleccion TEXT,
+            goles COUNTER,
+            PRIMARY KEY (edicion, seleccion)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS goleadores_ko_contador (
+            edicion TEXT,
+            id_jugador INT,
+            goles COUNTER,
+            PRIMARY KEY (edicion, id_jugador)
+        )
+        """,
+    ]),
+    # La tabla es un modelo de lectura: se recrea vacía y el ETL la vuelve a cargar
+    (3, "Partidos por estadio particionados por (estadio, anio)", [
+        "DROP TABLE IF EXISTS partidos_fecha_estadio",
+        """
+        CREATE TABLE IF NOT EXISTS partidos_fecha_estadio (
+            estadio TEXT,
+            anio INT,
+            fecha TIMESTAMP,
+            id_partido INT,
+            seleccionLocal TEXT,
+            seleccionVisitante TEXT,
+            golesLocal INT,
+            golesVisitante INT,
+            PRIMARY KEY ((estadio, anio), fecha, id_partido)
+        ) WITH CLUSTERING ORDER BY (fecha ASC, id_partido ASC)
+        """,
+    ]),
+    (4, "Calendario de partidos particionado por día", [
+        """
+        CREATE TABLE IF NOT EXISTS calendario_partidos (
+            dia DATE,
+            fecha TIMESTAMP,
+            id_partido INT,
+            estadio TEXT,
+            seleccionLocal TEXT,
+            seleccionVisitante TEXT,
+            golesLocal INT,
+            golesVisitante INT,
+            PRIMARY KEY (dia, fecha, id_partido)
+        ) WITH CLUSTERING ORDER BY (fecha ASC, id_partido ASC)
+        """,
+    ]),
+    (5, "Fecha anterior de cada partido del calendario", [
+        """
+        CREATE TABLE IF NOT EXISTS calendario_por_partido (
+            id_partido INT PRIMARY KEY,
+            dia DATE,
+            fecha TIMESTAMP
+        )
+        """,
+        # Sin TRUNCATE (exige todas las réplicas arriba): se registran las filas existentes
+        _registrar_calendario,
+    ]),
+]
+
+
+def version_objetivo():
+    """Versión del esquema que espera el código"""
+    return MIGRACIONES[-1][0]
+
+
+def leer_version(session, keyspace):
+    """
+    Leer la versión de esquema aplicada en el keyspace
+
+    Args:
+        session: Sesión de Cassandra
+        keyspace (str): Keyspace de la aplicación
+
+    Returns:
+        int: Versión aplicada (0 si el keyspace o la tabla no existen)
+    """
+    from cassandra import InvalidRequest
+
+    try:
+        row = session.execute(
+            f"SELECT version FROM {keyspace}.schema_version WHERE esquema = %s",
+            (ESQUEMA,)
+        ).one()
+    except InvalidRequest:
+        return 0
+    return row.version if row else 0
+
+
+def aplicar_migraciones(session, keyspace, version_actual=None):
+    """
+    Llevar el esquema a la versión objetivo ejecutando solo las migraciones pendientes
+
+    Args:
+        session: Sesión de Cassandra (con o sin keyspace seleccionado)
+        keyspace (str): Keyspace de la aplicación
+        version_actual (int): Versión ya leída (None = leerla)
+
+    Returns:
+        int: Versión del esquema al terminar
+    """
+    if version_actual is None:
+        version_actual = leer_version(session, keyspace)
+
+    objetivo = version_objetivo()
+    if version_actual >= objetivo:
+        return version_actual
+
+    logger.info("Esquema de Cassandra en versión %s, migrando a %s", version_actual, objetivo)
+
+    session.execute(f"""
+        CREATE KEYSPACE IF NOT EXISTS {keyspace}
+        WITH replication = {{'class': 'SimpleStrategy', 'replication_factor': 1}}
+    """)
+    session.set_keyspace(keyspace)
+    session.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            esquema TEXT PRIMARY KEY,
+            version INT,
+            descripcion TEXT,
+            aplicada_en TIMESTAMP
+        )
+    """)
+
+    for version, descripcion, sentencias in MIGRACIONES:
+        if version <= version_actual:
+            continue
+        if not _reclamar_version(session, version_actual, version, descripcion):
+            # Otro proceso ya aplicó (o está aplicando) esta versión: no repetir sus pasos
+            version_actual = leer_version(session, keyspace)
+            logger.info("Otro proceso migró el esquema de Cassandra (versión %s)", version_actual)
+            return version_actual
+        try:
+            for sentencia in sentencias:
+                if callable(sentencia):
+                    sentencia(session)
+                else:
+                    session.execute(sentencia)
+        except Exception:
+            _liberar_version(session, version, version_actual)
+            raise
+        version_actual = version
+        logger.info("Migración %s aplicada: %s", version, descripcion)
+
+    return version_actual
+
+
+def _reclamar_version(session, anterior, version, descripcion):
+    """
+    Pasar schema_version de `anterior` a `version` con un LWT
+
+    Returns:
+        bool: True si este proceso ganó la versión y debe ejecutar la migración
+    """
+    if anterior == 0:
+        rs = session.execute(
+            """
+            INSERT INTO schema_version (esquema, version, descripcion, aplicada_en)
+            VALUES (%s, %s, %s, toTimestamp(now()))
+            IF NOT EXISTS
+            """,
+            (ESQUEMA, version, descripcion)
+        )
+    else:
+        rs = session.execute(
+            """
+            UPDATE schema_version SET version = %s, descripcion = %s, aplicada_en = toTimestamp(now())
+            WHERE esquema = %s
+            IF version = %s
+            """,
+            (version, descripcion, ESQUEMA, anterior)
+        )
+    return rs.was_applied
+
+
+def _liberar_version(session, version, anterior):
+    """Devolver schema_version a `anterior` si la migración reclamada falló"""
+    try:
+        if anterior == 0:
+            session.execute("DELETE FROM schema_version WHERE esquema = %s IF version = %s", (ESQUEMA, version))
+        else:
+            session.execute(
+                "UPDATE schema_version SET version = %s WHERE esquema = %s IF version = %s",
+                (anterior, ESQUEMA, version)
+            )
+    except Exception as e:
+        logger.error("No se pudo liberar la versión %s del esquema tras el error: %s", version, e)
@@ -0,0 +1,286 @@
+"""
+Especificaciones de los modelos de lectura cargados por el motor ETL
+
+Agregar un caso de uso nuevo es declarar su EspecificacionETL acá: la fuente en
+PostgreSQL, las columnas que devuelve, cómo se mapean al destino y con qué
+clave y modo se escriben.
+"""
+
+import logging
+
+from db_manager import db_manager
+import calendario
+import caminos_ko
+import contadores_goles
+import leaderboards
+import vista_arbitros
+from pipeline_etl import (
+    DESTINO_CASSANDRA,
+    DESTINO_MONGODB,
+    DESTINO_NEO4J,
+    MODO_REEMPLAZAR,
+    MODO_UPSERT,
+    EspecificacionETL,
+)
+from transformaciones import transformar_jugadores_pais, transformar_partido_arbitros
+
+logger = logging.getLogger(__name__)
+
+
+def _actualizar_leaderboard(leaderboard, edicion, puntajes, detalles=None):
+    """Reconstruir un leaderboard de Redis sin hacer fallar el ETL si Redis no responde"""
+    try:
+        r = db_manager.get_redis_client()
+        cantidad = leaderboards.reconstruir(r, leaderboard, edicion, puntajes, detalles)
+        logger.info("✅ Leaderboard %s actualizado en Redis (%s entradas)", leaderboard, cantidad)
+    except Exception as e:
+        logger.warning("⚠️  No se pudo actualizar el leaderboard %s: %s", leaderboard, e)
+
+
+def _por_edicion(filas):
+    """Agrupar filas cargadas por edición"""
+    ediciones = {}
+    for fila in filas:
+        ediciones.setdefault(fila['edicion'], []).append(fila)
+    return ediciones
+
+
+def _reconciliar_contadores(tabla, edicion, totales):
+    """
+    Llevar los contadores de una edición a los totales recién cargados
+
+    Sin esto, el primer registrar_gol de una edición nunca reconciliada crea
+    contadores solo para quien convirtió, y la lectura (que prefiere los
+    contadores) perdería al resto de las selecciones.
+    """
+    try:
+        contadores_goles.reconciliar(tabla, edicion, totales)
+    except Exception as e:
+        logger.warning("⚠️  No se pudieron reconciliar los contadores %s de %s: %s", tabla, edicion, e)
+
+
+def _leaderboard_goles_seleccion(filas, lista_parametros):
+    for edicion, grupo in _por_edicion(filas).items():
+        totales = {f['seleccion']: f['goles'] for f in grupo}
+        _actualizar_leaderboard(leaderboards.LEADERBOARD_GOLES_SELECCION, edicion, totales)
+        _reconciliar_contadores(contadores_goles.TABLA_SELECCION, edicion, totales)
+
+
+def _leaderboard_goleadores_ko(filas, lista_parametros):
+    for edicion, grupo in _por_edicion(filas).items():
+        _actualizar_leaderboard(
+            leaderboards.LEADERBOARD_GOLEADORES_KO,
+            edicion,
+            {f['id_jugador']: f['golesko'] for f in grupo},
+            {f['id_jugador']: {
+                'nombre': f['nombrejugador'],
+                'apellido': f['apellidojugador'],
+                'seleccion': f['seleccion']
+            } for f in grupo}
+        )
+        _reconciliar_contadores(
+            contadores_goles.TABLA_GOLEADORES_KO, edicion, {f['id_jugador']: f['golesko'] for f in grupo}
+        )
+
+
+def _precalcular_caminos(filas, lista_parametros):
+    """Guardar en Redis los caminos más cortos entre todos los pares de cada edición"""
+    for edicion, grupo in _por_edicion(filas).items():
+        try:
+            cantidad = caminos_ko.guardar(
+                db_manager.get_redis_client(), edicion, caminos_ko.calcular_caminos(grupo)
+            )
+            logger.info("✅ Caminos de eliminación precalculados en Redis (%s pares)", cantidad)
+        except Exception as e:
+            logger.warning("⚠️  No se pudieron precalcular los caminos de %s: %s", edicion, e)
+
+
+def _calendario_partidos(filas, lista_parametros):
+    """Copiar los partidos cargados al calendario por día"""
+    try:
+        cantidad = calendario.guardar(
+            db_manager.get_cassandra_session(),
+            calendario.filas_calendario(filas),
+            execution_profile=db_manager.cassandra_perfil_escritura
+        )
+        logger.info("✅ Calendario de partidos actualizado en Cassandra (%s partidos)", cantidad)
+    except Exception as e:
+        logger.warning("⚠️  No se pudo actualizar el calendario de partidos: %s", e)
+
+
+def _vista_por_arbitro(documentos, lista_parametros):
+    """Reconstruir la vista por árbitro de las ediciones recargadas"""
+    try:
+        db = db_manager.get_mongodb_db()
+        vista_arbitros.asegurar_indices(db)
+        cantidad = vista_arbitros.reemplazar(
+            db,
+            {p['edicion'] for p in lista_parametros},
+            vista_arbitros.documentos_por_arbitro(documentos)
+        )
+        logger.info("✅ Vista %s actualizada en MongoDB (%s documentos)", vista_arbitros.COLECCION, cantidad)
+    except Exception as e:
+        logger.warning("⚠️  No se pudo actualizar la vista %s: %s", vista_arbitros.COLECCION, e)
+
+
+TABLA_POSICIONES = EspecificacionETL(
+    nombre='tabla_posiciones',
+    descripcion='tabla de posiciones',
+    fuente='get_tabla_posiciones_grupo',
+    parametros=('edicion', 'grupo'),
+    # La función puede devolver además (edicion, grupo) al inicio
+    columnas=('posicion', 'pais', 'puntos', 'gf', 'gc', 'dg'),
+    mapeo=[
+        ('edicion', 'edicion'), ('grupo', 'grupo'), ('posicion', 'posicion'), ('pais', 'pais'),
+        ('puntos', 'puntos'), ('gf', 'gf'), ('gc', 'gc'), ('dg', 'dg'),
+    ],
+    destino=DESTINO_CASSANDRA,
+    tabla='tabla_posiciones',
+    clave=('edicion', 'grupo'),
+    modo=MODO_REEMPLAZAR
+)
+
+PARTIDOS_POPULARES = EspecificacionETL(
+    nombre='partidos_populares',
+    descripcion='partidos populares',
+    fuente='get_partidos_grupo_por_popularidad',
+    parametros=('edicion', 'grupo'),
+    columnas=('id_partido', 'fecha_hora', 'estadio', 'local', 'visitante', 'popularidad'),
+    mapeo=[
+        ('edicion', 'edicion'), ('grupo', 'grupo'), ('popularidad', 'popularidad'),
+        ('id_partido', 'id_partido'), ('fecha_hora', 'fecha_hora'), ('estadio', 'estadio'),
+        ('seleccionLocal', 'local'), ('seleccionVisitante', 'visitante'),
+    ],
+    destino=DESTINO_CASSANDRA,
+    tabla='partidos_populares',
+    clave=('edicion', 'grupo'),
+    modo=MODO_REEMPLAZAR
+)
+
+GOLES_SELECCION_EDICION = EspecificacionETL(
+    nombre='goles_seleccion_edicion',
+    descripcion='goles por selección',
+    fuente='get_goles_por_seleccion_edicion',
+    parametros=('edicion',),
+    columnas=('edicion', 'seleccion', 'goles'),
+    destino=DESTINO_CASSANDRA,
+    tabla='goles_seleccion_edicion',
+    clave=('edicion', 'seleccion'),
+    modo=MODO_UPSERT,
+    posterior=_leaderboard_goles_seleccion
+)
+
+PARTIDOS_FECHA_ESTADIO = EspecificacionETL(
+    nombre='partidos_fecha_estadio',
+    descripcion='partidos por fecha y estadio',
+    fuente='get_partidos_por_anio_estadio',
+    parametros=('anio', 'estadio'),
+    columnas=('id_partido', 'fecha', 'estadio', 'local', 'visitante', 'goles_local', 'goles_visitante'),
+    mapeo=[
+        ('estadio', 'estadio'), ('anio', 'anio'), ('fecha', 'fecha'), ('id_partido', 'id_partido'),
+        ('seleccionLocal', 'local'), ('seleccionVisitante', 'visitante'),
+        ('golesLocal', 'goles_local'), ('golesVisitante', 'goles_visitante'),
+    ],
+    destino=DESTINO_CASSANDRA,
+    tabla='partidos_fecha_estadio',
+    # Una partición por estadio y año, recargada completa en cada ETL
+    clave=('estadio', 'anio'),
+    modo=MODO_REEMPLAZAR,
+    # La misma extracción alimenta el calendario por día
+    posterior=_calendario_partidos
+)
+
+GOLEADORES_KO_EDICION = EspecificacionETL(
+    nombre='goleadores_ko_edicion',
+    descripcion='goleadores KO',
+    fuente='get_goleadores_fases_ko',
+    parametros=('edicion',),
+    columnas=('id_jugador', 'nombre', 'apellido', 'pais', 'goles_ko'),
+    mapeo=[
+        ('edicion', 'edicion'), ('golesko', 'goles_ko'), ('id_jugador', 'id_jugador'),
+        ('apellidojugador', 'apellido'), ('nombrejugador', 'nombre'), ('seleccion', 'pais'),
+    ],
+    destino=DESTINO_CASSANDRA,
+    tabla='goleadores_ko_edicion',
+    clave=('edicion', 'golesko', 'id_jugador'),
+    modo=MODO_UPSERT,
+    posterior=_leaderboard_goleadores_ko
+)
+
+ARBITROS_FASES_FINALES = EspecificacionETL(
+    nombre='arbitros_fases_finales',
+    descripcion='árbitros fases finales',
+    fuente='get_arbitros_fases_finales',
+    parametros=('edicion',),
+    columnas=('edicion_fila', 'fase', 'id_partido', 'local', 'visitante', 'arbitro', 'rol'),
+    destino=DESTINO_MONGODB,
+    tabla='arbitros_fases_finales',
+    clave=('edicion',),
+    modo=MODO_REEMPLAZAR,
+    # Una partición por partido, transformadas en paralelo
+    transformacion=transformar_partido_arbitros,
+    particion=('edicion', 'id_partido'),
+    # Además, un documento por (árbitro, partido, rol) para consultar por árbitro
+    posterior=_vista_por_arbitro
+)
+
+JUGADORES_GOLEADORES = EspecificacionETL(
+    nombre='jugadores_goleadores',
+    descripcion='jugadores goleadores',
+    fuente='get_jugadores_pais_min_goles',
+    parametros=('edicion', 'pais', 'min_goles'),
+    columnas=('id_jugador', 'nombre', 'apellido', 'pais_fila', 'goles_totales'),
+    destino=DESTINO_MONGODB,
+    tabla='jugadores_goleadores',
+    clave=('edicion', 'pais'),
+    modo=MODO_UPSERT,
+    # Un documento por (edición, país)
+    transformacion=transformar_jugadores_pais,
+    particion=('edicion', 'pais')
+)
+
+PARTIDOS_KO = EspecificacionETL(
+    nombre='partidos_ko',
+    descripcion='grafo de partidos KO',
+    consulta="""
+        SELECT id_edicion, id_partido, fase, sel_a, pais_a, sel_b, pais_b
+        FROM vw_partidos_ko_edges
+        WHERE edicion_nombre = %s
+    """,
+    parametros=('edicion',),
+    columnas=('id_edicion', 'id_partido', 'fase', 'sel_a', 'pais_a', 'sel_b', 'pais_b'),
+    # El nombre de la edición identifica los caminos precalculados
+    mapeo=[
+        ('edicion', 'edicion'), ('id_edicion', 'id_edicion'), ('id_partido', 'id_partido'),
+        ('fase', 'fase'), ('sel_a', 'sel_a'), ('pais_a', 'pais_a'), ('sel_b', 'sel_b'), ('pais_b', 'pais_b'),
+    ],
+    destino=DESTINO_NEO4J,
+    tabla='Seleccion',
+    # Se limpian TODOS los nodos de la edición (id numérico) antes de cargar
+    clave=('id_edicion',),
+    modo=MODO_REEMPLAZAR,
+    cypher="""
+        UNWIND $filas AS fila
+        MERGE (a:Seleccion {id_seleccion: fila.sel_a, id_edicion: fila.id_edicion})
+        ON CREATE SET a.nombre = fila.pais_a
+        MERGE (b:Seleccion {id_seleccion: fila.sel_b, id_edicion: fila.id_edicion})
+        ON CREATE SET b.nombre = fila.pais_b
+        MERGE (a)-[r:JUEGA_CONTRA {id_partido: fila.id_partido, id_edicion: fila.id_edicion}]->(b)
+        ON CREATE SET r.fase = fila.fase, r.edicion = fila.edicion
+    """,
+    posterior=_precalcular_caminos
+)
+
+# Registro de modelos por nombre
+MODELOS = {
+    spec.nombre: spec for spec in (
+        TABLA_POSICIONES,
+        PARTIDOS_POPULARES,
+        GOLES_SELECCION_EDICION,
+        PARTIDOS_FECHA_ESTADIO,
+        GOLEADORES_KO_EDICION,
+        ARBITROS_FASES_FINALES,
+        JUGADORES_GOLEADORES,
+        PARTIDOS_KO,
+    )
+}
@@ -0,0 +1,325 @@
+"""
+Módulo con la API uniforme de lectura paginada para los obtener_*
+
+Todas las lecturas aceptan los mismos parámetros:
+    limit: Cantidad máxima de filas (se empuja al motor como tamaño de página)
+    page_token: Token opaco devuelto por la página anterior
+    stream: Si es True se devuelve un generador que recorre las páginas a demanda
+
+En modo stream la primera página se pide antes de devolver el generador, así
+un error de conexión salta dentro del try del obtener_* que llamó; un error en
+una página posterior se informa con el callback al_fallar y corta el recorrido.
+
+Sin limit, page_token ni stream se devuelven todas las filas, como antes.
+"""
+
+import base64
+import heapq
+import itertools
+import json
+import os
+
+from perfilado import (
+    explicar_mongo,
+    explicar_mongo_agregacion,
+    opciones_cassandra,
+    registrar_cassandra,
+)
+
+# Tamaño de página cuando se continúa con un token sin indicar limit
+TAMANIO_PAGINA = int(os.getenv('FIFA_PAGE_SIZE', 100))
+
+# Lecturas de partición en vuelo a la vez en las lecturas por lote
+CONCURRENCIA_LECTURA = int(os.getenv('FIFA_CONCURRENCIA_LECTURA', 32))
+
+
+class Pagina(list):
+    """Lista de filas de una página, con el token para pedir la siguiente"""
+
+    def __init__(self, filas=(), page_token=None):
+        super().__init__(filas)
+        self.page_token = page_token
+
+
+def codificar_token(tipo, valor):
+    """Codificar el estado de paginación de un motor en un token opaco"""
+    contenido = json.dumps({'t': tipo, 'v': valor}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(contenido.encode('utf-8')).decode('ascii')
+
+
+def decodificar_token(token, tipo):
+    """
+    Decodificar un token generado por codificar_token
+
+    Raises:
+        ValueError: Si el token es inválido o pertenece a otro tipo de lectura
+    """
+    try:
+        contenido = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except Exception:
+        raise ValueError("page_token inválido")
+    if contenido.get('t') != tipo:
+        raise ValueError("page_token no corresponde a esta lectura")
+    return contenido['v']
+
+
+def _tamanio(limit):
+    return limit if limit else TAMANIO_PAGINA
+
+
+# ======================================================================
+# CASSANDRA: paging state del driver
+# ======================================================================
+
+def leer_cassandra(session, statement, params, limit=None, page_token=None,
+                   stream=False, execution_profile=None, al_fallar=None):
+    """
+    Ejecutar un SELECT preparado con paginación nativa de Cassandra
+
+    Con limit el tamaño de página es limit, por lo que Cassandra lee solo las
+    primeras filas de la partición (top-N sin leer la partición completa).
+
+    Args:
+        session: Sesión de Cassandra
+        statement: PreparedStatement del SELECT
+        params (tuple): Valores de la clave de partición
+        limit (int): Cantidad máxima de filas
+        page_token (str): Token de la página anterior
+        stream (bool): Devolver un generador en lugar de una página
+        execution_profile (str): Perfil de ejecución a usar
+        al_fallar (callable): Recibe el error de una página posterior del stream
+            (None = propagarlo al consumidor)
+
+    Returns:
+        Pagina | generator: Filas leídas
+    """
+    paging_state = None
+    if page_token:
+        paging_state = base64.b64decode(decodificar_token(page_token, 'cassandra'))
+
+    bound = statement.bind(params)
+    kwargs = opciones_cassandra({'paging_state': paging_state})
+    if execution_profile is not None:
+        kwargs['execution_profile'] = execution_profile
+
+    if stream:
+        if limit:
+            bound.fetch_size = min(limit, session.default_fetch_size)
+        rs = session.execute(bound, **kwargs)
+        registrar_cassandra(statement, params, rs)
+        # El ResultSet pide la página siguiente recién al agotar la actual
+        return _stream(itertools.islice(rs, limit) if limit else rs, al_fallar)
+
+    if not limit and not page_token:
+        rs = session.execute(bound, **kwargs)
+        registrar_cassandra(statement, params, rs)
+        return Pagina(rs)
+
+    bound.fetch_size = _tamanio(limit)
+    rs = session.execute(bound, **kwargs)
+    registrar_cassandra(statement, params, rs)
+    token = None
+    if rs.paging_state:
+        token = codificar_token('cassandra', base64.b64encode(rs.paging_state).decode('ascii'))
+    return Pagina(rs.current_rows, token)
+
+
+def _stream(filas, al_fallar):
+    """Leer ya el primer elemento (y con él la primera página) y seguir a demanda"""
+    filas = iter(filas)
+    primero = list(itertools.islice(filas, 1))
+    return _continuar_stream(primero, filas, al_fallar)
+
+
+def _continuar_stream(primero, filas, al_fallar):
+    yield from primero
+    try:
+        yield from filas
+    except Exception as e:
+        if al_fallar is None:
+            raise
+        al_fallar(e)
+
+
+def leer_particiones_cassandra(session, statement, claves, limit=None,
+                              execution_profile=None, concurrencia=None):
+    """
+    Leer varias particiones a la vez (fan-out con execute_async)
+
+    Las lecturas se lanzan en ventanas de `concurrencia` consultas en vuelo,
+    por lo que el tiempo total es el de la partición más lenta y no la suma.
+
+    Args:
+        session: Sesión de Cassandra
+        statement: PreparedStatement del SELECT (parámetros = clave de partición)
+        claves (iterable): Claves de partición; tuplas o valores sueltos
+        limit (int): Cantidad máxima de filas por partición (None = todas)
+        execution_profile (str): Perfil de ejecución a usar
+        concurrencia (int): Lecturas en vuelo (None = FIFA_CONCURRENCIA_LECTURA)
+
+    Returns:
+        tuple: (resultados, errores) con resultados clave -> Pagina en el orden
+        de entrada y errores clave -> excepción de las particiones que fallaron
+    """
+    concurrencia = concurrencia or CONCURRENCIA_LECTURA
+    kwargs = opciones_cassandra({})
+    if execution_profile is not None:
+        kwargs['execution_profile'] = execution_profile
+
+    # Claves únicas respetando el orden de entrada
+    claves = list(dict.fromkeys(claves))
+    resultados = {}
+    errores = {}
+
+    for inicio in range(0, len(claves), concurrencia):
+        ventana = claves[inicio:inicio + concurrencia]
+        futuros = []
+        for clave in ventana:
+            bound = statement.bind(clave if isinstance(clave, tuple) else (clave,))
+            if limit:
+                bound.fetch_size = limit
+            futuros.append((clave, session.execute_async(bound, **kwargs)))
+
+        for clave, futuro in futuros:
+            try:
+                rs = futuro.result()
+                registrar_cassandra(statement, clave if isinstance(clave, tuple) else (clave,), rs)
+                filas = rs.current_rows if limit else rs
+                resultados[clave] = Pagina(itertools.islice(filas, limit) if limit else filas)
+            except Exception as e:
+                resultados[clave] = Pagina()
+                errores[clave] = e
+
+    return resultados, errores
+
+
+# ======================================================================
+# MONGODB: resume key (keyset) y offset de agregaciones
+# ======================================================================
+
+def leer_mongo(collection, filtro, proyeccion, orden, limit=None, page_token=None,
+               stream=False, al_fallar=None):
+    """
+    Ejecutar un find paginado por resume key sobre un orden único
+
+    El token guarda los valores de orden del último documento; la página
+    siguiente filtra a partir de ellos (sin skip), usando el índice del orden.
+
+    Args:
+        collection: Colección de MongoDB
+        filtro (dict): Filtro de la consulta
+        proyeccion (dict): Proyección (debe incluir los campos de orden)
+        orden (list): [(campo, 1|-1), ...] que identifica unívocamente al documento
+        limit (int): Cantidad máxima de documentos
+        page_token (str): Token de la página anterior
+        stream (bool): Devolver un generador en lugar de una página
+        al_fallar (callable): Recibe el error de un lote posterior del stream
+            (None = propagarlo al consumidor)
+
+    Returns:
+        Pagina | generator: Documentos leídos
+    """
+    if page_token:
+        ultimo = decodificar_token(page_token, 'mongo')
+        filtro = {'$and': [filtro, _filtro_desde(orden, ultimo)]}
+
+    cursor = collection.find(filtro, proyeccion).sort(orden)
+
+    if stream:
+        if limit:
+            cursor = cursor.limit(limit).batch_size(limit)
+        explicar_mongo(collection, cursor, filtro, orden)
+        return _stream(cursor, al_fallar)
+
+    if not limit and not page_token:
+        explicar_mongo(collection, cursor, filtro, orden)
+        return Pagina(cursor)
+
+    tamanio = _tamanio(limit)
+    cursor = cursor.limit(tamanio + 1)
+    explicar_mongo(collection, cursor, filtro, orden)
+    documentos = list(cursor)
+    token = None
+    if len(documentos) > tamanio:
+        documentos = documentos[:tamanio]
+        token = codificar_token('mongo', [documentos[-1][campo] for campo, _ in orden])
+    return Pagina(documentos, token)
+
+
+def _filtro_desde(orden, ultimo):
+    """Construir el filtro keyset: documentos posteriores a los valores de 'ultimo'"""
+    condiciones = []
+    for i, (campo, direccion) in enumerate(orden):
+        condicion = {campo_previo: ultimo[j] for j, (campo_previo, _) in enumerate(orden[:i])}
+        condicion[campo] = {'$gt' if direccion == 1 else '$lt': ultimo[i]}
+        condiciones.append(condicion)
+    return {'$or': condiciones}
+
+
+def leer_mongo_agregacion(collection, pipeline, limit=None, page_token=None, stream=False,
+                          al_fallar=None):
+    """
+    Ejecutar una agregación paginada por offset ($skip / $limit en el servidor)
+
+    Se usa para arrays embebidos (ej: jugadores de un país), donde no hay un
+    documento por fila sobre el que construir una resume key.
+
+    Returns:
+        Pagina | generator: Documentos leídos
+    """
+    offset = decodificar_token(page_token, 'offset') if page_token else 0
+    etapas = list(pipeline)
+    if offset:
+        etapas.append({'$skip': offset})
+
+    if stream:
+        if limit:
+            etapas.append({'$limit': limit})
+        explicar_mongo_agregacion(collection, etapas)
+        return _stream(collection.aggregate(etapas), al_fallar)
+
+    if not limit and not page_token:
+        explicar_mongo_agregacion(collection, etapas)
+        return Pagina(collection.aggregate(etapas))
+
+    tamanio = _tamanio(limit)
+    etapas.append({'$limit': tamanio + 1})
+    explicar_mongo_agregacion(collection, etapas)
+    documentos = list(collection.aggregate(etapas))
+    token = None
+    if len(documentos) > tamanio:
+        documentos = documentos[:tamanio]
+        token = codificar_token('offset', offset + tamanio)
+    return Pagina(documentos, token)
+
+
+# ======================================================================
+# ORDEN EN MEMORIA: modelos cuyo orden no es clave de clustering
+# ======================================================================
+
+def paginar_ordenado(filas, clave, limit=None, page_token=None, stream=False):
+    """
+    Paginar filas que deben ordenarse en el cliente (orden descendente por clave)
+
+    Para top-N se usa heapq.nlargest, que no ordena el conjunto completo.
+
+    Returns:
+        Pagina | generator: Filas ordenadas
+    """
+    offset = decodificar_token(page_token, 'offset') if page_token else 0
+
+    if stream:
+        ordenadas = sorted(filas, key=clave, reverse=True)
+        fin = offset + limit if limit else None
+        return (fila for fila in ordenadas[offset:fin])
+
+    if not limit and not page_token:
+        return Pagina(sorted(filas, key=clave, reverse=True))
+
+    tamanio = _tamanio(limit)
+    primeras = heapq.nlargest(offset + tamanio + 1, filas, key=clave)
+    pagina = primeras[offset:offset + tamanio]
+    token = None
+    if len(primeras) > offset + tamanio:
+        token = codificar_token('offset', offset + tamanio)
+    return Pagina(pagina, token)
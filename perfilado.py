@@ -0,0 +1,391 @@
+"""
+Módulo de perfilado de consultas por backend
+
+Con el perfilado activo (FIFA_PERFILADO=true, o activar() desde el CLI o
+ETLManager) cada consulta de los casos de uso deja su plan en un reporte
+único de la corrida:
+
+- PostgreSQL: EXPLAIN (ANALYZE, BUFFERS) de la función get_* que extrae el ETL
+  (y, si auto_explain se puede cargar, los planes de las sentencias internas)
+- Cassandra: traza del request (coordinador, eventos por réplica y tiempos)
+- MongoDB: explain() del find o de la agregación
+- Neo4j: PROFILE de la consulta de camino más corto
+
+El perfilado vuelve a ejecutar las consultas de PostgreSQL y agrega idas y
+vueltas en el resto, así que los tiempos de la corrida no son representativos.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# Operación (ej: obtener_tabla_posiciones_cassandra) que se está perfilando
+_operacion = contextvars.ContextVar('operacion_perfilada', default=None)
+
+
+class Perfilador:
+    """Reúne los planes de consulta de todos los backends en un reporte por corrida"""
+
+    def __init__(self, activo=False):
+        self.activo = activo
+        self._lock = threading.Lock()
+        self._entradas = []
+        self._inicio = datetime.now() if activo else None
+
+    def activar(self):
+        """Empezar una corrida de perfilado nueva"""
+        with self._lock:
+            self._entradas = []
+            self._inicio = datetime.now()
+        self.activo = True
+
+    def desactivar(self):
+        """
+        Terminar la corrida de perfilado
+
+        Returns:
+            dict: Reporte de la corrida (ver reporte)
+        """
+        self.activo = False
+        return self.reporte()
+
+    @contextlib.contextmanager
+    def operacion(self, nombre):
+        """Asociar las consultas que se hagan dentro del bloque a una operación"""
+        token = _operacion.set(nombre)
+        try:
+            yield
+        finally:
+            _operacion.reset(token)
+
+    def registrar(self, backend, consulta, parametros, plan, texto, segundos=None, error=None):
+        """
+        Agregar el plan de una consulta al reporte
+
+        Args:
+            backend (str): 'postgresql', 'cassandra', 'mongodb' o 'neo4j'
+            consulta (str): Texto de la consulta
+            parametros: Valores de la consulta
+            plan: Plan completo tal como lo devuelve el backend
+            texto (list): Líneas legibles del plan
+            segundos (float): Duración de la consulta perfilada
+            error (str): Error al obtener el plan
+        """
+        entrada = {
+            'momento': datetime.now().isoformat(timespec='milliseconds'),
+            'backend': backend,
+            'operacion': _operacion.get(),
+            'consulta': ' '.join(consulta.split()),
+            'parametros': parametros,
+            'segundos': segundos,
+            'texto': texto,
+            'plan': plan,
+            'error': error
+        }
+        with self._lock:
+            self._entradas.append(entrada)
+
+    def reporte(self):
+        """
+        Reporte de la corrida actual
+
+        Returns:
+            dict: inicio, fin, cantidad de consultas por backend y entradas
+        """
+        with self._lock:
+            entradas = list(self._entradas)
+        consultas = {}
+        for entrada in entradas:
+            consultas[entrada['backend']] = consultas.get(entrada['backend'], 0) + 1
+        return {
+            'inicio': self._inicio.isoformat(timespec='seconds') if self._inicio else None,
+            'fin': datetime.now().isoformat(timespec='seconds'),
+            'consultas': consultas,
+            'entradas': entradas
+        }
+
+    def guardar(self, ruta=None):
+        """
+        Guardar el reporte de la corrida en JSON
+
+        Args:
+            ruta (str): Archivo de destino (None = perfilado_<inicio>.json en FIFA_PERFILADO_DIRECTORIO)
+
+        Returns:
+            str: Ruta del archivo escrito
+        """
+        if ruta is None:
+            inicio = self._inicio or datetime.now()
+            ruta = os.path.join(
+                os.getenv('FIFA_PERFILADO_DIRECTORIO', '.'),
+                f"perfilado_{inicio.strftime('%Y%m%d_%H%M%S')}.json"
+            )
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(self.reporte(), archivo, indent=2, ensure_ascii=False, default=str)
+        return ruta
+
+    def imprimir(self):
+        """Mostrar el reporte de la corrida en consola"""
+        reporte = self.reporte()
+        print("\n" + "=" * 70)
+        print(f"🔬 PERFILADO ({reporte['inicio']} → {reporte['fin']})")
+        print("=" * 70)
+        if not reporte['entradas']:
+            print("Sin consultas perfiladas")
+            return
+        for entrada in reporte['entradas']:
+            duracion = f" {entrada['segundos'] * 1000:.1f} ms" if entrada['segundos'] is not None else ""
+            print(f"\n▶️  [{entrada['backend']}] {entrada['operacion'] or '-'}{duracion}")
+            print(f"   {entrada['consulta'][:200]}")
+            if entrada['error']:
+                print(f"   ⚠️  {entrada['error']}")
+            for linea in entrada['texto']:
+                print(f"   {linea}")
+        resumen = ', '.join(f"{backend}: {n}" for backend, n in reporte['consultas'].items())
+        print(f"\n📊 Consultas perfiladas: {resumen}")
+
+
+perfilador = Perfilador(os.getenv('FIFA_PERFILADO', 'false').lower() == 'true')
+
+
+# ======================================================================
+# POSTGRESQL: EXPLAIN (ANALYZE, BUFFERS)
+# ======================================================================
+
+_AUTO_EXPLAIN = [
+    "LOAD 'auto_explain'",
+    "SET LOCAL auto_explain.log_min_duration = 0",
+    "SET LOCAL auto_explain.log_analyze = on",
+    "SET LOCAL auto_explain.log_buffers = on",
+    "SET LOCAL auto_explain.log_nested_statements = on",
+    "SET LOCAL auto_explain.log_level = notice",
+]
+
+
+def explicar_postgresql(conexion, consulta, valores):
+    """
+    Registrar EXPLAIN (ANALYZE, BUFFERS) de una consulta
+
+    Todo corre dentro de un savepoint que se deshace al final, así que los
+    efectos de la ejecución y la configuración de auto_explain no quedan en la
+    transacción de la extracción.
+
+    Args:
+        conexion: Conexión de psycopg2 (la misma de la extracción)
+        consulta (str): SELECT con marcadores %s
+        valores (tuple): Valores de los marcadores
+    """
+    if not perfilador.activo:
+        return
+    cursor = conexion.cursor()
+    plan, anidados, error = [], [], None
+    inicio = time.perf_counter()
+    try:
+        cursor.execute("SAVEPOINT perfilado")
+        try:
+            avisos = len(conexion.notices)
+            con_auto_explain = _activar_auto_explain(cursor)
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {consulta}", valores)
+            plan = [fila[0] for fila in cursor.fetchall()]
+            if con_auto_explain:
+                anidados = [aviso.strip() for aviso in conexion.notices[avisos:]]
+        finally:
+            cursor.execute("ROLLBACK TO SAVEPOINT perfilado")
+            cursor.execute("RELEASE SAVEPOINT perfilado")
+    except Exception as e:
+        error = str(e)
+    finally:
+        cursor.close()
+    perfilador.registrar(
+        'postgresql', consulta, list(valores), {'plan': plan, 'sentencias_internas': anidados},
+        plan + anidados, time.perf_counter() - inicio, error
+    )
+
+
+def _activar_auto_explain(cursor):
+    """Planes de las sentencias internas de las funciones (requiere poder cargar auto_explain)"""
+    cursor.execute("SAVEPOINT auto_explain")
+    try:
+        for sentencia in _AUTO_EXPLAIN:
+            cursor.execute(sentencia)
+        cursor.execute("RELEASE SAVEPOINT auto_explain")
+        return True
+    except Exception:
+        cursor.execute("ROLLBACK TO SAVEPOINT auto_explain")
+        return False
+
+
+# ======================================================================
+# CASSANDRA: tracing del request
+# ======================================================================
+
+def opciones_cassandra(kwargs):
+    """Agregar trace=True a los kwargs de session.execute si el perfilado está activo"""
+    if perfilador.activo:
+        kwargs['trace'] = True
+    return kwargs
+
+
+def registrar_cassandra(statement, parametros, result_set):
+    """
+    Registrar la traza de un request ejecutado con opciones_cassandra
+
+    Args:
+        statement: Statement ejecutado
+        parametros: Valores bindeados
+        result_set: ResultSet devuelto por execute (o por el futuro de execute_async)
+    """
+    if not perfilador.activo:
+        return
+    consulta = getattr(statement, 'query_string', str(statement))
+    try:
+        traza = result_set.get_query_trace()
+    except Exception as e:
+        perfilador.registrar('cassandra', consulta, list(parametros), None, [], error=str(e))
+        return
+    if traza is None:
+        return
+    eventos = [
+        {
+            'fuente': str(evento.source),
+            'hilo': evento.thread_name,
+            'microsegundos': evento.source_elapsed.total_seconds() * 1e6 if evento.source_elapsed else None,
+            'actividad': evento.description
+        }
+        for evento in traza.events
+    ]
+    texto = [f"coordinador {traza.coordinator}, {traza.request_type}, {traza.duration.total_seconds() * 1000:.2f} ms"]
+    texto += [
+        f"{e['microsegundos'] or 0:>10.0f} µs  {e['fuente']:<15} {e['actividad']}"
+        for e in eventos
+    ]
+    perfilador.registrar(
+        'cassandra', consulta, list(parametros),
+        {'trace_id': str(traza.trace_id), 'coordinador': str(traza.coordinator),
+         'request_type': traza.request_type, 'parametros': traza.parameters, 'eventos': eventos},
+        texto, traza.duration.total_seconds()
+    )
+
+
+# ======================================================================
+# MONGODB: explain()
+# ======================================================================
+
+def explicar_mongo(collection, cursor, filtro, orden):
+    """
+    Registrar el explain() de un find (el cursor no se consume)
+
+    Args:
+        collection: Colección consultada
+        cursor: Cursor de find con sort/limit ya aplicados
+        filtro (dict): Filtro de la consulta
+        orden (list): Orden de la consulta
+    """
+    if not perfilador.activo:
+        return
+    consulta = f"db.{collection.name}.find({filtro}).sort({orden})"
+    try:
+        plan = cursor.explain()
+    except Exception as e:
+        perfilador.registrar('mongodb', consulta, None, None, [], error=str(e))
+        return
+    _registrar_explain_mongo(consulta, plan)
+
+
+def explicar_mongo_agregacion(collection, etapas):
+    """Registrar el explain de una agregación con executionStats"""
+    if not perfilador.activo:
+        return
+    consulta = f"db.{collection.name}.aggregate({etapas})"
+    try:
+        plan = collection.database.command(
+            'explain', {'aggregate': collection.name, 'pipeline': etapas, 'cursor': {}},
+            verbosity='executionStats'
+        )
+    except Exception as e:
+        perfilador.registrar('mongodb', consulta, None, None, [], error=str(e))
+        return
+    _registrar_explain_mongo(consulta, plan)
+
+
+def _registrar_explain_mongo(consulta, plan):
+    planner = _buscar(plan, 'queryPlanner') or {}
+    estadisticas = _buscar(plan, 'executionStats') or {}
+    etapas = []
+    etapa = planner.get('winningPlan', {})
+    while etapa:
+        nombre = etapa.get('stage')
+        if nombre and etapa.get('indexName'):
+            nombre += f"({etapa['indexName']})"
+        etapas.append(nombre)
+        etapa = etapa.get('inputStage') or (etapa.get('inputStages') or [None])[0] or etapa.get('queryPlan')
+    texto = [
+        f"plan: {' ← '.join(e for e in etapas if e) or '-'}",
+        f"devueltos {estadisticas.get('nReturned', '-')}, claves examinadas "
+        f"{estadisticas.get('totalKeysExamined', '-')}, documentos examinados "
+        f"{estadisticas.get('totalDocsExamined', '-')}, {estadisticas.get('executionTimeMillis', '-')} ms"
+    ]
+    segundos = estadisticas.get('executionTimeMillis')
+    perfilador.registrar(
+        'mongodb', consulta, None, plan, texto, segundos / 1000 if segundos is not None else None
+    )
+
+
+def _buscar(documento, clave):
+    """Primer valor de una clave en un documento anidado (el explain cambia de forma según la etapa)"""
+    if isinstance(documento, dict):
+        if clave in documento:
+            return documento[clave]
+        hijos = documento.values()
+    elif isinstance(documento, list):
+        hijos = documento
+    else:
+        return None
+    for hijo in hijos:
+        encontrado = _buscar(hijo, clave)
+        if encontrado is not None:
+            return encontrado
+    return None
+
+
+# ======================================================================
+# NEO4J: PROFILE
+# ======================================================================
+
+def perfilar_cypher(consulta):
+    """Anteponer PROFILE a una consulta Cypher si el perfilado está activo"""
+    return f"PROFILE {consulta}" if perfilador.activo else consulta
+
+
+def registrar_neo4j(consulta, parametros, summary):
+    """
+    Registrar el plan de una consulta ejecutada con perfilar_cypher
+
+    Args:
+        consulta (str): Consulta Cypher (sin PROFILE)
+        parametros (dict): Parámetros de la consulta
+        summary: ResultSummary devuelto por result.consume()
+    """
+    if not perfilador.activo:
+        return
+    perfil = summary.profile
+    texto = []
+    _lineas_operador(perfil, 0, texto)
+    disponible = summary.result_available_after or 0
+    consumido = summary.result_consumed_after or 0
+    perfilador.registrar('neo4j', consulta, parametros, perfil, texto, (disponible + consumido) / 1000)
+
+
+def _lineas_operador(operador, nivel, texto):
+    if not operador:
+        return
+    texto.append(
+        f"{'  ' * nivel}{operador.get('operatorType')} filas={operador.get('rows', '-')} "
+        f"dbHits={operador.get('dbHits', '-')}"
+    )
+    for hijo in operador.get('children', []):
+        _lineas_operador(hijo, nivel + 1, texto)
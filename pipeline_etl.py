@@ -0,0 +1,493 @@
+"""
+Motor declarativo de ETL
+
+Cada modelo de lectura se describe con una EspecificacionETL (fuente en
+PostgreSQL, columnas, mapeo, destino, clave y modo de escritura). El motor
+resuelve una sola vez para todos los modelos la extracción por lotes, la
+transformación (opcionalmente en paralelo), la carga concurrente, las métricas
+y el manejo de errores.
+"""
+
+import logging
+import os
+import time
+from collections import deque
+
+from cache_l1 import cache
+from db_manager import db_manager
+from extraccion_copy import describir, extraer_copy
+from lock_distribuido import clave_lock, ejecutar_deduplicado
+from perfilado import explicar_postgresql, perfilador
+from transformaciones import particionar, transformar_en_paralelo
+
+logger = logging.getLogger(__name__)
+
+# Destinos soportados
+DESTINO_CASSANDRA = 'cassandra'
+DESTINO_MONGODB = 'mongodb'
+DESTINO_NEO4J = 'neo4j'
+
+# Modos de escritura
+MODO_REEMPLAZAR = 'reemplazar'  # Borrar la partición (clave) y volver a insertar
+MODO_UPSERT = 'upsert'          # Insertar o reemplazar por clave
+
+# Modos de extracción
+EXTRACCION_CURSOR = 'cursor'  # Cursor del lado del servidor con fetchmany
+EXTRACCION_COPY = 'copy'      # COPY (consulta) TO STDOUT, para reconstrucciones grandes
+
+NOMBRES_DESTINO = {
+    DESTINO_CASSANDRA: 'Cassandra',
+    DESTINO_MONGODB: 'MongoDB',
+    DESTINO_NEO4J: 'Neo4j',
+}
+
+
+class EspecificacionETL:
+    """Descripción declarativa de un modelo de lectura"""
+
+    def __init__(self, nombre, descripcion, parametros, columnas, destino, tabla, clave, modo,
+                 fuente=None, consulta=None, mapeo=None, transformacion=None, particion=None,
+                 cypher=None, posterior=None):
+        """
+        Args:
+            nombre (str): Nombre del modelo de lectura (ej: 'tabla_posiciones')
+            descripcion (str): Texto para los mensajes de progreso
+            parametros (tuple): Nombres de los parámetros del ETL, en el orden de la fuente
+            columnas (tuple): Nombres de las columnas que devuelve la fuente, en orden.
+                Si la fuente devuelve columnas extra al inicio, se toman las últimas.
+            destino (str): DESTINO_CASSANDRA, DESTINO_MONGODB o DESTINO_NEO4J
+            tabla (str): Tabla o colección destino
+            clave (tuple): Campos destino que identifican la partición (reemplazar)
+                o el documento (upsert)
+            modo (str): MODO_REEMPLAZAR o MODO_UPSERT
+            fuente (str): Función de PostgreSQL (SELECT * FROM fuente(params))
+            consulta (str): SQL completo con %s, alternativa a fuente
+            mapeo (list): [(campo_destino, columna_o_parametro)] (None = columnas tal cual)
+            transformacion (callable): (clave, rows) -> documentos, a nivel de módulo
+            particion (tuple): Campos (columnas o parámetros) que particionan la transformación
+            cypher (str): Sentencia con UNWIND $filas para destino Neo4j
+            posterior (callable): Hook (filas_cargadas, lista_parametros) tras la carga
+        """
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.parametros = tuple(parametros)
+        self.columnas = tuple(columnas)
+        self.destino = destino
+        self.tabla = tabla
+        self.clave = tuple(clave)
+        self.modo = modo
+        self.fuente = fuente
+        self.consulta = consulta
+        self.mapeo = list(mapeo) if mapeo else [(c, c) for c in self.columnas]
+        self.transformacion = transformacion
+        self.particion = tuple(particion) if particion else None
+        self.cypher = cypher
+        self.posterior = posterior
+
+    def sql(self):
+        """SQL de extracción"""
+        if self.consulta:
+            return self.consulta
+        marcadores = ', '.join(['%s'] * len(self.parametros))
+        return f"SELECT * FROM {self.fuente}({marcadores})"
+
+    def campos_destino(self):
+        return [campo for campo, _ in self.mapeo]
+
+
+class MotorETL:
+    """Ejecuta especificaciones ETL con lotes, concurrencia y métricas"""
+
+    def __init__(self, tamanio_lote=None, concurrencia=None, historial=100, deduplicar=None,
+                 extraccion=None):
+        self.tamanio_lote = tamanio_lote or int(os.getenv('ETL_TAMANIO_LOTE', 500))
+        self.concurrencia = concurrencia or int(os.getenv('ETL_CONCURRENCIA', 32))
+        self.extraccion = extraccion or os.getenv('ETL_EXTRACCION', EXTRACCION_CURSOR)
+        # Lease en Redis por modelo y parámetros para no repetir corridas concurrentes
+        if deduplicar is None:
+            deduplicar = os.getenv('FIFA_ETL_LOCK', 'true').lower() == 'true'
+        self.deduplicar = deduplicar
+        # Métricas de las últimas ejecuciones
+        self.historial = deque(maxlen=historial)
+        self._statements = {}
+        # cursor.description por modelo para convertir los tipos del COPY
+        self._descripciones = {}
+
+    # ==================================================================
+    # API
+    # ==================================================================
+
+    def ejecutar(self, spec, workers=None, **parametros):
+        """
+        Ejecutar el ETL de un modelo para un conjunto de parámetros
+
+        Returns:
+            bool: True si fue exitoso, False si no hubo datos o hubo error
+        """
+        logger.info("🔄 Iniciando ETL para %s - %s...", spec.descripcion, self._describir(parametros))
+        return self.ejecutar_lote(spec, [parametros], workers, anunciar=False)
+
+    def ejecutar_lote(self, spec, lista_parametros, workers=None, anunciar=True):
+        """
+        Ejecutar el ETL de un modelo para varios conjuntos de parámetros a la vez
+
+        Args:
+            spec (EspecificacionETL): Modelo a cargar
+            lista_parametros (list): Lista de dicts con los parámetros de cada extracción
+            workers (int): Procesos para la transformación (None = ETL_WORKERS)
+
+        Returns:
+            bool: True si fue exitoso, False si no hubo datos o hubo error
+        """
+        if anunciar:
+            logger.info("🔄 Iniciando ETL para %s - %s extracciones...", spec.descripcion, len(lista_parametros))
+
+        if not self.deduplicar:
+            return self._ejecutar_lote(spec, lista_parametros, workers)
+
+        try:
+            r = db_manager.get_redis_client()
+        except Exception as e:
+            logger.warning("⚠️  Redis no disponible para el lock de ETL (%s), ejecutando sin deduplicar", e)
+            return self._ejecutar_lote(spec, lista_parametros, workers)
+
+        corrida = {}
+
+        def correr():
+            corrida['exito'] = self._ejecutar_lote(spec, lista_parametros, workers)
+            return {
+                'exito': corrida['exito'],
+                'filas_cargadas': self.ultima_ejecucion(spec.nombre)['filas_cargadas']
+            }
+
+        try:
+            resultado, propio = ejecutar_deduplicado(r, clave_lock(spec.nombre, lista_parametros), correr)
+        except Exception as e:
+            if 'exito' in corrida:
+                # La carga ya se hizo; solo falló publicar el resultado
+                return corrida['exito']
+            logger.warning("⚠️  Lock de ETL no disponible (%s), ejecutando sin deduplicar", e)
+            return self._ejecutar_lote(spec, lista_parametros, workers)
+
+        if not propio:
+            logger.info("🔁 Otra corrida de %s con los mismos parámetros terminó; se reutiliza su resultado", spec.nombre)
+            self.historial.append({
+                'modelo': spec.nombre,
+                'parametros': lista_parametros,
+                'filas_cargadas': resultado['filas_cargadas'],
+                'deduplicado': True,
+                'error': None
+            })
+            if resultado['exito']:
+                cache.invalidar(spec.nombre)
+        return resultado['exito']
+
+    def _ejecutar_lote(self, spec, lista_parametros, workers):
+        """Extraer, transformar y cargar sin coordinación con otros clientes"""
+        metricas = {
+            'modelo': spec.nombre,
+            'parametros': lista_parametros,
+            'filas_extraidas': 0,
+            'filas_cargadas': 0,
+            'lotes': 0,
+            'segundos_extraccion': 0.0,
+            'origen_extraccion': None,
+            'modo_extraccion': None,
+            'segundos_transformacion': 0.0,
+            'segundos_carga': 0.0,
+            'error': None
+        }
+        inicio = time.perf_counter()
+        try:
+            if spec.transformacion:
+                exito = self._ejecutar_con_transformacion(spec, lista_parametros, workers, metricas)
+            else:
+                exito = self._ejecutar_en_streaming(spec, lista_parametros, metricas)
+        except Exception as e:
+            metricas['error'] = str(e)
+            logger.error("❌ Error en ETL: %s", e)
+            exito = False
+        finally:
+            metricas['segundos'] = time.perf_counter() - inicio
+            self.historial.append(metricas)
+
+        if exito:
+            # Las lecturas cacheadas del modelo quedaron viejas
+            cache.invalidar(spec.nombre)
+            self._reportar(spec, metricas)
+        return exito
+
+    def ultima_ejecucion(self, nombre=None):
+        """Métricas de la última ejecución (opcionalmente de un modelo)"""
+        for metricas in reversed(self.historial):
+            if nombre is None or metricas['modelo'] == nombre:
+                return metricas
+        return None
+
+    # ==================================================================
+    # EXTRACCIÓN
+    # ==================================================================
+
+    def _extraer(self, spec, parametros, metricas):
+        """Generador de lotes de filas (tuplas) extraídas en streaming de PostgreSQL"""
+        valores = tuple(parametros[p] for p in spec.parametros)
+        copy = self.extraccion == EXTRACCION_COPY
+        cursor, origen = db_manager.get_postgresql_cursor_extraccion(
+            nombre=None if copy else f"etl_{spec.nombre}"
+        )
+        metricas['origen_extraccion'] = origen
+        metricas['modo_extraccion'] = self.extraccion
+        lotes = None
+        try:
+            if perfilador.activo:
+                with perfilador.operacion(f"etl_{spec.nombre}"):
+                    explicar_postgresql(cursor.connection, spec.sql(), valores)
+            inicio = time.perf_counter()
+            if copy:
+                lotes = self._lotes_copy(spec, cursor, valores)
+            else:
+                cursor.itersize = self.tamanio_lote
+                cursor.execute(spec.sql(), valores)
+                lotes = iter(lambda: cursor.fetchmany(self.tamanio_lote), [])
+            for rows in lotes:
+                metricas['segundos_extraccion'] += time.perf_counter() - inicio
+                metricas['filas_extraidas'] += len(rows)
+                yield rows
+                inicio = time.perf_counter()
+            metricas['segundos_extraccion'] += time.perf_counter() - inicio
+        finally:
+            if hasattr(lotes, 'close'):
+                lotes.close()  # corta el COPY si la extracción se abandona a mitad de camino
+            cursor.close()
+            db_manager.terminar_extraccion(cursor)
+
+    def _lotes_copy(self, spec, cursor, valores):
+        """Lotes de la extracción con COPY TO STDOUT (la descripción se obtiene una vez)"""
+        descripcion = self._descripciones.get(spec.nombre)
+        if descripcion is None:
+            descripcion = self._descripciones[spec.nombre] = describir(cursor, spec.sql(), valores)
+        return extraer_copy(cursor, spec.sql(), valores, descripcion, self.tamanio_lote)
+
+    def _como_dict(self, spec, row, parametros):
+        """Nombrar las columnas de una fila y resolver el mapeo al destino"""
+        origen = dict(parametros)
+        origen.update(zip(spec.columnas, row[-len(spec.columnas):]))
+        return {campo: origen[fuente] for campo, fuente in spec.mapeo}
+
+    # ==================================================================
+    # FLUJOS
+    # ==================================================================
+
+    def _ejecutar_en_streaming(self, spec, lista_parametros, metricas):
+        """Extraer y cargar lote a lote, sin materializar la extracción completa"""
+        cargador = self._cargador(spec)
+        reemplazadas = set()
+        cargadas = [] if spec.posterior else None
+
+        logger.info("📥 Extrayendo datos desde PostgreSQL...")
+        for parametros in lista_parametros:
+            for rows in self._extraer(spec, parametros, metricas):
+                filas = [self._como_dict(spec, row, parametros) for row in rows]
+
+                inicio = time.perf_counter()
+                if spec.modo == MODO_REEMPLAZAR:
+                    self._reemplazar_particiones(spec, cargador, filas, reemplazadas)
+                cargador.cargar(filas)
+                metricas['segundos_carga'] += time.perf_counter() - inicio
+                metricas['filas_cargadas'] += len(filas)
+                metricas['lotes'] += 1
+                if cargadas is not None:
+                    cargadas.extend(filas)
+
+        if not metricas['filas_extraidas']:
+            logger.warning("⚠️  No se encontraron datos para %s", spec.descripcion)
+            return False
+
+        logger.info("✅ Extraídos %s registros desde PostgreSQL", metricas['filas_extraidas'])
+        logger.info("✅ Cargados %s registros en %s", metricas['filas_cargadas'], NOMBRES_DESTINO[spec.destino])
+        if spec.posterior:
+            spec.posterior(cargadas, lista_parametros)
+        return True
+
+    def _ejecutar_con_transformacion(self, spec, lista_parametros, workers, metricas):
+        """Extraer todo, transformar por particiones (en paralelo) y cargar los documentos"""
+        logger.info("📥 Extrayendo datos desde PostgreSQL...")
+        particiones = {}
+        for parametros in lista_parametros:
+            for rows in self._extraer(spec, parametros, metricas):
+                clave_de = self._clave_particion(spec, parametros)
+                for clave, grupo in particionar(rows, clave_de).items():
+                    particiones.setdefault(clave, []).extend(grupo)
+
+        if not particiones:
+            logger.warning("⚠️  No se encontraron datos para %s", spec.descripcion)
+            return False
+
+        logger.info("✅ Extraídos %s registros desde PostgreSQL", metricas['filas_extraidas'])
+
+        logger.info("🔄 Transformando datos...")
+        documentos, transformacion = transformar_en_paralelo(particiones, spec.transformacion, workers)
+        metricas['segundos_transformacion'] = transformacion['segundos']
+        metricas['transformacion'] = transformacion
+
+        logger.info("📤 Cargando datos en %s...", NOMBRES_DESTINO[spec.destino])
+        cargador = self._cargador(spec)
+        inicio = time.perf_counter()
+        if spec.modo == MODO_REEMPLAZAR:
+            self._reemplazar_particiones(spec, cargador, documentos, set())
+        for i in range(0, len(documentos), self.tamanio_lote):
+            cargador.cargar(documentos[i:i + self.tamanio_lote])
+            metricas['lotes'] += 1
+        metricas['segundos_carga'] = time.perf_counter() - inicio
+        metricas['filas_cargadas'] = len(documentos)
+
+        logger.info("✅ Cargados %s documentos en %s", len(documentos), NOMBRES_DESTINO[spec.destino])
+        if spec.posterior:
+            spec.posterior(documentos, lista_parametros)
+        return True
+
+    def _clave_particion(self, spec, parametros):
+        """Función fila -> clave de partición a partir de columnas o parámetros"""
+        indices = {c: i - len(spec.columnas) for i, c in enumerate(spec.columnas)}
+
+        def clave(row):
+            return tuple(
+                row[indices[campo]] if campo in indices else parametros[campo]
+                for campo in spec.particion
+            )
+        return clave
+
+    def _reemplazar_particiones(self, spec, cargador, filas, reemplazadas):
+        """Borrar cada partición destino la primera vez que aparece en la carga"""
+        for fila in filas:
+            valores = tuple(fila[c] for c in spec.clave)
+            if valores not in reemplazadas:
+                reemplazadas.add(valores)
+                cargador.borrar(valores)
+
+    # ==================================================================
+    # CARGA
+    # ==================================================================
+
+    def _cargador(self, spec):
+        if spec.destino == DESTINO_CASSANDRA:
+            return _CargadorCassandra(spec, self.concurrencia)
+        if spec.destino == DESTINO_MONGODB:
+            return _CargadorMongo(spec)
+        if spec.destino == DESTINO_NEO4J:
+            return _CargadorNeo4j(spec)
+        raise ValueError(f"Destino desconocido: {spec.destino}")
+
+    def _describir(self, parametros):
+        return ' - '.join(str(v) for v in parametros.values())
+
+    def _reportar(self, spec, metricas):
+        # Las métricas viajan como campo estructurado del registro (FIFA_LOG_FORMATO=json)
+        logger.info(
+            "📈 %s: %s filas en %s lotes, %.3fs (extracción %.3fs desde %s con %s, "
+            "transformación %.3fs, carga %.3fs)",
+            spec.nombre, metricas['filas_cargadas'], metricas['lotes'], metricas['segundos'],
+            metricas['segundos_extraccion'], metricas['origen_extraccion'] or 'primario',
+            metricas['modo_extraccion'] or EXTRACCION_CURSOR, metricas['segundos_transformacion'],
+            metricas['segundos_carga'],
+            extra={'metricas': dict(metricas)}
+        )
+        transformacion = metricas.get('transformacion')
+        if transformacion and transformacion['workers'] > 1:
+            if 'speedup' in transformacion:
+                logger.info(
+                    "⚡ Transformadas %s particiones con %s workers en %.3fs (secuencial medido %.3fs, speedup %.2fx)",
+                    transformacion['particiones'], transformacion['workers'], transformacion['segundos'],
+                    transformacion['segundos_secuencial'], transformacion['speedup']
+                )
+            else:
+                logger.info(
+                    "⚡ Transformadas %s particiones con %s workers en %.3fs "
+                    "(suma de los workers %.3fs, speedup estimado %.2fx)",
+                    transformacion['particiones'], transformacion['workers'], transformacion['segundos'],
+                    transformacion['segundos_workers'], transformacion['speedup_estimado']
+                )
+        logger.info("✨ ETL completado exitosamente")
+
+
+class _CargadorCassandra:
+    """Carga concurrente con statements preparados (un prepare por ejecución)"""
+
+    def __init__(self, spec, concurrencia):
+        self.spec = spec
+        self.concurrencia = concurrencia
+        self.session = db_manager.get_cassandra_session()
+        self.perfil = db_manager.cassandra_perfil_escritura
+        campos = spec.campos_destino()
+        self.insert = self.session.prepare(
+            f"INSERT INTO {spec.tabla} ({', '.join(campos)}) "
+            f"VALUES ({', '.join(['?'] * len(campos))})"
+        )
+        self.delete = None
+        if spec.modo == MODO_REEMPLAZAR:
+            condicion = ' AND '.join(f"{c} = ?" for c in spec.clave)
+            self.delete = self.session.prepare(f"DELETE FROM {spec.tabla} WHERE {condicion}")
+
+    def borrar(self, valores):
+        self.session.execute(self.delete, valores, execution_profile=self.perfil)
+
+    def cargar(self, filas):
+        from cassandra.concurrent import execute_concurrent_with_args
+
+        campos = self.spec.campos_destino()
+        execute_concurrent_with_args(
+            self.session,
+            self.insert,
+            [tuple(fila[c] for c in campos) for fila in filas],
+            concurrency=self.concurrencia,
+            raise_on_first_error=True,
+            execution_profile=self.perfil
+        )
+
+
+class _CargadorMongo:
+    """Carga por lotes con insert_many (reemplazar) o bulk_write de ReplaceOne (upsert)"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.collection = db_manager.get_mongodb_db()[spec.tabla]
+
+    def borrar(self, valores):
+        self.collection.delete_many(dict(zip(self.spec.clave, valores)))
+
+    def cargar(self, documentos):
+        if not documentos:
+            return
+        if self.spec.modo == MODO_UPSERT:
+            from pymongo import ReplaceOne
+
+            self.collection.bulk_write([
+                ReplaceOne({c: doc[c] for c in self.spec.clave}, doc, upsert=True)
+                for doc in documentos
+            ], ordered=False)
+        else:
+            self.collection.insert_many(documentos, ordered=False)
+
+
+class _CargadorNeo4j:
+    """Carga por lotes con UNWIND $filas en una transacción por lote"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.driver = db_manager.get_neo4j_driver()
+
+    def borrar(self, valores):
+        condicion = ' AND '.join(f"s.{c} = ${c}" for c in self.spec.clave)
+        with self.driver.session() as session:
+            session.run(
+                f"MATCH (s:{self.spec.tabla}) WHERE {condicion} DETACH DELETE s",
+                **dict(zip(self.spec.clave, valores))
+            )
+
+    def cargar(self, filas):
+        with self.driver.session() as session:
+            session.execute_write(lambda tx: tx.run(self.spec.cypher, filas=filas).consume())
+
+
+# Instancia global
+motor_etl = MotorETL()
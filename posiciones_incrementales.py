@@ -0,0 +1,220 @@
+"""
+Motor incremental de tablas de posiciones
+
+En lugar de recalcular el grupo completo con get_tabla_posiciones_grupo, cada
+resultado de partido se aplica como un delta (puntos, GF, GC, DG) sobre la
+tabla en memoria, se reordena con los criterios de desempate y se escriben en
+Cassandra solo las posiciones que cambiaron.
+
+Antes de cada delta la tabla del grupo se relee de Cassandra (una lectura de
+una sola partición, sin la cache L1): si un ETL completo la recargó desde este
+u otro proceso, el delta se aplica sobre los totales nuevos en lugar de pisarlos
+con los que el motor tenía en memoria. Para poder
+corregir un resultado (un gol en un partido en juego) el motor recuerda el
+último marcador aplicado de cada partido y revierte su aporte antes de aplicar
+el nuevo.
+"""
+
+import logging
+import time
+
+from cache_l1 import cache
+from db_manager import db_manager
+
+logger = logging.getLogger(__name__)
+
+PUNTOS_VICTORIA = 3
+PUNTOS_EMPATE = 1
+
+
+def _aporte(goles_propios, goles_rival):
+    """Estadísticas que suma un partido a una selección"""
+    if goles_propios > goles_rival:
+        puntos = PUNTOS_VICTORIA
+    elif goles_propios == goles_rival:
+        puntos = PUNTOS_EMPATE
+    else:
+        puntos = 0
+    return {'puntos': puntos, 'gf': goles_propios, 'gc': goles_rival}
+
+
+def ordenar(estadisticas):
+    """
+    Ordenar un grupo con los criterios de desempate
+
+    Puntos, diferencia de gol y goles a favor (descendente); el nombre del país
+    deja el orden determinístico ante un empate total.
+
+    Args:
+        estadisticas (dict): pais -> {'puntos', 'gf', 'gc'}
+
+    Returns:
+        list: Filas (posicion, pais, puntos, gf, gc, dg) ordenadas
+    """
+    orden = sorted(
+        estadisticas.items(),
+        key=lambda item: (-item[1]['puntos'], -(item[1]['gf'] - item[1]['gc']), -item[1]['gf'], item[0])
+    )
+    return [
+        (posicion, pais, e['puntos'], e['gf'], e['gc'], e['gf'] - e['gc'])
+        for posicion, (pais, e) in enumerate(orden, start=1)
+    ]
+
+
+def posiciones_cambiadas(previas, nuevas):
+    """
+    Filas nuevas que difieren de la que ocupa su posición en Cassandra
+
+    Args:
+        previas (list): Filas (posicion, pais, ...) tal como están en Cassandra
+        nuevas (list): Filas recalculadas con ordenar
+
+    Returns:
+        list: Filas a reescribir
+    """
+    por_posicion = {fila[0]: fila for fila in previas}
+    return [fila for fila in nuevas if por_posicion.get(fila[0]) != fila]
+
+
+class MotorPosiciones:
+    """Tablas de posiciones en memoria actualizadas por deltas de resultados"""
+
+    def __init__(self):
+        # (edicion, grupo) -> {pais: {'puntos', 'gf', 'gc'}}
+        self.tablas = {}
+        # (edicion, grupo) -> filas escritas en Cassandra
+        self.filas = {}
+        # (edicion, id_partido) -> (local, visitante, goles_local, goles_visitante)
+        self.resultados = {}
+        self._insert = None
+        self._select = None
+        self._sesion = None
+
+    def cargar_grupo(self, edicion, grupo):
+        """
+        Cargar la tabla de un grupo desde Cassandra (sin pasar por la cache L1)
+
+        Returns:
+            bool: True si el grupo quedó cargado, False si no hay tabla previa
+        """
+        session = self._preparar()
+        rows = list(session.execute(
+            self._select, (edicion, grupo), execution_profile=db_manager.cassandra_perfil_lectura
+        ))
+        if not rows:
+            self.invalidar(edicion, grupo)
+            return False
+        clave = (edicion, grupo)
+        self.tablas[clave] = {
+            row[1]: {'puntos': row[2], 'gf': row[3], 'gc': row[4]} for row in rows
+        }
+        # Las filas tal como están en Cassandra: PostgreSQL puede desempatar
+        # distinto que ordenar, y el diff tiene que ser contra lo escrito
+        self.filas[clave] = [tuple(row) for row in rows]
+        return True
+
+    def invalidar(self, edicion, grupo):
+        """Olvidar la tabla de un grupo (tras un recálculo completo desde PostgreSQL)"""
+        self.tablas.pop((edicion, grupo), None)
+        self.filas.pop((edicion, grupo), None)
+
+    def aplicar_resultado(self, edicion, grupo, id_partido, local, visitante,
+                          goles_local, goles_visitante, anterior=None):
+        """
+        Aplicar el marcador (nuevo o corregido) de un partido del grupo
+
+        Args:
+            edicion (str): Nombre de la edición del mundial
+            grupo (str): Letra del grupo
+            id_partido (int): Partido cuyo marcador cambió
+            local (str): Selección local
+            visitante (str): Selección visitante
+            goles_local (int): Goles actuales del local
+            goles_visitante (int): Goles actuales del visitante
+            anterior (tuple): (goles_local, goles_visitante) ya contabilizados en la
+                tabla, si el motor no los conoce (None = el último aplicado, o ninguno)
+
+        Returns:
+            int: Posiciones reescritas en Cassandra, o None si el grupo no está cargado
+        """
+        inicio = time.perf_counter()
+        clave = (edicion, grupo)
+        # Releer siempre: un ETL completo (de este u otro proceso) pudo reemplazar el grupo
+        if not self.cargar_grupo(edicion, grupo):
+            return None
+
+        tabla = self.tablas[clave]
+        for pais in (local, visitante):
+            if pais not in tabla:
+                tabla[pais] = {'puntos': 0, 'gf': 0, 'gc': 0}
+
+        # Revertir el aporte del marcador anterior del mismo partido
+        if anterior is None and (edicion, id_partido) in self.resultados:
+            anterior = self.resultados[(edicion, id_partido)][2:]
+        if anterior is not None:
+            self._sumar(tabla, local, visitante, anterior[0], anterior[1], -1)
+
+        self._sumar(tabla, local, visitante, goles_local, goles_visitante, 1)
+        self.resultados[(edicion, id_partido)] = (local, visitante, goles_local, goles_visitante)
+
+        nuevas = ordenar(tabla)
+        cambiadas = posiciones_cambiadas(self.filas.get(clave, []), nuevas)
+        try:
+            self._escribir(edicion, grupo, cambiadas)
+        except Exception:
+            # Cassandra pudo quedar a medio escribir: recargar el grupo la próxima vez
+            self.invalidar(edicion, grupo)
+            raise
+        self.filas[clave] = nuevas
+        if cambiadas:
+            cache.invalidar('tabla_posiciones')
+
+        logger.info(
+            "Tabla %s - Grupo %s actualizada: %d posiciones en %.1f ms",
+            edicion, grupo, len(cambiadas), (time.perf_counter() - inicio) * 1000
+        )
+        return len(cambiadas)
+
+    def tabla(self, edicion, grupo):
+        """Filas actuales del grupo en memoria (posicion, pais, puntos, gf, gc, dg)"""
+        return list(self.filas.get((edicion, grupo), []))
+
+    @staticmethod
+    def _sumar(tabla, local, visitante, goles_local, goles_visitante, signo):
+        for pais, propios, rival in ((local, goles_local, goles_visitante),
+                                     (visitante, goles_visitante, goles_local)):
+            for campo, valor in _aporte(propios, rival).items():
+                tabla[pais][campo] += signo * valor
+
+    def _preparar(self):
+        """Sesión de Cassandra con los statements del motor preparados (una vez por sesión)"""
+        session = db_manager.get_cassandra_session()
+        if self._sesion is not session:
+            self._select = session.prepare("""
+                SELECT posicion, pais, puntos, gf, gc, dg
+                FROM tabla_posiciones
+                WHERE edicion = ? AND grupo = ?
+            """)
+            self._select.is_idempotent = True  # habilita la ejecución especulativa
+            self._insert = session.prepare("""
+                INSERT INTO tabla_posiciones
+                (edicion, grupo, posicion, pais, puntos, gf, gc, dg)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """)
+            self._sesion = session
+        return session
+
+    def _escribir(self, edicion, grupo, filas):
+        """Reescribir en Cassandra solo las posiciones que cambiaron"""
+        if not filas:
+            return
+        session = self._preparar()
+        futuros = [
+            session.execute_async(
+                self._insert, (edicion, grupo) + fila,
+                execution_profile=db_manager.cassandra_perfil_escritura
+            )
+            for fila in filas
+        ]
+        for futuro in futuros:
+            futuro.result()
@@ -0,0 +1,60 @@
+"""
+Pruebas del motor de posiciones incrementales (sin bases de datos)
+"""
+
+from cache_l1 import cache
+from posiciones_incrementales import MotorPosiciones, ordenar, posiciones_cambiadas
+
+
+class _SesionFalsa:
+    """Sesión de Cassandra que devuelve siempre las mismas filas del grupo"""
+
+    def __init__(self, filas):
+        self.filas = filas
+
+    def execute(self, statement, params, **kwargs):
+        return list(self.filas)
+
+
+def test_ordenar_desempata_por_dg_gf_y_nombre():
+    estadisticas = {
+        'Chile': {'puntos': 4, 'gf': 3, 'gc': 3},
+        'Brasil': {'puntos': 4, 'gf': 5, 'gc': 2},
+        'Argentina': {'puntos': 4, 'gf': 4, 'gc': 1},
+        'Uruguay': {'puntos': 4, 'gf': 3, 'gc': 3},
+    }
+    assert [fila[1] for fila in ordenar(estadisticas)] == ['Brasil', 'Argentina', 'Chile', 'Uruguay']
+    assert ordenar(estadisticas)[0] == (1, 'Brasil', 4, 5, 2, 3)
+
+
+def test_posiciones_cambiadas_en_empate_total():
+    # PostgreSQL dejó a Uruguay primero; ordenar desempata por nombre
+    previas = [(1, 'Uruguay', 3, 2, 1, 1), (2, 'Argentina', 3, 2, 1, 1)]
+    nuevas = [(1, 'Argentina', 3, 2, 1, 1), (2, 'Uruguay', 3, 2, 1, 1)]
+    assert posiciones_cambiadas(previas, nuevas) == nuevas
+    assert posiciones_cambiadas(nuevas, nuevas) == []
+
+
+def test_delta_deja_en_cassandra_el_orden_de_ordenar(monkeypatch):
+    # Empate total de tres selecciones, desempatado en PostgreSQL en otro orden
+    en_cassandra = [
+        (1, 'Uruguay', 3, 1, 1, 0),
+        (2, 'Brasil', 3, 1, 1, 0),
+        (3, 'Argentina', 3, 1, 1, 0),
+        (4, 'Chile', 0, 0, 0, 0),
+    ]
+    motor = MotorPosiciones()
+    escritas = []
+    monkeypatch.setattr(motor, '_preparar', lambda: _SesionFalsa(en_cassandra))
+    monkeypatch.setattr(motor, '_escribir', lambda edicion, grupo, filas: escritas.extend(filas))
+    monkeypatch.setattr(cache, 'invalidar', lambda modelo: None)
+
+    # Un partido que no toca a las empatadas
+    motor.aplicar_resultado('Mundial 2030', 'A', 99, 'Chile', 'Paraguay', 0, 0)
+
+    resultado = {fila[0]: fila for fila in en_cassandra}
+    resultado.update((fila[0], fila) for fila in escritas)
+    esperado = ordenar(motor.tablas[('Mundial 2030', 'A')])
+    assert [resultado[posicion] for posicion in sorted(resultado)] == esperado
+    # Cada selección aparece una sola vez
+    assert len({fila[1] for fila in resultado.values()}) == len(resultado)
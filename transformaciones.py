@@ -0,0 +1,198 @@
+"""
+Módulo con las transformaciones puras del ETL y su ejecución en paralelo
+
+Las funciones de transformación no tocan ninguna base de datos: reciben filas
+ya extraídas de PostgreSQL y devuelven documentos listos para cargar. Por eso
+pueden ejecutarse en otros procesos mediante un pool.
+"""
+
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+
+def obtener_cantidad_workers(workers=None):
+    """
+    Resolver la cantidad de procesos a usar en la etapa de transformación
+
+    Args:
+        workers (int): Cantidad pedida explícitamente (None = usar ETL_WORKERS)
+
+    Returns:
+        int: Cantidad de workers (1 = transformación secuencial)
+    """
+    if workers is None:
+        workers = int(os.getenv('ETL_WORKERS', 1))
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def transformar_partido_arbitros(clave, rows):
+    """
+    Agrupar las filas de un partido en un documento con su array de árbitros
+
+    Args:
+        clave (tuple): (edicion, id_partido) de la partición
+        rows (list): Filas (edicion, fase, id_partido, local, visitante, arbitro, rol)
+
+    Returns:
+        list: Lista con un documento por partido
+    """
+    edicion = clave[0]
+    partidos = defaultdict(lambda: {
+        'edicion': edicion,
+        'fase': None,
+        'idPartido': None,
+        'local': None,
+        'visitante': None,
+        'arbitros': []
+    })
+
+    for row in rows:
+        id_partido = row[2]
+
+        # Si es la primera vez que vemos este partido, llenar datos básicos
+        if partidos[id_partido]['idPartido'] is None:
+            partidos[id_partido]['fase'] = row[1]
+            partidos[id_partido]['idPartido'] = id_partido
+            partidos[id_partido]['local'] = row[3]
+            partidos[id_partido]['visitante'] = row[4]
+
+        # Agregar árbitro
+        partidos[id_partido]['arbitros'].append({
+            'nombre': row[5],
+            'rol': row[6]
+        })
+
+    return list(partidos.values())
+
+
+def transformar_jugadores_pais(clave, rows):
+    """
+    Crear el documento de un país con el array de sus jugadores goleadores
+
+    Args:
+        clave (tuple): (edicion, pais) de la partición
+        rows (list): Filas (id_jugador, nombre, apellido, pais, goles_totales)
+
+    Returns:
+        list: Lista con un único documento para la edición y el país
+    """
+    edicion, pais = clave
+
+    jugadores = []
+    for row in rows:
+        jugadores.append({
+            'id_jugador': row[0],
+            'nombre': row[1],
+            'apellido': row[2],
+            'goles_totales': row[4]
+        })
+
+    return [{
+        'edicion': edicion,
+        'pais': pais,
+        'jugadores': jugadores,
+        'actualizado_en': datetime.utcnow()
+    }]
+
+
+def particionar(rows, clave_particion):
+    """
+    Agrupar filas por clave de partición manteniendo el orden de aparición
+
+    Args:
+        rows (iterable): Filas extraídas
+        clave_particion (callable): Función fila -> clave (ej: edición o partido)
+
+    Returns:
+        dict: clave -> lista de filas
+    """
+    particiones = {}
+    for row in rows:
+        particiones.setdefault(clave_particion(row), []).append(row)
+    return particiones
+
+
+def _transformar_lote(funcion, lote):
+    """Ejecutar la transformación de un lote de particiones dentro de un worker"""
+    inicio = time.perf_counter()
+    resultados = [(indice, funcion(clave, rows)) for indice, clave, rows in lote]
+    return resultados, time.perf_counter() - inicio
+
+
+def medir_secuencial_habilitado(medir=None):
+    """
+    Resolver si se mide la línea de base secuencial de la transformación
+
+    Args:
+        medir (bool): Valor pedido explícitamente (None = usar ETL_MEDIR_SECUENCIAL)
+
+    Returns:
+        bool: True si hay que repetir la transformación en un solo proceso
+    """
+    if medir is None:
+        medir = os.getenv('ETL_MEDIR_SECUENCIAL', 'false').strip().lower() in ('true', '1', 'si', 'yes')
+    return medir
+
+
+def transformar_en_paralelo(particiones, funcion, workers=None, medir_secuencial=None):
+    """
+    Transformar particiones en un pool de procesos y unir los resultados
+
+    Las particiones se reparten en lotes (varios por worker) para amortizar el
+    costo de serializar datos entre procesos. Los resultados se devuelven en el
+    mismo orden que las particiones de entrada.
+
+    Args:
+        particiones (dict): clave -> lista de filas (ver particionar)
+        funcion (callable): Transformación (clave, rows) -> list, a nivel de módulo
+        workers (int): Cantidad de procesos (None = ETL_WORKERS)
+        medir_secuencial (bool): Repetir la transformación en este proceso para
+            medir el speedup real (None = ETL_MEDIR_SECUENCIAL)
+
+    Returns:
+        tuple: (resultados, metricas) donde metricas incluye el tiempo total,
+        la suma de los tiempos de los workers y el speedup estimado a partir de
+        ella; con medir_secuencial, también el tiempo secuencial y el speedup medidos
+    """
+    workers = obtener_cantidad_workers(workers)
+    items = [(i, clave, rows) for i, (clave, rows) in enumerate(particiones.items())]
+    inicio = time.perf_counter()
+
+    if workers <= 1 or len(items) <= 1:
+        workers = 1
+        parciales = [_transformar_lote(funcion, items)]
+    else:
+        cantidad_lotes = min(len(items), workers * 4)
+        lotes = [items[i::cantidad_lotes] for i in range(cantidad_lotes)]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parciales = list(pool.map(_transformar_lote, [funcion] * len(lotes), lotes))
+
+    # Unir respetando el orden original de las particiones
+    por_indice = sorted(
+        (item for resultados, _ in parciales for item in resultados),
+        key=lambda item: item[0]
+    )
+    resultados = [doc for _, docs in por_indice for doc in docs]
+
+    total = time.perf_counter() - inicio
+    # Estimación: ignora lo que cuesta serializar y arrancar el pool, y los
+    # workers compiten por caché y memoria, así que no equivale a correr solo
+    segundos_workers = sum(segundos for _, segundos in parciales)
+    metricas = {
+        'particiones': len(items),
+        'workers': workers,
+        'segundos': total,
+        'segundos_workers': segundos_workers,
+        'speedup_estimado': (segundos_workers / total) if total > 0 else 1.0
+    }
+    if workers > 1 and medir_secuencial_habilitado(medir_secuencial):
+        _, secuencial = _transformar_lote(funcion, items)
+        metricas['segundos_secuencial'] = secuencial
+        metricas['speedup'] = (secuencial / total) if total > 0 else 1.0
+    return resultados, metricas
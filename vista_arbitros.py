@@ -0,0 +1,77 @@
+"""
+Módulo de la vista de partidos por árbitro en MongoDB
+
+`arbitros_fases_finales` guarda un documento por partido con el array de sus
+árbitros, así que "qué partidos dirigió X y en qué rol" obliga a recorrer
+todos los documentos. Esta colección derivada guarda un documento por
+(árbitro, partido, rol) y se indexa para que las consultas por árbitro y por
+rol, en una o en todas las ediciones, sean una sola lectura por índice.
+"""
+
+COLECCION = 'partidos_por_arbitro'
+
+# Orden de lectura de cada consulta: coincide con el índice que la resuelve
+ORDEN_POR_ARBITRO = [('rol', 1), ('edicion', 1), ('idPartido', 1)]
+ORDEN_POR_ROL = [('edicion', 1), ('idPartido', 1), ('arbitro', 1)]
+
+INDICES = (
+    # Por árbitro (y opcionalmente rol): igualdad sobre el prefijo, orden por el resto
+    ([('arbitro', 1)] + ORDEN_POR_ARBITRO, 'arbitro_rol_edicion', True),
+    # Por rol, para todos los árbitros
+    ([('rol', 1)] + ORDEN_POR_ROL, 'rol_edicion', False),
+)
+
+
+def documentos_por_arbitro(partidos):
+    """
+    Desarmar los documentos por partido en un documento por árbitro y rol
+
+    Args:
+        partidos (list): Documentos de arbitros_fases_finales
+
+    Returns:
+        list: Documentos {arbitro, rol, edicion, idPartido, fase, local, visitante}
+    """
+    documentos = {}
+    for partido in partidos:
+        for arbitro in partido['arbitros']:
+            clave = (arbitro['nombre'], arbitro['rol'], partido['edicion'], partido['idPartido'])
+            documentos[clave] = {
+                'arbitro': arbitro['nombre'],
+                'rol': arbitro['rol'],
+                'edicion': partido['edicion'],
+                'idPartido': partido['idPartido'],
+                'fase': partido['fase'],
+                'local': partido['local'],
+                'visitante': partido['visitante']
+            }
+    return list(documentos.values())
+
+
+def asegurar_indices(db):
+    """Crear los índices de la vista (no hace nada si ya existen)"""
+    from pymongo import IndexModel
+
+    db[COLECCION].create_indexes([
+        IndexModel(campos, name=nombre, unique=unico) for campos, nombre, unico in INDICES
+    ])
+
+
+def reemplazar(db, ediciones, documentos, tamanio_lote=500):
+    """
+    Reemplazar los documentos de las ediciones indicadas
+
+    Args:
+        db: Base de datos de MongoDB
+        ediciones (iterable): Ediciones recargadas
+        documentos (list): Documentos de documentos_por_arbitro
+        tamanio_lote (int): Documentos por insert_many
+
+    Returns:
+        int: Cantidad de documentos cargados
+    """
+    collection = db[COLECCION]
+    collection.delete_many({'edicion': {'$in': list(ediciones)}})
+    for i in range(0, len(documentos), tamanio_lote):
+        collection.insert_many(documentos[i:i + tamanio_lote], ordered=False)
+    return len(documentos)